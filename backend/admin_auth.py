@@ -0,0 +1,18 @@
+"""
+Admin Authentication for the Crop Advisor API
+Debug and maintenance endpoints require the X-Admin-Token header to match
+the ADMIN_TOKEN environment variable; they are disabled when it is not set
+"""
+
+import hmac
+import os
+from typing import Optional
+from fastapi import Header, HTTPException
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """FastAPI dependency rejecting requests without the admin token"""
+    expected = os.environ.get('ADMIN_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -0,0 +1,203 @@
+"""
+Prometheus Metrics for the Crop Advisor API
+Request counters, latency histograms and gauges, exposed at /metrics in the
+Prometheus text format without any extra dependencies
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from fastapi.responses import PlainTextResponse
+from request_tracing import add_span
+
+# Latency buckets in seconds, from sub-millisecond model calls to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+                for key, value in self._values.items()]
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def set_function(self, function):
+        """Read the gauge from `function()` every time metrics are scraped"""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            return [f'{self.name} {float(self._function())}']
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+                for key, value in self._values.items()]
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {'buckets': [0] * len(self.buckets),
+                                                  'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def _samples(self):
+        samples = []
+        for key, state in self._values.items():
+            for bound, count in zip(self.buckets, state['buckets']):
+                labels = _format_labels(self.labelnames, key, [('le', bound)])
+                samples.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            samples.append(f'{self.name}_bucket{labels} {state["count"]}')
+            samples.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {state["sum"]}')
+            samples.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {state["count"]}')
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.register(Counter(
+    'crop_api_requests_total', 'HTTP requests by route and status code',
+    ['method', 'route', 'status']))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'crop_api_request_duration_seconds', 'HTTP request latency by route',
+    ['method', 'route']))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'crop_api_recommend_stage_duration_seconds', 'Latency of each stage of /recommend-crop',
+    ['stage']))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    'crop_api_model_load_seconds', 'Time taken to load the crop model at startup'))
+MODEL_INFO = REGISTRY.register(Gauge(
+    'crop_api_model_info', 'Loaded crop model; the version label is a hash of the model file',
+    ['version', 'model_type']))
+INFERENCE_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'crop_api_inference_queue_depth', 'Predictions waiting for an inference executor thread'))
+TREES_EVALUATED = REGISTRY.register(Histogram(
+    'crop_api_trees_evaluated', 'Forest trees evaluated per /recommend-crop prediction (early exit)',
+    buckets=(10, 20, 50, 100, 150, 200, 300, 500)))
+INFERENCE_THREADS = REGISTRY.register(Gauge(
+    'crop_api_inference_threads', 'Serving thread budget: executor workers, model n_jobs, BLAS/OpenMP threads',
+    ['setting']))
+
+def observe_stage(stage, seconds):
+    """Record a /recommend-crop stage in the histogram and on the request's trace"""
+    STAGE_LATENCY.observe(seconds, stage=stage)
+    add_span(stage, seconds)
+
+@contextmanager
+def time_stage(stage):
+    """Record the time spent in the `with` block as a /recommend-crop stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+def mark_serialization_start(request):
+    """
+    Called just before an endpoint returns; the middleware records the time
+    until the response starts as the serialization stage
+    """
+    request.state.serialization_start = time.perf_counter()
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        scope.setdefault('state', {})['request_start'] = start
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                serialization_start = scope['state'].get('serialization_start')
+                if serialization_start is not None:
+                    observe_stage('serialization', time.perf_counter() - serialization_start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            route_path = getattr(route, 'path', None) or 'unmatched'
+            REQUESTS.inc(method=scope['method'], route=route_path, status=status['code'])
+            REQUEST_LATENCY.observe(time.perf_counter() - start,
+                                    method=scope['method'], route=route_path)
+
+async def metrics_endpoint():
+    return PlainTextResponse(REGISTRY.render(), media_type='text/plain; version=0.0.4')
+
+def install_metrics(app):
+    """Add the metrics middleware and the /metrics endpoint to a FastAPI app"""
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route('/metrics', metrics_endpoint, methods=['GET'], include_in_schema=False)
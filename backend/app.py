@@ -6,6 +6,7 @@ SIH 2025 - Jharkhand Agriculture App
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+import os
 import pickle
 import numpy as np
 import json
@@ -13,11 +14,20 @@ import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 import uvicorn
+from api_metrics import install_metrics
+from request_tracing import install_tracing
+from live_profiler import install_profiler
+from fast_json import FastJSONResponse
+from compression import install_compression
+from cache_policy import install_cache_policy
+from catalog_index import CatalogIndex
+from serving_config import serving_model, limit_native_threads, resolve_model_path
 
 app = FastAPI(
     title="Crop Recommendation API",
     description="AI-based crop recommendation system for farmers in Jharkhand, India",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Enable CORS for React Native app
@@ -29,20 +39,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load the trained model
+# gzip/brotli responses, Cache-Control per route, Prometheus metrics at /metrics
+install_compression(app)
+install_cache_policy(app)
+install_metrics(app)
+install_tracing(app)
+install_profiler(app)
+
+# Load the trained model (the distilled student when it is newer, as in
+# simple_app.py), single-threaded inside each predict
+limit_native_threads()
 try:
     import joblib
-    model = joblib.load('crop_recommendation_model.pkl')
-    print("✅ Trained model loaded successfully!")
+    model_path = resolve_model_path()
+    if not os.path.exists(model_path) and os.path.exists('crop_recommendation_model.pkl'):
+        # Copy placed next to the app by the training scripts
+        model_path = 'crop_recommendation_model.pkl'
+    model = serving_model(joblib.load(model_path))
+    print(f"✅ Model loaded from {model_path}!")
     print(f"Model type: {type(model).__name__}")
 except FileNotFoundError:
-    try:
-        model = joblib.load('../ml_model/crop_recommendation_model.pkl')
-        print("✅ Model loaded from ml_model directory!")
-    except FileNotFoundError:
-        print("❌ Model file not found. Please train the model first by running:")
-        print("   cd ml_model && python train_model_simple.py")
-        model = None
+    print("❌ Model file not found. Please train the model first by running:")
+    print("   cd ml_model && python train_model_simple.py")
+    model = None
 except Exception as e:
     print(f"❌ Error loading model: {e}")
     model = None
@@ -154,6 +173,9 @@ JHARKHAND_CLIMATE = {
     'Koderma': {'avg_temp': 24, 'avg_rainfall': 1050, 'avg_humidity': 67}
 }
 
+# district -> crops, crop -> districts, season -> crops and water -> crops
+CATALOG_INDEX = CatalogIndex(JHARKHAND_CROPS_DATA, JHARKHAND_CLIMATE)
+
 @app.get("/")
 async def root():
     return {
@@ -180,6 +202,10 @@ async def recommend_crop(request: CropRecommendationRequest):
         
         # Get prediction
         crop_prediction = model.predict(input_data)[0]
+        # Models trained on label codes (XGBoost) carry the crop names
+        crop_labels = getattr(model, 'crop_labels_', None)
+        if crop_labels is not None:
+            crop_prediction = str(crop_labels[int(crop_prediction)])
         
         # Get prediction probabilities for confidence
         try:
@@ -264,7 +290,9 @@ async def get_crop_prices():
             last_updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         ))
     
-    return {"prices": prices}
+    # Returned directly so the price models are serialized by orjson
+    # instead of going through jsonable_encoder first
+    return FastJSONResponse({"prices": prices})
 
 @app.get("/crop-info/{crop_name}")
 async def get_crop_info(crop_name: str):
@@ -310,10 +338,23 @@ async def get_climate_data(district: str):
         "average_temperature": district_data['avg_temp'],
         "average_rainfall": district_data['avg_rainfall'],
         "average_humidity": district_data['avg_humidity'],
-        "suitable_crops": [
-            crop for crop, data in JHARKHAND_CROPS_DATA.items()
-            if district.title() in data.get('suitable_districts', [])
-        ]
+        "suitable_crops": CATALOG_INDEX.crops_for(district=district.title())
+    }
+
+@app.get("/crops")
+async def find_crops(district: Optional[str] = None, season: Optional[str] = None,
+                     water: Optional[str] = None):
+    """
+    Crops suitable for a district, season and/or water availability,
+    e.g. /crops?district=Ranchi&season=Rabi&water=Low
+    """
+    crops = CATALOG_INDEX.crops_for(district=district, season=season, water=water)
+    return {
+        "district": district,
+        "season": season,
+        "water": water,
+        "crops": crops,
+        "total_crops": len(crops)
     }
 
 @app.get("/districts")
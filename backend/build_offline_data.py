@@ -0,0 +1,73 @@
+"""
+Build the web frontend's offline dataset
+Regenerates the data section of web_frontend/offline-data.js from the
+catalog database and records the new version, so /offline-bundle can send
+clients of the previous builds only what changed
+
+Usage:
+    python build_offline_data.py
+    python build_offline_data.py --check   # exit 1 if offline-data.js is out of date
+"""
+
+import argparse
+import json
+import os
+import sys
+from offline_bundle import HISTORY_PATH, current_bundle, save_history
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OFFLINE_DATA_JS = os.path.join(ROOT_DIR, 'web_frontend', 'offline-data.js')
+
+BEGIN_MARKER = '    // BEGIN GENERATED DATA'
+END_MARKER = '    // END GENERATED DATA'
+
+def js_value(value, indent='    '):
+    return json.dumps(value, indent=4, ensure_ascii=False).replace('\n', '\n' + indent)
+
+def render_data_section(bundle):
+    """The generated lines of the OFFLINE_CROP_DATA object literal, markers included"""
+    dataset = bundle.dataset
+    return '\n'.join([
+        f"{BEGIN_MARKER} - edit the catalog and run backend/build_offline_data.py",
+        f"    version: '{bundle.version}',",
+        f"    crops: {js_value(dataset['crops'])},",
+        f"    districts: {js_value(dataset['districts'])},",
+        f"    market_prices: {js_value(list(dataset['market_prices'].values()))},",
+        END_MARKER,
+    ])
+
+def render_offline_data_js(source, bundle):
+    start = source.index(BEGIN_MARKER)
+    end = source.index(END_MARKER, start) + len(END_MARKER)
+    return source[:start] + render_data_section(bundle) + source[end:]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate web_frontend/offline-data.js from the crop catalog")
+    parser.add_argument('--output', default=OFFLINE_DATA_JS)
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--check', action='store_true',
+                        help="only check that the file is up to date, without writing anything")
+    args = parser.parse_args(argv)
+
+    bundle = current_bundle(args.history)
+    with open(args.output, encoding='utf-8') as f:
+        source = f.read()
+    generated = render_offline_data_js(source, bundle)
+
+    if args.check:
+        if generated != source:
+            print(f"❌ {args.output} is out of date, run backend/build_offline_data.py")
+            return 1
+        print(f"✅ {args.output} is up to date (version {bundle.version})")
+        return 0
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(generated)
+    save_history(bundle.history, args.history)
+    print(f"✅ Offline data version {bundle.version} written to {args.output}")
+    print(f"📦 {len(bundle.dataset['crops'])} crops, {len(bundle.dataset['districts'])} districts, "
+          f"{len(bundle.history) - 1} earlier version(s) available for deltas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+HTTP Caching Policy for the Crop Advisor API
+Cache-Control headers per route, so browsers, the web app's service worker
+and any CDN in front of the API know how long each response stays fresh
+"""
+
+import os
+
+# Catalog data only changes with a deploy or an admin reload
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', '3600'))
+CATALOG_STALE_WHILE_REVALIDATE = int(os.environ.get('CATALOG_STALE_WHILE_REVALIDATE', '86400'))
+# Prices are re-quoted on every request, so they only stay fresh briefly
+PRICES_MAX_AGE = int(os.environ.get('PRICES_MAX_AGE', '60'))
+
+CATALOG_POLICY = (f"public, max-age={CATALOG_MAX_AGE}, "
+                  f"stale-while-revalidate={CATALOG_STALE_WHILE_REVALIDATE}")
+
+# First matching path prefix wins; routes not listed get no header
+CACHE_POLICIES = [
+    ('/crop-info', CATALOG_POLICY),
+    ('/climate-data', CATALOG_POLICY),
+    ('/districts', CATALOG_POLICY),
+    ('/crops', CATALOG_POLICY),
+    ('/crop-prices', f"public, max-age={PRICES_MAX_AGE}"),
+    # Depend on the client's version, always check with the server
+    ('/offline-bundle', 'no-cache'),
+    ('/sync', 'no-cache'),
+    # The service worker keeps the last answer per input as an offline
+    # fallback, so the browser may store it but never reuse it unchecked
+    ('/recommend-crop', 'private, no-cache'),
+    ('/investment-analysis', 'no-cache'),
+]
+
+def cache_policy(path):
+    for prefix, policy in CACHE_POLICIES:
+        if path == prefix or path.startswith(prefix + '/'):
+            return policy
+    return None
+
+class CachePolicyMiddleware:
+    """
+    ASGI middleware adding the route's Cache-Control to successful responses
+    that don't set their own
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        policy = cache_policy(scope['path']) if scope['type'] == 'http' else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if (message['type'] == 'http.response.start' and message['status'] in (200, 304)
+                    and not any(key.lower() == b'cache-control' for key, _ in message['headers'])):
+                message = {**message, 'headers': list(message['headers']) + [
+                    (b'cache-control', policy.encode()),
+                ]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+def install_cache_policy(app):
+    """Add Cache-Control headers to the responses of a FastAPI app"""
+    app.add_middleware(CachePolicyMiddleware)
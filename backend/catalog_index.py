@@ -0,0 +1,90 @@
+"""
+Inverted Index over the Crop Catalog
+district -> crops, crop -> districts, season -> crops and water need -> crops,
+built once when the catalog loads, so suitability queries are set
+intersections instead of scans over every crop's district list
+"""
+
+import re
+
+_LABEL_SEPARATOR = re.compile(r'\s*/\s*')
+
+def label_parts(value, labels=None):
+    """Lower-cased parts of a bilingual or combined label, e.g. 'खरीफ/रबी' -> kharif, rabi, खरीफ, रबी"""
+    value = (labels or {}).get(value, value)
+    return [part.lower() for part in _LABEL_SEPARATOR.split(str(value).strip()) if part]
+
+class CatalogIndex:
+    """
+    A crop counts as suitable for a district when the crop's
+    `suitable_districts` lists it, the same list /crop-info shows. Filter
+    values match any part of a bilingual label, case-insensitively, so
+    'Rabi', 'rabi' and 'रबी' all select the same crops.
+    """
+
+    def __init__(self, crops, climate=None, season_labels=None, water_labels=None):
+        climate = climate or {}
+        self.crop_order = {crop: i for i, crop in enumerate(crops)}
+        self.district_order = {district: i for i, district in enumerate(climate)}
+
+        # Any spelling of a district -> the climate table's key
+        self.district_aliases = {}
+        for district, data in climate.items():
+            for alias in (district, data.get('district'), data.get('district_hindi'),
+                          data.get('district_bilingual')):
+                for part in label_parts(alias) if alias else []:
+                    self.district_aliases.setdefault(part, district)
+
+        self.crop_districts = {crop: set() for crop in crops}
+        self.district_crops = {district: set() for district in climate}
+        for crop, data in crops.items():
+            for label in data.get('suitable_districts', ()):
+                self._link(crop, self.canonical_district(label))
+
+        self.season_crops = self._by_label(crops, 'season', season_labels)
+        self.water_crops = self._by_label(crops, 'water_requirement', water_labels)
+        self.all_crops = frozenset(crops)
+
+        # Frozen once built; lookups hand out these sets directly
+        self.crop_districts = {k: frozenset(v) for k, v in self.crop_districts.items()}
+        self.district_crops = {k: frozenset(v) for k, v in self.district_crops.items()}
+
+    def _link(self, crop, district):
+        self.crop_districts[crop].add(district)
+        self.district_crops.setdefault(district, set()).add(crop)
+
+    @staticmethod
+    def _by_label(crops, field, labels):
+        index = {}
+        for crop, data in crops.items():
+            for part in label_parts(data.get(field, ''), labels):
+                index.setdefault(part, set()).add(crop)
+        return {k: frozenset(v) for k, v in index.items()}
+
+    def canonical_district(self, name):
+        """The climate table key for any spelling of a district, else its first label part"""
+        parts = label_parts(name)
+        for part in parts:
+            if part in self.district_aliases:
+                return self.district_aliases[part]
+        return _LABEL_SEPARATOR.split(name.strip())[0] if parts else name
+
+    def _lookup(self, index, value):
+        matches = [index[part] for part in label_parts(value) if part in index]
+        return frozenset().union(*matches) if matches else frozenset()
+
+    def crops_for(self, district=None, season=None, water=None):
+        """Crops matching every given filter, in catalog order"""
+        result = self.all_crops
+        if district:
+            result = result & self.district_crops.get(self.canonical_district(district), frozenset())
+        if season:
+            result = result & self._lookup(self.season_crops, season)
+        if water:
+            result = result & self._lookup(self.water_crops, water)
+        return sorted(result, key=self.crop_order.get)
+
+    def districts_for(self, crop):
+        """Districts a crop suits, in climate table order (unlisted districts last)"""
+        districts = self.crop_districts.get(crop, frozenset())
+        return sorted(districts, key=lambda d: (self.district_order.get(d, len(self.district_order)), d))
@@ -0,0 +1,196 @@
+"""
+SQLite Catalog Store for the Crop Advisor API
+Crops, district climate and crop/district suitability live in an indexed
+SQLite database. The API never queries it per request: the loader reads it
+into an immutable in-memory snapshot at startup and on reload, and requests
+do dict lookups against whichever snapshot is current.
+
+A missing database is created and seeded from crop_catalog.py.
+
+Usage:
+    python catalog_store.py            # create the database if missing and summarize it
+    python catalog_store.py --reseed   # rebuild it from crop_catalog.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import MappingProxyType
+import crop_catalog
+from catalog_index import CatalogIndex
+
+CATALOG_DB_PATH = os.environ.get(
+    'CATALOG_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crop_catalog.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crops (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name_en TEXT NOT NULL,
+    name_hi TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    avg_price REAL NOT NULL,
+    season TEXT NOT NULL,
+    investment_per_ha INTEGER NOT NULL,
+    profit_margin REAL NOT NULL,
+    water_requirement TEXT NOT NULL,
+    market_outlook TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS districts (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'Jharkhand',
+    district TEXT NOT NULL,
+    district_hindi TEXT NOT NULL,
+    district_bilingual TEXT NOT NULL,
+    average_temperature REAL,
+    average_rainfall REAL,
+    average_humidity REAL
+);
+-- Districts listed on a crop (bilingual labels, as shown to farmers)
+CREATE TABLE IF NOT EXISTS crop_districts (
+    crop TEXT NOT NULL REFERENCES crops(name) ON DELETE CASCADE,
+    district TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (crop, district)
+);
+CREATE INDEX IF NOT EXISTS idx_crops_season ON crops(season);
+CREATE INDEX IF NOT EXISTS idx_crops_water ON crops(water_requirement);
+CREATE INDEX IF NOT EXISTS idx_districts_state ON districts(state);
+CREATE INDEX IF NOT EXISTS idx_crop_districts_district ON crop_districts(district);
+"""
+
+CROP_COLUMNS = ('name_en', 'name_hi', 'emoji', 'avg_price', 'season', 'investment_per_ha',
+                'profit_margin', 'water_requirement', 'market_outlook')
+DISTRICT_COLUMNS = ('district', 'district_hindi', 'district_bilingual',
+                    'average_temperature', 'average_rainfall', 'average_humidity')
+
+def content_hash(obj):
+    """Short hash of the canonical JSON of `obj`, used as a data version"""
+    canonical = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=dict)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def connect(path=CATALOG_DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def seed(conn, crops=None, climate=None):
+    """Replace the database contents with the crop_catalog.py tables"""
+    crops = crop_catalog.JHARKHAND_CROPS_DATA if crops is None else crops
+    climate = crop_catalog.CLIMATE_DATA if climate is None else climate
+    with conn:
+        conn.execute('DELETE FROM crops')
+        conn.execute('DELETE FROM districts')
+        for position, (name, data) in enumerate(crops.items()):
+            conn.execute(
+                f"INSERT INTO crops (name, position, {', '.join(CROP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(CROP_COLUMNS) + 2))})",
+                (name, position, *[data[column] for column in CROP_COLUMNS]))
+            conn.executemany('INSERT INTO crop_districts (crop, district, position) VALUES (?, ?, ?)',
+                             [(name, district, i) for i, district in enumerate(data['suitable_districts'])])
+        for position, (name, data) in enumerate(climate.items()):
+            conn.execute(
+                f"INSERT INTO districts (name, position, {', '.join(DISTRICT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(DISTRICT_COLUMNS) + 2))})",
+                (name, position, *[data.get(column) for column in DISTRICT_COLUMNS]))
+
+def _number(value):
+    """Whole numbers come back from REAL columns as floats; keep them as ints like the source data"""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class CatalogSnapshot:
+    """
+    One consistent, read-only view of the catalog. `crops` and `climate`
+    have the same shape as the crop_catalog.py dicts, wrapped in read-only
+    mappings with tuples for lists, and `index` answers suitability queries;
+    a reload builds a new snapshot instead of changing this one. Each
+    district's `suitable_crops` is filled in from the index, so it always
+    agrees with the crops' `suitable_districts`.
+    """
+
+    __slots__ = ('crops', 'climate', 'index', 'version', 'loaded_at', 'load_seconds')
+
+    def __init__(self, crops, climate, load_started=None):
+        self.crops = _freeze(crops)
+        self.index = CatalogIndex(self.crops, climate,
+                                  crop_catalog.SEASON_LABELS, crop_catalog.WATER_LABELS)
+        climate = {district: {**data, 'suitable_crops': self.index.crops_for(district=district)}
+                   for district, data in climate.items()}
+        self.climate = _freeze(climate)
+        self.version = content_hash({'crops': crops, 'climate': climate})
+        # Reading the database plus building the index
+        self.load_seconds = time.perf_counter() - load_started if load_started is not None else 0.0
+        self.loaded_at = time.time()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'loaded_at'):
+            raise AttributeError("CatalogSnapshot is read-only, reload the catalog instead")
+        object.__setattr__(self, name, value)
+
+def load_snapshot(conn):
+    start = time.perf_counter()
+    crops = {}
+    for row in conn.execute(f"SELECT name, {', '.join(CROP_COLUMNS)} FROM crops ORDER BY position"):
+        crops[row['name']] = {column: row[column] for column in CROP_COLUMNS}
+        crops[row['name']]['suitable_districts'] = []
+    for row in conn.execute('SELECT crop, district FROM crop_districts ORDER BY crop, position'):
+        crops[row['crop']]['suitable_districts'].append(row['district'])
+
+    climate = {}
+    for row in conn.execute(f"SELECT name, {', '.join(DISTRICT_COLUMNS)} FROM districts ORDER BY position"):
+        # Optional measurements stay absent rather than null, as in the source data
+        climate[row['name']] = {column: _number(row[column]) for column in DISTRICT_COLUMNS
+                                if row[column] is not None}
+
+    return CatalogSnapshot(crops, climate, load_started=start)
+
+_lock = threading.Lock()
+_snapshot = None
+
+def load_catalog(path=CATALOG_DB_PATH):
+    """Read the database into a new snapshot and make it current, seeding a missing database first"""
+    global _snapshot
+    with _lock:
+        conn = connect(path)
+        try:
+            if conn.execute('SELECT COUNT(*) FROM crops').fetchone()[0] == 0:
+                print(f"🌱 Seeding crop catalog database {path} from crop_catalog.py")
+                seed(conn)
+            _snapshot = load_snapshot(conn)
+        finally:
+            conn.close()
+        return _snapshot
+
+def current_catalog():
+    """The current snapshot; requests should fetch it once and use it throughout"""
+    return _snapshot if _snapshot is not None else load_catalog()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or rebuild the SQLite crop catalog")
+    parser.add_argument('--db', default=CATALOG_DB_PATH)
+    parser.add_argument('--reseed', action='store_true', help="replace the contents with crop_catalog.py")
+    args = parser.parse_args()
+
+    if args.reseed:
+        conn = connect(args.db)
+        seed(conn)
+        conn.close()
+        print(f"✅ Reseeded {args.db} from crop_catalog.py")
+    snapshot = load_catalog(args.db)
+    print(f"📦 {len(snapshot.crops)} crops, {len(snapshot.climate)} districts, "
+          f"version {snapshot.version}, loaded in {snapshot.load_seconds * 1000:.1f} ms")
@@ -0,0 +1,151 @@
+"""
+Catalog Change Log for the Crop Advisor API
+A versioned, persisted log of which crops, prices and districts changed.
+Every snapshot of the catalog is diffed against the last one recorded, and
+the changes get the next version number, so /sync can answer "what changed
+since version N" with just those entities.
+"""
+
+import json
+import os
+import threading
+import uuid
+from crop_catalog import PRICES_LAST_UPDATED, crop_info
+from catalog_store import content_hash, current_catalog
+
+CHANGE_LOG_PATH = os.environ.get(
+    'CHANGE_LOG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'change_log.json'))
+
+# Oldest changes are dropped beyond this; clients older than that get a full sync
+MAX_CHANGES = int(os.environ.get('CHANGE_LOG_MAX_CHANGES', '2000'))
+
+ENTITY_TYPES = ('crops', 'prices', 'climate')
+
+def catalog_entities(crops=None, climate=None):
+    """The synced entities, shaped like the /crop-info, /crop-prices and /climate-data responses"""
+    catalog = current_catalog()
+    crops = catalog.crops if crops is None else crops
+    climate = catalog.climate if climate is None else climate
+    return {
+        'crops': {name: crop_info(name, data) for name, data in crops.items()},
+        'prices': {name: {
+            'crop': name,
+            'current_price_per_kg': data['avg_price'],
+            # Reference prices only move with a catalog update
+            'market_trend': 'stable',
+            'market_outlook': data['market_outlook'],
+            'last_updated': PRICES_LAST_UPDATED,
+        } for name, data in crops.items()},
+        'climate': dict(climate),
+    }
+
+class ChangeLog:
+    """
+    Versions are `<log id>.<sequence>`. The log id changes whenever the log
+    file is lost or recreated, so a client holding a version from another
+    log is sent everything instead of a wrong delta.
+    """
+
+    def __init__(self, path=CHANGE_LOG_PATH, max_changes=MAX_CHANGES):
+        self.path = path
+        self.max_changes = max_changes
+        self._lock = threading.Lock()
+        self.entities = {entity_type: {} for entity_type in ENTITY_TYPES}
+        self._load()
+
+    def _load(self):
+        state = None
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not read change log {self.path}, starting a new one: {e}")
+        if state is None:
+            state = {'log_id': uuid.uuid4().hex[:8], 'sequence': 0, 'oldest_sequence': 0,
+                     'hashes': {}, 'changes': []}
+        self.log_id = state['log_id']
+        self.sequence = state['sequence']
+        self.oldest_sequence = state['oldest_sequence']
+        self.hashes = state['hashes']
+        # [sequence, entity type, key, 'upsert' | 'delete']
+        self.changes = state['changes']
+
+    def _save(self):
+        if not self.path:
+            return
+        state = {'log_id': self.log_id, 'sequence': self.sequence,
+                 'oldest_sequence': self.oldest_sequence, 'hashes': self.hashes,
+                 'changes': self.changes}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save change log {self.path}: {e}")
+
+    @property
+    def version(self):
+        return f"{self.log_id}.{self.sequence}"
+
+    def record_snapshot(self, entities=None):
+        """Diff the catalog against the last snapshot and log any changes under a new version"""
+        entities = catalog_entities() if entities is None else entities
+        with self._lock:
+            hashes = {entity_type: {key: content_hash(value) for key, value in entities[entity_type].items()}
+                      for entity_type in ENTITY_TYPES}
+            changed = []
+            for entity_type in ENTITY_TYPES:
+                old, new = self.hashes.get(entity_type, {}), hashes[entity_type]
+                changed += [(entity_type, key, 'upsert') for key, digest in new.items() if old.get(key) != digest]
+                changed += [(entity_type, key, 'delete') for key in old if key not in new]
+
+            self.entities = entities
+            if changed:
+                self.sequence += 1
+                self.changes += [[self.sequence, entity_type, key, op] for entity_type, key, op in changed]
+                if len(self.changes) > self.max_changes:
+                    self.changes = self.changes[-self.max_changes:]
+                    self.oldest_sequence = self.changes[0][0]
+                self.hashes = hashes
+                self._save()
+            return len(changed)
+
+    def sequence_of(self, since):
+        """Sequence number of a version from this log, or None"""
+        if not since:
+            return None
+        log_id, _, sequence = since.partition('.')
+        if log_id != self.log_id or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence < self.oldest_sequence or sequence > self.sequence:
+            return None
+        return sequence
+
+    def changes_since(self, since):
+        """
+        Entities changed since the client's version. Unknown, foreign or
+        compacted versions get every entity with `full` set.
+        """
+        with self._lock:
+            sequence = self.sequence_of(since)
+            if sequence is None:
+                return {'version': self.version, 'full': True,
+                        'changed': {entity_type: dict(values) for entity_type, values in self.entities.items()},
+                        'deleted': {}}
+
+            # Only the latest operation per entity matters
+            latest = {}
+            for change_sequence, entity_type, key, op in self.changes:
+                if change_sequence > sequence:
+                    latest[(entity_type, key)] = op
+            changed, deleted = {}, {}
+            for (entity_type, key), op in latest.items():
+                if op == 'delete' or key not in self.entities[entity_type]:
+                    deleted.setdefault(entity_type, []).append(key)
+                else:
+                    changed.setdefault(entity_type, {})[key] = self.entities[entity_type][key]
+            return {'version': self.version, 'full': False, 'changed': changed, 'deleted': deleted}
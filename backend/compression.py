@@ -0,0 +1,151 @@
+"""
+Response Compression for the Crop Advisor API
+gzip/brotli negotiation for dynamic responses above a size threshold, and
+payloads compressed once ahead of time for data that doesn't change between
+requests
+"""
+
+import gzip
+import hashlib
+import os
+from fastapi import Response
+from fast_json import dumps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the encoding overhead
+# outweighs the savings
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '500'))
+
+# Dynamic responses favour speed, precompressed ones are done once at the best ratio
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def choose_encoding(accept_encoding):
+    """Best encoding the client accepts (q > 0), preferring brotli, or None"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+def compress(body, encoding, static=False):
+    if encoding == 'br':
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY if static else DYNAMIC_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=STATIC_GZIP_LEVEL if static else DYNAMIC_GZIP_LEVEL, mtime=0)
+
+def _header(headers, name):
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete (non-streamed) responses of a
+    compressible type when the client accepts gzip or brotli. Responses that
+    already carry a Content-Encoding, e.g. precompressed payloads, pass through.
+    """
+
+    def __init__(self, app, min_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(_header(scope['headers'], b'accept-encoding'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {'start': None, 'passthrough': False}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                state['start'] = message
+                return
+            if message['type'] != 'http.response.body' or state['passthrough']:
+                await send(message)
+                return
+
+            start = state['start']
+            headers = start['headers']
+            body = message.get('body', b'')
+            content_type = _header(headers, b'content-type') or ''
+            if (message.get('more_body') or _header(headers, b'content-encoding')
+                    or len(body) < self.min_size
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                # Streamed, already encoded, small or binary: send as is
+                state['passthrough'] = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [(k, v) for k, v in headers if k.lower() != b'content-length']
+            headers += [
+                (b'content-encoding', encoding.encode()),
+                (b'content-length', str(len(compressed)).encode()),
+                (b'vary', b'Accept-Encoding'),
+            ]
+            await send({**start, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+class PrecompressedPayload:
+    """
+    A JSON payload serialized and compressed in every supported encoding
+    once, then served to each client in the best encoding it accepts. The
+    ETag lets caches revalidate with a 304 instead of downloading it again.
+    """
+
+    def __init__(self, content, media_type='application/json'):
+        self.media_type = media_type
+        self.body = content if isinstance(content, bytes) else dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+        self.variants = {None: self.body}
+        for encoding in supported_encodings():
+            compressed = compress(self.body, encoding, static=True)
+            if len(compressed) < len(self.body):
+                self.variants[encoding] = compressed
+
+    def response(self, request):
+        headers = {'Vary': 'Accept-Encoding', 'ETag': self.etag}
+        if_none_match = request.headers.get('if-none-match', '')
+        if any(tag.strip() in (self.etag, 'W/' + self.etag) for tag in if_none_match.split(',')):
+            return Response(status_code=304, headers=headers)
+        encoding = choose_encoding(request.headers.get('accept-encoding'))
+        if encoding not in self.variants:
+            encoding = None
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+def install_compression(app):
+    """Compress the responses of a FastAPI app"""
+    app.add_middleware(CompressionMiddleware)
@@ -0,0 +1,267 @@
+"""
+Crop Catalog for the Crop Advisor API
+Seed data for the SQLite catalog (catalog_store.py) the API serves from,
+plus the labels and formulas shared by the API and the web frontend's
+offline dataset (build_offline_data.py). After editing the tables run
+`python catalog_store.py --reseed`.
+"""
+
+# Sample crop data for Jharkhand
+JHARKHAND_CROPS_DATA = {
+    'rice': {
+        'name_en': 'Rice',
+        'name_hi': 'धान',
+        'emoji': '🌾',
+        'avg_price': 25.0,
+        'season': 'खरीफ',
+        'investment_per_ha': 35000,
+        'profit_margin': 0.3,
+        'water_requirement': 'उच्च',
+        'suitable_districts': [
+            'Ranchi / रांची', 'Dhanbad / धनबाद', 'Jamshedpur / जमशेदपुर',
+            'Bokaro / बोकारो', 'Hazaribagh / हजारीबाग', 'Koderma / कोडरमा',
+            'Deoghar / देवघर', 'Dumka / दुमका', 'Latehar / लातेहार', 'Kodarma / कोडरमा'
+        ],
+        'market_outlook': 'Stable demand, good prices'
+    },
+    'wheat': {
+        'name_en': 'Wheat',
+        'name_hi': 'गेहूं',
+        'emoji': '🌾',
+        'avg_price': 22.0,
+        'season': 'रबी',
+        'investment_per_ha': 28000,
+        'profit_margin': 0.25,
+        'water_requirement': 'मध्यम',
+        'suitable_districts': [
+            'Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार', 'Ranchi / रांची',
+            'Jamshedpur / जमशेदपुर', 'Hazaribagh / हजारीबाग', 'Koderma / कोडरमा',
+            'Deoghar / देवघर', 'Kodarma / कोडरमा'
+        ],
+        'market_outlook': 'High demand, rising prices'
+    },
+    'maize': {
+        'name_en': 'Maize',
+        'name_hi': 'मक्का',
+        'emoji': '🌽',
+        'avg_price': 18.0,
+        'season': 'खरीफ/रबी',
+        'investment_per_ha': 25000,
+        'profit_margin': 0.35,
+        'water_requirement': 'मध्यम',
+        'suitable_districts': [
+            'Ranchi / रांची', 'Hazaribagh / हजारीबाग', 'Koderma / कोडरमा',
+            'Dhanbad / धनबाद', 'Jamshedpur / जमशेदपुर', 'Bokaro / बोकारो',
+            'Palamu / पलामू', 'Garhwa / गढ़वा', 'Deoghar / देवघर', 'Dumka / दुमका',
+            'Latehar / लातेहार', 'Kodarma / कोडरमा'
+        ],
+        'market_outlook': 'Moderate demand, stable prices'
+    },
+    'cotton': {
+        'name_en': 'Cotton',
+        'name_hi': 'कपास',
+        'emoji': '🌿',
+        'avg_price': 45.0,
+        'season': 'खरीफ',
+        'investment_per_ha': 40000,
+        'profit_margin': 0.4,
+        'water_requirement': 'मध्यम',
+        'suitable_districts': ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Dhanbad / धनबाद', 'Bokaro / बोकारो'],
+        'market_outlook': 'High demand, premium prices'
+    },
+    'sugarcane': {
+        'name_en': 'Sugarcane',
+        'name_hi': 'गन्ना',
+        'emoji': '🎋',
+        'avg_price': 3.5,
+        'season': 'वार्षिक',
+        'investment_per_ha': 60000,
+        'profit_margin': 0.45,
+        'water_requirement': 'उच्च',
+        'suitable_districts': ['Ranchi / रांची', 'Hazaribagh / हजारीबाग', 'Dumka / दुमका'],
+        'market_outlook': 'Steady demand, fair prices'
+    },
+    'chickpea': {
+        'name_en': 'Chickpea',
+        'name_hi': 'चना',
+        'emoji': '🫘',
+        'avg_price': 55.0,
+        'season': 'रबी',
+        'investment_per_ha': 20000,
+        'profit_margin': 0.5,
+        'water_requirement': 'कम',
+        'suitable_districts': ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार', 'Deoghar / देवघर'],
+        'market_outlook': 'High demand, good returns'
+    },
+    'kidney_beans': {
+        'name_en': 'Kidney Beans',
+        'name_hi': 'राजमा',
+        'emoji': '🫘',
+        'avg_price': 80.0,
+        'season': 'रबी',
+        'investment_per_ha': 22000,
+        'profit_margin': 0.6,
+        'water_requirement': 'मध्यम',
+        'suitable_districts': ['Ranchi / रांची', 'Hazaribagh / हजारीबाग'],
+        'market_outlook': 'Premium crop, excellent prices'
+    },
+    'banana': {
+        'name_en': 'Banana',
+        'name_hi': 'केला',
+        'emoji': '🍌',
+        'avg_price': 15.0,
+        'season': 'वार्षिक',
+        'investment_per_ha': 45000,
+        'profit_margin': 0.4,
+        'water_requirement': 'उच्च',
+        'suitable_districts': ['Ranchi / रांची', 'Dhanbad / धनबाद', 'Dumka / दुमका'],
+        'market_outlook': 'Consistent demand, stable prices'
+    }
+}
+
+# Sample climate data for Jharkhand districts with bilingual names. A
+# district's suitable crops are the crops whose suitable_districts list it,
+# so add or remove them on the crops above
+CLIMATE_DATA = {
+    "Ranchi": {
+        "district": "Ranchi",
+        "district_hindi": "रांची", 
+        "district_bilingual": "Ranchi / रांची",
+        "average_temperature": 24,      # Change temperature here (°C)
+        "average_rainfall": 1200,       # Change rainfall here (mm/year)
+        "average_humidity": 75          # Change humidity here (%)
+    },
+    "Dhanbad": {
+        "district": "Dhanbad",
+        "district_hindi": "धनबाद",
+        "district_bilingual": "Dhanbad / धनबाद",
+        "average_temperature": 26,
+        "average_rainfall": 1100,
+        "average_humidity": 70
+    },
+    "Jamshedpur": {
+        "district": "Jamshedpur",
+        "district_hindi": "जमशेदपुर",
+        "district_bilingual": "Jamshedpur / जमशेदपुर",
+        "average_temperature": 27,
+        "average_rainfall": 1300,
+        "average_humidity": 75
+    },
+    "Bokaro": {
+        "district": "Bokaro",
+        "district_hindi": "बोकारो",
+        "district_bilingual": "Bokaro / बोकारो",
+        "average_temperature": 25,
+        "average_rainfall": 1150,
+        "average_humidity": 70
+    },
+    "Hazaribagh": {
+        "district": "Hazaribagh",
+        "district_hindi": "हजारीबाग",
+        "district_bilingual": "Hazaribagh / हजारीबाग",
+        "average_temperature": 23,
+        "average_rainfall": 1000,
+        "average_humidity": 75
+    },
+    "Palamu": {
+        "district": "Palamu",
+        "district_hindi": "पलामू",
+        "district_bilingual": "Palamu / पलामू",
+        "average_temperature": 25,
+        "average_rainfall": 900,
+        "average_humidity": 65
+    },
+    "Garhwa": {
+        "district": "Garhwa",
+        "district_hindi": "गढ़वा",
+        "district_bilingual": "Garhwa / गढ़वा",
+        "average_temperature": 24,
+        "average_rainfall": 950,
+        "average_humidity": 68
+    },
+    "Koderma": {
+        "district": "Koderma",
+        "district_hindi": "कोडरमा",
+        "district_bilingual": "Koderma / कोडरमा",
+        "average_temperature": 24,
+        "average_rainfall": 1050,
+        "average_humidity": 72
+    },
+    "Deoghar": {
+        "district": "Deoghar",
+        "district_hindi": "देवघर",
+        "district_bilingual": "Deoghar / देवघर",
+        "average_temperature": 25,
+        "average_rainfall": 1100,
+        "average_humidity": 73
+    },
+    "Dumka": {
+        "district": "Dumka",
+        "district_hindi": "दुमका",
+        "district_bilingual": "Dumka / दुमका",
+        "average_temperature": 26,
+        "average_rainfall": 1250,
+        "average_humidity": 78
+    },
+    "Latehar": {
+        "district": "Latehar",
+        "district_hindi": "लातेहार",
+        "district_bilingual": "Latehar / लातेहार",
+        "average_rainfall": 900,
+        "average_humidity": 70
+    },
+    "Hazaribagh": {
+        "district": "Hazaribagh",
+        "district_hindi": "हजारीबाग",
+        "district_bilingual": "Hazaribagh / हजारीबाग",
+        "average_temperature": 26,
+        "average_rainfall": 1000,
+        "average_humidity": 75
+    },
+    "Kodarma": {
+        "district": "Kodarma",
+        "district_hindi": "कोडरमा",
+        "district_bilingual": "Kodarma / कोडरमा",
+        "average_temperature": 27,
+        "average_rainfall": 800,
+        "average_humidity": 70
+    }
+}
+
+# Bilingual labels used by the web frontend
+SEASON_LABELS = {
+    'खरीफ': 'Kharif / खरीफ',
+    'रबी': 'Rabi / रबी',
+    'खरीफ/रबी': 'Kharif/Rabi / खरीफ/रबी',
+    'वार्षिक': 'Annual / वार्षिक',
+}
+
+WATER_LABELS = {
+    'उच्च': 'High / उच्च',
+    'मध्यम': 'Medium / मध्यम',
+    'कम': 'Low / कम',
+}
+
+# Date the reference prices (avg_price) were last reviewed
+PRICES_LAST_UPDATED = '2025-01-21'
+
+def crop_info(crop_name, crop_data):
+    """Crop details served by /crop-info"""
+    # Calculate potential profit
+    investment = crop_data['investment_per_ha']
+    profit_margin = crop_data['profit_margin']
+    avg_yield = 2000  # kg/ha (example)
+    revenue = avg_yield * crop_data['avg_price']
+    profit = revenue * profit_margin
+    
+    return {
+        "crop": crop_name,
+        "season": crop_data['season'],
+        "investment_per_ha": investment,
+        "expected_revenue_per_ha": revenue,
+        "expected_profit_per_ha": profit,
+        "profit_margin": f"{profit_margin * 100}%",
+        "water_requirement": crop_data['water_requirement'],
+        "suitable_districts": crop_data['suitable_districts'],
+        "current_market_price": crop_data['avg_price']
+    }
@@ -0,0 +1,105 @@
+"""
+Early-Exit Voting for the Crop Recommendation Forest
+Interactive requests don't need all 200 trees when the vote is clear: trees
+are evaluated in blocks, and evaluation stops as soon as the remaining
+trees can no longer change the winning crop. The predicted crop is always
+the one the full forest would predict, and the confidence is the average
+vote of the trees evaluated. lower_bound() gives the least the full forest
+could report for the same row. Batch jobs keep using the model's own
+predict_proba.
+"""
+
+import os
+import numpy as np
+
+EARLY_EXIT_ENABLED = os.environ.get('INFERENCE_EARLY_EXIT', '1') == '1'
+# Trees evaluated between checks of the vote
+EARLY_EXIT_BLOCK_TREES = int(os.environ.get('EARLY_EXIT_BLOCK_TREES', '10'))
+# Margin the leader must keep over the worst case, so float rounding in the
+# full forest's sum can't flip a tie
+_SAFETY = 1e-9
+
+class EarlyExitForest:
+    """
+    Early-exit predict_proba over a fitted sklearn RandomForestClassifier.
+
+    Each tree votes with the class distribution of the leaf a row lands in.
+    Before the next block, the leader is kept only if it still wins when
+    every remaining tree gives it its smallest possible leaf value and gives
+    each other crop its largest.
+    """
+
+    def __init__(self, forest, block_trees=EARLY_EXIT_BLOCK_TREES):
+        self.forest = forest
+        self.classes_ = forest.classes_
+        self.block_trees = max(1, block_trees)
+        self.trees = [estimator.tree_ for estimator in forest.estimators_]
+        self.n_trees = len(self.trees)
+
+        self.leaf_values = []
+        high = np.zeros((self.n_trees, len(self.classes_)))
+        low = np.zeros_like(high)
+        for t, tree in enumerate(self.trees):
+            values = tree.value[:, 0, :]
+            values = values / values.sum(axis=1, keepdims=True)
+            self.leaf_values.append(values)
+            leaves = values[tree.children_left == -1]
+            high[t], low[t] = leaves.max(axis=0), leaves.min(axis=0)
+        # Most / least each crop can still gain from the trees after the first k
+        self.remaining_high = np.concatenate([np.cumsum(high[::-1], axis=0)[::-1], np.zeros((1, len(high[0])))])
+        self.remaining_low = np.concatenate([np.cumsum(low[::-1], axis=0)[::-1], np.zeros((1, len(low[0])))])
+
+    def _settled(self, scores, evaluated):
+        leader = np.argmax(scores, axis=1)
+        rows = np.arange(len(scores))
+        worst_leader = scores[rows, leader] + self.remaining_low[evaluated, leader]
+        best_others = scores + self.remaining_high[evaluated]
+        best_others[rows, leader] = -np.inf
+        return worst_leader - best_others.max(axis=1) > _SAFETY
+
+    def predict_proba_early_exit(self, X):
+        """
+        Class probabilities averaged over the trees each row needed, and the
+        number of trees evaluated per row
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        scores = np.zeros((len(X), len(self.classes_)))
+        evaluated = np.zeros(len(X), dtype=np.intp)
+        active = np.arange(len(X))
+
+        for start in range(0, self.n_trees, self.block_trees):
+            stop = min(start + self.block_trees, self.n_trees)
+            rows = X[active]
+            for tree, values in zip(self.trees[start:stop], self.leaf_values[start:stop]):
+                scores[active] += values[tree.apply(rows)]
+            evaluated[active] = stop
+            if stop == self.n_trees:
+                break
+            active = active[~self._settled(scores[active], stop)]
+            if not len(active):
+                break
+
+        return scores / evaluated[:, None], evaluated
+
+    def lower_bound(self, probabilities, evaluated):
+        """
+        Least class probabilities the full forest could give rows scored by
+        predict_proba_early_exit: the votes so far plus the smallest leaf
+        values of the remaining trees, over every tree. Exact for rows that
+        needed every tree.
+        """
+        scores = probabilities * evaluated[:, None]
+        return (scores + self.remaining_low[evaluated]) / self.n_trees
+
+    def predict_proba(self, X):
+        """Exact full-forest probabilities"""
+        return self.forest.predict_proba(X)
+
+def early_exit_model(model, enabled=EARLY_EXIT_ENABLED):
+    """An EarlyExitForest over `model` if it is a sklearn forest and early exit is on, else None"""
+    estimators = getattr(model, 'estimators_', None)
+    if not enabled or not isinstance(estimators, list) or not estimators:
+        return None
+    if not all(hasattr(e, 'tree_') and e.n_outputs_ == 1 for e in estimators):
+        return None
+    return EarlyExitForest(model)
@@ -0,0 +1,51 @@
+"""
+Fast JSON Responses for the Crop Advisor API
+A JSONResponse rendered with orjson that serializes Pydantic models, NumPy
+arrays and NumPy scalars directly, falling back to the json module when
+orjson is not installed
+"""
+
+import json
+from collections.abc import Mapping
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    """Types neither serializer handles natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Mapping):  # e.g. the read-only catalog snapshot records
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content):
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+else:
+    def dumps(content):
+        return json.dumps(content, default=_default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """
+    Used as the app's default response class. Endpoints without a
+    response_model can return it directly with models or arrays inside the
+    content, which skips FastAPI's jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content):
+        return dumps(content)
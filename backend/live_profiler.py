@@ -0,0 +1,102 @@
+"""
+Live Profiler for the Crop Advisor API
+Samples the Python stacks of the event loop thread or the inference executor
+threads on the running server and returns them as collapsed stacks, ready
+for flamegraph.pl or speedscope
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from admin_auth import require_admin
+
+MAX_PROFILE_SECONDS = 60
+DEFAULT_INTERVAL = 0.005
+
+_profile_lock = threading.Lock()
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+def _collapse_stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+def sample_stacks(thread_names, seconds, interval=DEFAULT_INTERVAL):
+    """
+    Sample the stacks of the given threads every `interval` seconds
+
+    `thread_names` maps thread ids to the name used as the root frame.
+    Returns a Counter of collapsed stacks and the number of sampling rounds.
+    """
+    stacks = Counter()
+    rounds = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        frames = sys._current_frames()
+        for thread_id, name in thread_names.items():
+            frame = frames.get(thread_id)
+            if frame is not None:
+                stacks[f"{name};{_collapse_stack(frame)}"] += 1
+        rounds += 1
+        time.sleep(interval)
+    return stacks, rounds
+
+def format_collapsed(stacks):
+    """One `frame;frame;frame count` line per distinct stack"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+def _executor_threads(executor):
+    return {thread.ident: thread.name for thread in list(executor._threads) if thread.ident}
+
+def install_profiler(app, executors=None):
+    """
+    Add the admin-only /debug/profile endpoint to a FastAPI app
+
+    `executors` maps target names to ThreadPoolExecutors that can be profiled
+    separately from the event loop (target=loop).
+    """
+    executors = executors or {}
+    targets = ['loop'] + list(executors)
+
+    @app.get('/debug/profile', include_in_schema=False, dependencies=[Depends(require_admin)])
+    async def profile(seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+                      target: str = Query('loop'),
+                      interval: float = Query(DEFAULT_INTERVAL, ge=0.001, le=1.0)):
+        if target not in targets:
+            raise HTTPException(status_code=400, detail=f"target must be one of {targets}")
+        if target == 'loop':
+            thread_names = {threading.get_ident(): 'event-loop'}
+        else:
+            thread_names = _executor_threads(executors[target])
+            if not thread_names:
+                raise HTTPException(status_code=409,
+                                    detail=f"No {target} threads running yet, send some requests first")
+
+        if not _profile_lock.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="A profile is already running")
+        try:
+            # Sample from a default-executor thread so the loop keeps serving traffic
+            loop = asyncio.get_running_loop()
+            stacks, rounds = await loop.run_in_executor(
+                None, sample_stacks, thread_names, seconds, interval
+            )
+        finally:
+            _profile_lock.release()
+
+        return PlainTextResponse(
+            format_collapsed(stacks),
+            headers={
+                'Content-Disposition': f'attachment; filename="profile-{target}.collapsed"',
+                'X-Profile-Samples': str(rounds),
+            },
+        )
@@ -0,0 +1,122 @@
+"""
+Offline Dataset for the Crop Advisor Web App
+The crops, districts and market prices the frontend needs without a
+connection, built from the current catalog snapshot. Each build is versioned by a content
+hash, and earlier versions are kept as manifests of per-entry hashes so a
+client can be sent only the entries that changed since its version.
+"""
+
+import json
+import os
+from crop_catalog import SEASON_LABELS, WATER_LABELS, PRICES_LAST_UPDATED, crop_info
+from catalog_store import content_hash, current_catalog
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'offline_bundle_history.json')
+
+# Versions older than this many builds get the full bundle again
+MAX_HISTORY = 20
+
+SECTIONS = ('crops', 'districts', 'market_prices')
+
+def offline_crop(crop_name, crop_data):
+    info = crop_info(crop_name, crop_data)
+    return {
+        'name_en': crop_data['name_en'],
+        'name_hi': crop_data['name_hi'],
+        'emoji': crop_data['emoji'],
+        'season': SEASON_LABELS.get(info['season'], info['season']),
+        'water_requirement': WATER_LABELS.get(info['water_requirement'], info['water_requirement']),
+        'investment_per_ha': info['investment_per_ha'],
+        'expected_revenue_per_ha': info['expected_revenue_per_ha'],
+        'expected_profit_per_ha': info['expected_profit_per_ha'],
+        'profit_margin': info['profit_margin'],
+        'current_market_price': info['current_market_price'],
+        'suitable_districts': list(info['suitable_districts']),
+    }
+
+def offline_district(district_data):
+    return {
+        'name_en': district_data['district'],
+        'name_hi': district_data['district_hindi'],
+        'average_temperature': district_data.get('average_temperature'),
+        'average_rainfall': district_data.get('average_rainfall'),
+        'average_humidity': district_data.get('average_humidity'),
+        'suitable_crops': list(district_data.get('suitable_crops', [])),
+    }
+
+def offline_market_price(crop_name, crop_data):
+    return {
+        'crop': crop_name,
+        'crop_name': crop_data['name_en'],
+        'crop_name_hindi': crop_data['name_hi'],
+        'price_per_kg': crop_data['avg_price'],
+        'market_trend': crop_data['market_outlook'],
+        'last_updated': PRICES_LAST_UPDATED,
+    }
+
+def build_offline_dataset(crops=None, climate=None):
+    """Every section keyed by crop or district, so deltas can address single entries"""
+    catalog = current_catalog()
+    crops = catalog.crops if crops is None else crops
+    climate = catalog.climate if climate is None else climate
+    return {
+        'crops': {name: offline_crop(name, data) for name, data in crops.items()},
+        'districts': {name: offline_district(data) for name, data in climate.items()},
+        'market_prices': {name: offline_market_price(name, data) for name, data in crops.items()},
+    }
+
+def dataset_manifest(dataset):
+    return {section: {key: content_hash(entry) for key, entry in dataset[section].items()}
+            for section in SECTIONS}
+
+def load_history(path=HISTORY_PATH):
+    """Manifests of earlier builds, oldest first, keyed by version"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {entry['version']: entry['manifest'] for entry in json.load(f)['versions']}
+
+def save_history(history, path=HISTORY_PATH):
+    versions = list(history.items())[-MAX_HISTORY:]
+    with open(path, 'w') as f:
+        json.dump({'versions': [{'version': version, 'manifest': manifest}
+                                for version, manifest in versions]}, f, indent=2)
+
+class OfflineBundle:
+    """The current offline dataset plus the manifests needed to diff against older versions"""
+
+    def __init__(self, dataset, history=None):
+        self.dataset = dataset
+        self.manifest = dataset_manifest(dataset)
+        self.version = content_hash(self.manifest)
+        self.history = dict(history or {})
+        self.history.pop(self.version, None)
+        self.history[self.version] = self.manifest
+
+    def full(self):
+        return {'version': self.version, 'full': True, 'data': self.dataset}
+
+    def delta(self, since):
+        """Entries added or changed since `since`, and keys removed; None for an unknown version"""
+        previous = self.history.get(since)
+        if previous is None:
+            return None
+        changed, removed = {}, {}
+        for section in SECTIONS:
+            old = previous.get(section, {})
+            entries = {key: self.dataset[section][key]
+                       for key, digest in self.manifest[section].items() if old.get(key) != digest}
+            gone = [key for key in old if key not in self.manifest[section]]
+            if entries:
+                changed[section] = entries
+            if gone:
+                removed[section] = gone
+        return {'version': self.version, 'since': since, 'full': False,
+                'changed': changed, 'removed': removed}
+
+    def deltas(self):
+        """A delta from every known version, including an empty one from the current version"""
+        return {version: self.delta(version) for version in self.history}
+
+def current_bundle(path=HISTORY_PATH, crops=None, climate=None):
+    return OfflineBundle(build_offline_dataset(crops, climate), load_history(path))
@@ -0,0 +1,260 @@
+"""
+QuickScorer Inference for the Crop Recommendation Forests
+Evaluates a RandomForest (or a single decision tree) or a multi:softprob
+XGBoost classifier without walking the trees node by node. Every split is turned
+into a bitmask of the leaves it rules out. Each feature keeps its split
+thresholds in one sorted list, so one binary search per feature finds
+every split a row fails. ANDing the masks of those splits leaves the
+row's exit leaf as the lowest set bit of each tree's bitvector.
+
+Splits on the same tree and feature are stored as prefix ANDs in threshold
+order, so a row needs one mask lookup per (feature, tree) instead of one
+AND per failed split, and the lookups for a whole batch are numpy gathers.
+
+Inputs are first binned: a value's bin is the number of the forest's
+distinct thresholds on that feature below it, and every lookup after that
+works on bin indices. Batches can be binned once and scored many times as
+uint8 (uint16 for forests with more than 255 thresholds on a feature)
+instead of float64. With `max_bins` the thresholds are snapped onto at
+most that many bins, so any forest fits in uint8 at some cost in fidelity.
+"""
+
+import json
+import numpy as np
+
+WORD_BITS = 64
+ALL_LEAVES = np.uint64(0xFFFFFFFFFFFFFFFF)
+# Rows scored at a time, which bounds the (rows, trees) temporaries
+BLOCK_ROWS = 256
+
+def _leaf_order(left, right, node, leaves, splits):
+    """
+    Number the leaves under `node` left to right, appending them to `leaves`
+    and recording for every split the range of leaf numbers in its left subtree
+    """
+    if left[node] == -1:
+        leaves.append(node)
+        return
+    first = len(leaves)
+    _leaf_order(left, right, left[node], leaves, splits)
+    splits.append((node, first, len(leaves)))
+    _leaf_order(left, right, right[node], leaves, splits)
+
+def _sklearn_trees(model):
+    """(features, thresholds, left, right, leaf value rows) for each tree of a sklearn forest"""
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        estimators = [model]
+    for estimator in estimators:
+        tree = estimator.tree_
+        values = tree.value[:, 0, :]
+        # Older sklearn stores class counts, newer ones fractions; the forest averages fractions
+        values = values / values.sum(axis=1, keepdims=True)
+        yield tree.feature, tree.threshold, tree.children_left, tree.children_right, values
+
+def _xgboost_model(model, n_classes):
+    """
+    The learner config and the trees predict_proba uses, checked to be a
+    multi:softprob tree model with one group of trees per class each round
+    """
+    booster = model.get_booster()
+    learner = json.loads(booster.save_config())['learner']
+    objective = learner['objective']['name']
+    if objective != 'multi:softprob':
+        raise TypeError(f"QuickScorer can't evaluate an XGBoost {objective} model, only multi:softprob")
+    gradient_booster = json.loads(booster.save_raw('json'))['learner']['gradient_booster']
+    if gradient_booster['name'] != 'gbtree':
+        raise TypeError(f"QuickScorer can't evaluate an XGBoost {gradient_booster['name']} booster")
+
+    trees = gradient_booster['model']
+    parallel = int(trees['gbtree_model_param']['num_parallel_tree'])
+    per_round = n_classes * parallel
+    tree_info = np.array(trees['tree_info'], dtype=np.intp)
+    rounds = len(tree_info) // per_round
+    if (int(learner['learner_model_param']['num_class']) != n_classes or len(tree_info) % per_round
+            or not np.array_equal(tree_info, np.tile(np.repeat(np.arange(n_classes), parallel), rounds))):
+        raise TypeError("QuickScorer can't evaluate an XGBoost model whose trees aren't grouped by class each round")
+
+    # predict_proba stops at the best round when the model was early-stopped
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        rounds = min(rounds, best_iteration + 1)
+    return learner, trees['trees'][:rounds * per_round], tree_info[:rounds * per_round]
+
+def _xgboost_trees(trees, tree_info, n_classes):
+    """The same for an XGBoost classifier: each tree adds its leaf weight to one class"""
+    for tree, target in zip(trees, tree_info):
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        values = np.zeros((len(conditions), n_classes))
+        values[:, target] = conditions  # a leaf's "condition" is its weight
+        yield (np.array(tree['split_indices']), conditions.astype(np.float64),
+               np.array(tree['left_children']), np.array(tree['right_children']), values)
+
+def _snap_thresholds(thresholds, max_edges):
+    """Move thresholds onto at most `max_edges` values, quantiles of the thresholds themselves"""
+    if len(np.unique(thresholds)) <= max_edges:
+        return thresholds
+    edges = np.unique(np.quantile(thresholds, np.linspace(0, 1, max_edges)))
+    right = np.clip(np.searchsorted(edges, thresholds), 1, len(edges) - 1)
+    left = right - 1
+    nearest = np.where(thresholds - edges[left] <= edges[right] - thresholds, left, right)
+    return edges[nearest]
+
+def _xgboost_base_margin(learner, n_classes):
+    param = learner['learner_model_param']['base_score']
+    base = np.array(json.loads(param) if param.startswith('[') else [float(param)], dtype=np.float64)
+    return np.broadcast_to(base, (n_classes,)).copy()
+
+class QuickScorer:
+    """
+    Drop-in replacement for the wrapped model's predict / predict_proba.
+
+    Comparisons are made on float32 inputs, as sklearn and XGBoost do, so
+    predictions match the original model; probabilities may differ in the
+    last bits because the tree votes are summed in a different order.
+    With `max_bins` set the result approximates the model instead.
+    """
+
+    def __init__(self, model, max_bins=None):
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+        crop_labels = getattr(model, 'crop_labels_', None)
+        if crop_labels is not None:
+            self.crop_labels_ = crop_labels
+        n_classes = len(self.classes_)
+
+        if hasattr(model, 'get_booster'):
+            learner, xgboost_trees, tree_info = _xgboost_model(model, n_classes)
+            trees = list(_xgboost_trees(xgboost_trees, tree_info, n_classes))
+            # XGBoost goes left when x < threshold, so a split fails once threshold <= x
+            self.side = 'right'
+            self.base_margin = _xgboost_base_margin(learner, n_classes)
+        elif hasattr(model, 'tree_') or hasattr(getattr(model, 'estimators_', None), '__len__'):
+            trees = list(_sklearn_trees(model))
+            # sklearn goes left when x <= threshold, so a split fails once threshold < x
+            self.side = 'left'
+            self.base_margin = None
+        else:
+            raise TypeError(f"QuickScorer can't evaluate a {type(model).__name__}")
+
+        self.n_trees = len(trees)
+        self.max_bins = max_bins
+        self._build(trees, n_classes)
+
+    def _build(self, trees, n_classes):
+        layouts = []
+        for features, thresholds, left, right, values in trees:
+            leaves, splits = [], []
+            _leaf_order(left, right, 0, leaves, splits)
+            layouts.append((leaves, splits))
+        max_leaves = max(len(leaves) for leaves, _ in layouts)
+        self.n_words = -(-max_leaves // WORD_BITS)
+        self.max_leaves = max_leaves
+
+        # Leaf values class-major, leaves left to right within each tree;
+        # padding leaves are never reached
+        leaf_values = np.zeros((self.n_trees, max_leaves, n_classes))
+        # Every split: feature, threshold, tree and the leaves it rules out when it fails
+        split_feature, split_threshold, split_tree, split_masks = [], [], [], []
+        for t, ((features, thresholds, left, right, values), (leaves, splits)) in enumerate(
+                zip(trees, layouts)):
+            leaf_values[t, :len(leaves)] = values[leaves]
+            for node, first, last in splits:
+                bits = np.ones(self.n_words * WORD_BITS, dtype=bool)
+                bits[first:last] = False
+                split_masks.append(np.packbits(bits, bitorder='little').view(np.uint64))
+                split_feature.append(features[node])
+                split_threshold.append(thresholds[node])
+                split_tree.append(t)
+        self.leaf_values = np.ascontiguousarray(leaf_values.reshape(-1, n_classes).T)
+        split_feature = np.array(split_feature)
+        split_threshold = np.array(split_threshold, dtype=np.float64)
+        split_tree = np.array(split_tree)
+        split_masks = np.array(split_masks).reshape(-1, self.n_words)
+
+        # Per feature: the distinct thresholds (bin edges), how many of each
+        # tree's splits a value in each bin fails, and per tree the running
+        # AND of its masks in threshold order (word-major, so each word is a
+        # flat gather)
+        self.features = []
+        for feature in range(self.n_features_in_):
+            on_feature = np.flatnonzero(split_feature == feature)
+            if self.max_bins is not None:
+                split_threshold[on_feature] = _snap_thresholds(split_threshold[on_feature], self.max_bins - 1)
+            order = on_feature[np.argsort(split_threshold[on_feature], kind='stable')]
+            trees_in_order = split_tree[order]
+
+            counts = np.zeros((len(order) + 1, self.n_trees), dtype=np.uint16)
+            np.add.at(counts, (np.arange(1, len(order) + 1), trees_in_order), 1)
+            counts = np.cumsum(counts, axis=0, dtype=np.uint16)
+            # A value in bin b fails exactly the splits at or below edge b - 1
+            edges = np.unique(split_threshold[order])
+            failed = np.concatenate([[0], np.searchsorted(split_threshold[order], edges, side='right')])
+
+            per_tree = np.bincount(trees_in_order, minlength=self.n_trees)
+            offsets = np.concatenate([[0], np.cumsum(per_tree + 1)[:-1]])
+            prefix_masks = np.empty((int(per_tree.sum()) + self.n_trees, self.n_words), dtype=np.uint64)
+            prefix_masks[offsets] = ALL_LEAVES
+            position = offsets.copy()
+            for split in order:
+                t = split_tree[split]
+                prefix_masks[position[t] + 1] = prefix_masks[position[t]] & split_masks[split]
+                position[t] += 1
+
+            self.features.append((edges, counts[failed], offsets, np.ascontiguousarray(prefix_masks.T)))
+
+        most_bins = max(len(edges) + 1 for edges, _, _, _ in self.features)
+        self.bin_dtype = np.uint8 if most_bins <= 256 else np.uint16
+
+    def bin_features(self, X):
+        """Bin index of every value: how many of the forest's thresholds on its feature it passes"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        binned = np.empty(X.shape, dtype=self.bin_dtype)
+        for f, (edges, _, _, _) in enumerate(self.features):
+            binned[:, f] = np.searchsorted(edges, X[:, f], side=self.side)
+        return binned
+
+    def exit_leaves(self, X_binned, trees=slice(None)):
+        """Index of the leaf each binned row reaches in each of the selected trees, shape (rows, trees)"""
+        words = [None] * self.n_words
+        for column, (_, bin_counts, offsets, prefix_masks) in zip(X_binned.T, self.features):
+            rows = offsets[trees] + bin_counts[column][:, trees]
+            for w in range(self.n_words):
+                masks = np.take(prefix_masks[w], rows)
+                words[w] = masks if words[w] is None else words[w] & masks
+
+        # Lowest set bit of the first non-empty word, found from the last word back
+        leaves = np.zeros(words[0].shape, dtype=np.intp)
+        for w in reversed(range(self.n_words)):
+            bits = words[w]
+            lowest = (bits & (~bits + np.uint64(1))).astype(np.float64)
+            # frexp(2**k) gives exponent k + 1
+            leaves = np.where(bits != 0, w * WORD_BITS + np.frexp(lowest)[1] - 1, leaves)
+        return leaves
+
+    def class_scores(self, X_binned, trees=slice(None)):
+        """Sum of the selected trees' leaf values for each binned row, shape (rows, classes)"""
+        tree_ids = np.arange(self.n_trees)[trees]
+        flat = tree_ids * self.max_leaves + self.exit_leaves(X_binned, trees)
+        return np.stack([np.take(values, flat).sum(axis=1) for values in self.leaf_values], axis=1)
+
+    def _proba(self, scores):
+        if self.base_margin is None:
+            return scores / self.n_trees
+        margin = scores + self.base_margin
+        margin -= margin.max(axis=1, keepdims=True)
+        exp = np.exp(margin)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba_binned(self, X_binned):
+        """predict_proba for rows already passed through bin_features"""
+        return np.vstack([
+            self._proba(self.class_scores(X_binned[start:start + BLOCK_ROWS]))
+            for start in range(0, len(X_binned), BLOCK_ROWS)
+        ]) if len(X_binned) else np.empty((0, len(self.classes_)))
+
+    def predict_proba(self, X):
+        return self.predict_proba_binned(self.bin_features(X))
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
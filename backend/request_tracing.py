@@ -0,0 +1,137 @@
+"""
+Request Tracing for the Crop Advisor API
+Records span timings for a sample of requests and keeps the slowest ones,
+with their stage breakdown and input, for the admin-only /debug/slow
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from fastapi import Depends
+from admin_auth import require_admin
+
+# Fraction of requests traced; tracing costs a few microseconds per request
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.1'))
+# Number of slowest traced requests kept in memory
+SLOW_REQUEST_BUFFER = int(os.environ.get('SLOW_REQUEST_BUFFER', '50'))
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+
+class Trace:
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.attributes = {}
+
+    def add_span(self, name, seconds):
+        offset = time.perf_counter() - self.start - seconds
+        self.spans.append((name, offset, seconds))
+
+    def to_dict(self):
+        return {
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(self.duration * 1e3, 3),
+            'spans': [
+                {'name': name, 'offset_ms': round(offset * 1e3, 3),
+                 'duration_ms': round(seconds * 1e3, 3)}
+                for name, offset, seconds in self.spans
+            ],
+            **self.attributes,
+        }
+
+class SlowRequestBuffer:
+    """Keeps the `size` slowest finished traces"""
+
+    def __init__(self, size=SLOW_REQUEST_BUFFER):
+        self.size = size
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, trace):
+        entry = (trace.duration, next(self._counter), trace)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            elif trace.duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self):
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        return [trace.to_dict() for _, _, trace in entries]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+SLOW_REQUESTS = SlowRequestBuffer()
+
+def add_span(name, seconds):
+    """Record a finished span on the current request's trace, if it is sampled"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, seconds)
+
+def annotate_trace(**attributes):
+    """Attach extra fields (e.g. the request input) to the current trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+class TracingMiddleware:
+    """ASGI middleware tracing a random sample of HTTP requests"""
+
+    def __init__(self, app, sample_rate=TRACE_SAMPLE_RATE, buffer=SLOW_REQUESTS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.buffer = buffer
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope['method'], scope['path'])
+        token = _current_trace.set(trace)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                trace.status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            trace.duration = time.perf_counter() - trace.start
+            trace.route = getattr(scope.get('route'), 'path', None)
+            self.buffer.add(trace)
+
+async def slow_requests_endpoint():
+    return {
+        'sample_rate': TRACE_SAMPLE_RATE,
+        'buffer_size': SLOW_REQUESTS.size,
+        'requests': SLOW_REQUESTS.slowest(),
+    }
+
+def install_tracing(app):
+    """Add the tracing middleware and the admin-only /debug/slow endpoint to a FastAPI app"""
+    app.add_middleware(TracingMiddleware)
+    app.add_api_route('/debug/slow', slow_requests_endpoint, methods=['GET'],
+                      include_in_schema=False, dependencies=[Depends(require_admin)])
@@ -0,0 +1,82 @@
+"""
+Serving Thread Budget for the Crop Advisor API
+Models are trained with n_jobs=-1, which makes every single-row predict
+fan out across all cores through joblib. When serving, parallelism comes
+from the inference executor instead: each model call runs on one thread,
+and BLAS/OpenMP pools are capped so concurrent requests don't oversubscribe
+the CPU.
+
+What the caps save depends on the core count, so they are defaults to tune
+with the variables below rather than a fixed gain. Compare them with the
+serving.* benchmarks on the target machine (run_benchmarks.py records
+cpu_count with the results).
+"""
+
+import os
+from threadpoolctl import threadpool_limits
+from quickscorer import QuickScorer
+
+# Threads one predict call may use inside the model (joblib n_jobs)
+MODEL_N_JOBS = int(os.environ.get('MODEL_N_JOBS', '1'))
+# BLAS/OpenMP threads per process (and per inference thread, for OpenMP)
+NATIVE_THREADS = int(os.environ.get('INFERENCE_NATIVE_THREADS', '1'))
+# 'sklearn' predicts with the model as loaded, 'quickscorer' with quickscorer.py
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'sklearn')
+
+MODEL_PATH = os.path.join('..', 'ml_model', 'crop_recommendation_model.pkl')
+# Compact model distilled from the trained one (crop_recommendation_model.py --distill)
+STUDENT_MODEL_PATH = os.path.join('..', 'ml_model', 'crop_recommendation_student.pkl')
+
+def resolve_model_path():
+    """
+    Serve the distilled student unless the full model was retrained after
+    it; paths are relative to backend/, where both apps run
+    """
+    if os.path.exists(STUDENT_MODEL_PATH) and (
+        not os.path.exists(MODEL_PATH)
+        or os.path.getmtime(STUDENT_MODEL_PATH) >= os.path.getmtime(MODEL_PATH)
+    ):
+        return STUDENT_MODEL_PATH
+    return MODEL_PATH
+
+def _estimators(model):
+    """The model and every estimator nested in it (pipelines, ensembles, searches)"""
+    yield model
+    for step in getattr(model, 'steps', None) or []:
+        yield from _estimators(step[-1])
+    for attribute in ('estimator', 'best_estimator_', 'base_estimator_', 'final_estimator_'):
+        nested = getattr(model, attribute, None)
+        if nested is not None and hasattr(nested, 'get_params'):
+            yield from _estimators(nested)
+
+def configure_model(model, n_jobs=MODEL_N_JOBS):
+    """Reset the parallelism the model was trained with to the serving budget"""
+    for estimator in _estimators(model):
+        if hasattr(estimator, 'n_jobs'):
+            estimator.n_jobs = n_jobs
+        # XGBoost keeps its thread count on the booster
+        get_booster = getattr(estimator, 'get_booster', None)
+        if get_booster is not None:
+            try:
+                get_booster().set_param({'nthread': n_jobs})
+            except Exception:
+                pass
+    return model
+
+def serving_model(model, engine=INFERENCE_ENGINE):
+    """The loaded model ready to serve: thread budget applied and wrapped in the chosen engine"""
+    model = configure_model(model)
+    if engine == 'quickscorer':
+        try:
+            return QuickScorer(model)
+        except TypeError as e:
+            print(f"⚠️  {e}, serving it with sklearn")
+    return model
+
+def limit_native_threads(limit=NATIVE_THREADS):
+    """
+    Cap BLAS and OpenMP thread pools. BLAS limits are process-wide; OpenMP
+    limits apply to the calling thread, so use this as the initializer of
+    every executor that runs predictions.
+    """
+    threadpool_limits(limits=limit)
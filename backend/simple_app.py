@@ -3,20 +3,41 @@ Simplified FastAPI Backend for AI-Based Crop Recommendation System
 SIH 2025 - Jharkhand Agriculture App (No Authentication Required)
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import pickle
+import asyncio
+import hashlib
+import joblib
 import numpy as np
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 import uvicorn
+from api_metrics import (install_metrics, time_stage, observe_stage, mark_serialization_start,
+                         MODEL_LOAD_SECONDS, MODEL_INFO, INFERENCE_QUEUE_DEPTH, INFERENCE_THREADS,
+                         TREES_EVALUATED)
+from request_tracing import install_tracing, annotate_trace
+from live_profiler import install_profiler
+from fast_json import FastJSONResponse
+from compression import install_compression, PrecompressedPayload
+from cache_policy import install_cache_policy
+from crop_catalog import crop_info
+from catalog_store import load_catalog, current_catalog
+from offline_bundle import current_bundle
+from change_log import ChangeLog, catalog_entities
+from admin_auth import require_admin
+from serving_config import (serving_model, limit_native_threads, resolve_model_path,
+                            MODEL_N_JOBS, NATIVE_THREADS)
+from early_exit import early_exit_model
 
 app = FastAPI(
     title="Crop Advisor API",
     description="AI-based crop recommendation system for farmers in Jharkhand, India",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Enable CORS for React Native app
@@ -28,19 +49,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for responses above the size threshold (inside the metrics
+# middleware, so request latency includes compression)
+install_compression(app)
+# Cache-Control per route for browsers and the web app's service worker
+install_cache_policy(app)
+
+# Prometheus metrics at /metrics
+install_metrics(app)
+# Sampled request traces, slowest ones at /debug/slow (admin only)
+install_tracing(app)
+
+def model_version(path):
+    """Short content hash of the model file, reported as the model version"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
 # Try to load the trained model
 model = None
 try:
-    model_path = os.path.join('..', 'ml_model', 'crop_recommendation_model.pkl')
+    model_path = resolve_model_path()
     if os.path.exists(model_path):
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-        print("✅ Model loaded successfully!")
+        load_start = time.perf_counter()
+        # Thread budget and inference engine (INFERENCE_ENGINE) from serving_config.py
+        model = serving_model(joblib.load(model_path))
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - load_start)
+        MODEL_INFO.set(1, version=model_version(model_path), model_type=type(model).__name__)
+        print(f"✅ Model loaded successfully from {model_path}!")
     else:
         print("⚠️  Model file not found. Using fallback predictions.")
 except Exception as e:
     print(f"⚠️  Could not load model: {e}. Using fallback predictions.")
 
+# Single-row requests stop evaluating the forest once its vote is settled
+# (INFERENCE_EARLY_EXIT=0 to always use every tree)
+early_exit_forest = early_exit_model(model) if model is not None else None
+
+# Predictions run on a small thread pool so they don't block the event loop,
+# each thread single-threaded inside the model (see serving_config.py)
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', '2'))
+limit_native_threads()
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS,
+                                        thread_name_prefix='inference',
+                                        initializer=limit_native_threads)
+INFERENCE_THREADS.set(INFERENCE_WORKERS, setting='executor_workers')
+INFERENCE_THREADS.set(MODEL_N_JOBS, setting='model_n_jobs')
+INFERENCE_THREADS.set(NATIVE_THREADS, setting='native_threads')
+INFERENCE_QUEUE_DEPTH.set_function(lambda: inference_executor._work_queue.qsize())
+
+# Admin-only stack sampling of the event loop or the inference threads
+install_profiler(app, executors={'executor': inference_executor})
+
 # Pydantic models for request/response
 class CropRecommendationRequest(BaseModel):
     N: float  # Nitrogen content
@@ -57,6 +116,9 @@ class CropRecommendationResponse(BaseModel):
     sustainability_score: float
     confidence: float
     recommendations: List[str]
+    trees_evaluated: Optional[int] = None  # Forest trees used for this prediction
+    # Least confidence the full forest could give, when early exit skipped some trees
+    confidence_lower_bound: Optional[float] = None
 
 class CropPriceResponse(BaseModel):
     crop: str
@@ -64,74 +126,6 @@ class CropPriceResponse(BaseModel):
     market_trend: str
     last_updated: str
 
-# Sample crop data for Jharkhand
-JHARKHAND_CROPS_DATA = {
-    'rice': {
-        'avg_price': 25.0,
-        'season': 'खरीफ',
-        'investment_per_ha': 35000,
-        'profit_margin': 0.3,
-        'water_requirement': 'उच्च',
-        'suitable_districts': ['Ranchi / रांची', 'Dhanbad / धनबाद', 'Jamshedpur / जमशेदपुर', 'Bokaro / बोकारो']
-    },
-    'wheat': {
-        'avg_price': 22.0,
-        'season': 'रबी',
-        'investment_per_ha': 28000,
-        'profit_margin': 0.25,
-        'water_requirement': 'मध्यम',
-        'suitable_districts': ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार']
-    },
-    'maize': {
-        'avg_price': 18.0,
-        'season': 'खरीफ/रबी',
-        'investment_per_ha': 25000,
-        'profit_margin': 0.35,
-        'water_requirement': 'मध्यम',
-        'suitable_districts': ['Ranchi / रांची', 'Hazaribagh / हजारीबाग', 'Koderma / कोडरमा']
-    },
-    'cotton': {
-        'avg_price': 45.0,
-        'season': 'खरीफ',
-        'investment_per_ha': 40000,
-        'profit_margin': 0.4,
-        'water_requirement': 'मध्यम',
-        'suitable_districts': ['Palamu / पलामू', 'Garhwa / गढ़वा']
-    },
-    'sugarcane': {
-        'avg_price': 3.5,
-        'season': 'वार्षिक',
-        'investment_per_ha': 60000,
-        'profit_margin': 0.45,
-        'water_requirement': 'उच्च',
-        'suitable_districts': ['Ranchi / रांची', 'Hazaribagh / हजारीबाग']
-    },
-    'chickpea': {
-        'avg_price': 55.0,
-        'season': 'रबी',
-        'investment_per_ha': 20000,
-        'profit_margin': 0.5,
-        'water_requirement': 'कम',
-        'suitable_districts': ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार']
-    },
-    'kidney_beans': {
-        'avg_price': 80.0,
-        'season': 'रबी',
-        'investment_per_ha': 22000,
-        'profit_margin': 0.6,
-        'water_requirement': 'मध्यम',
-        'suitable_districts': ['Ranchi / रांची', 'Hazaribagh / हजारीबाग']
-    },
-    'banana': {
-        'avg_price': 15.0,
-        'season': 'वार्षिक',
-        'investment_per_ha': 45000,
-        'profit_margin': 0.4,
-        'water_requirement': 'उच्च',
-        'suitable_districts': ['Ranchi / रांची', 'Dhanbad / धनबाद']
-    }
-}
-
 def fallback_crop_prediction(N, P, K, temperature, humidity, ph, rainfall):
     """Fallback crop prediction when ML model is not available"""
     # Simple rule-based prediction
@@ -164,220 +158,180 @@ async def root():
         "model_loaded": model is not None
     }
 
+def predict_crop(input_data):
+    """
+    Predict the crop, the model's confidence, the number of trees evaluated
+    and, when early exit skipped trees, the lowest confidence the full forest
+    could give, for one input row
+    """
+    if early_exit_forest is not None:
+        probabilities, trees_evaluated = early_exit_forest.predict_proba_early_exit(input_data)
+        leader = np.argmax(probabilities[0])
+        lower_bound = None
+        if trees_evaluated[0] < early_exit_forest.n_trees:
+            lower_bound = float(early_exit_forest.lower_bound(probabilities, trees_evaluated)[0, leader])
+        return (early_exit_forest.classes_[leader], float(probabilities[0, leader]),
+                int(trees_evaluated[0]), lower_bound)
+
+    trees_evaluated = None
+    if model is not None:
+        crop_prediction = model.predict(input_data)[0]
+        # Models trained on label codes (XGBoost) carry the crop names
+        crop_labels = getattr(model, 'crop_labels_', None)
+        if crop_labels is not None:
+            crop_prediction = str(crop_labels[int(crop_prediction)])
+        try:
+            probabilities = model.predict_proba(input_data)[0]
+            confidence = float(np.max(probabilities))
+        except:
+            confidence = 0.85
+        trees_evaluated = getattr(model, 'n_trees', None) or len(getattr(model, 'estimators_', [])) or None
+    else:
+        crop_prediction = fallback_crop_prediction(*input_data[0])
+        confidence = 0.75  # Lower confidence for rule-based prediction
+    return crop_prediction, confidence, trees_evaluated, None
+
+def compute_yield_and_sustainability(request, crop_prediction):
+    """Simulated yield (kg/ha) and sustainability score (1-10) for a prediction"""
+    # Calculate yield
+    base_yield = (request.N + request.P + request.K) / 10 * (request.humidity / 100)
+    yield_multipliers = {
+        'rice': 1.2, 'wheat': 1.0, 'maize': 1.3, 'cotton': 0.8,
+        'sugarcane': 2.5, 'chickpea': 0.7, 'kidney_beans': 0.6,
+        'banana': 1.1
+    }
+    
+    multiplier = yield_multipliers.get(crop_prediction, 1.0)
+    predicted_yield = base_yield * multiplier * np.random.uniform(0.8, 1.2)
+    predicted_yield = max(500, min(8000, predicted_yield))
+    
+    # Calculate sustainability score
+    water_score = max(0, 10 - (request.rainfall / 200))
+    fertilizer_score = max(0, 10 - (request.N / 100))
+    ph_score = 10 if 6.0 <= request.ph <= 7.5 else max(0, 10 - abs(request.ph - 6.75) * 2)
+    
+    sustainability_score = (water_score + fertilizer_score + ph_score) / 3
+    sustainability_score = max(1, min(10, sustainability_score))
+    
+    return predicted_yield, sustainability_score
+
+def build_recommendations(request, crop_prediction):
+    """Generate recommendations in English with Hindi translations"""
+    recommendations = []
+    crop_data = current_catalog().crops.get(crop_prediction, {})
+    
+    if crop_data:
+        recommendations.append(f"Best season for {crop_prediction}: {crop_data.get('season', 'N/A')}")
+        recommendations.append(f"Water requirement: {crop_data.get('water_requirement', 'Medium')}")
+        recommendations.append(f"Expected investment: ₹{crop_data.get('investment_per_ha', 0):,} per hectare")
+        
+        suitable_districts = crop_data.get('suitable_districts', [])
+        if suitable_districts:
+            recommendations.append(f"Suitable districts: {', '.join(suitable_districts)}")
+    
+    # Add soil-specific recommendations
+    if request.ph < 6.0:
+        recommendations.append("Add lime to increase soil pH (मिट्टी का pH बढ़ाने के लिए चूना मिलाएं)")
+    elif request.ph > 7.5:
+        recommendations.append("Add organic matter to reduce soil pH (मिट्टी का pH कम करने के लिए जैविक खाद मिलाएं)")
+        
+    if request.N < 40:
+        recommendations.append("Use nitrogen-rich fertilizers or compost (नाइट्रोजन युक्त उर्वरक या कंपोस्ट का उपयोग करें)")
+    
+    return recommendations
+
 @app.post("/recommend-crop", response_model=CropRecommendationResponse)
-async def recommend_crop(request: CropRecommendationRequest):
+async def recommend_crop(request: CropRecommendationRequest, http_request: Request):
     """
     Recommend the best crop based on soil and climate conditions
     """
+    # Body parsing and validation happen before the endpoint is called
+    observe_stage('validation', time.perf_counter() - http_request.state.request_start)
+    annotate_trace(input=request.model_dump())
+    
     try:
         # Prepare input data
-        input_data = np.array([[
-            request.N, request.P, request.K, 
-            request.temperature, request.humidity, 
-            request.ph, request.rainfall
-        ]])
-        
-        # Get prediction
-        if model is not None:
-            crop_prediction = model.predict(input_data)[0]
-            try:
-                probabilities = model.predict_proba(input_data)[0]
-                confidence = float(np.max(probabilities))
-            except:
-                confidence = 0.85
-        else:
-            crop_prediction = fallback_crop_prediction(
+        with time_stage('array_build'):
+            input_data = np.array([[
                 request.N, request.P, request.K, 
                 request.temperature, request.humidity, 
                 request.ph, request.rainfall
-            )
-            confidence = 0.75  # Lower confidence for rule-based prediction
-        
-        # Calculate yield
-        base_yield = (request.N + request.P + request.K) / 10 * (request.humidity / 100)
-        yield_multipliers = {
-            'rice': 1.2, 'wheat': 1.0, 'maize': 1.3, 'cotton': 0.8,
-            'sugarcane': 2.5, 'chickpea': 0.7, 'kidney_beans': 0.6,
-            'banana': 1.1
-        }
-        
-        multiplier = yield_multipliers.get(crop_prediction, 1.0)
-        predicted_yield = base_yield * multiplier * np.random.uniform(0.8, 1.2)
-        predicted_yield = max(500, min(8000, predicted_yield))
-        
-        # Calculate sustainability score
-        water_score = max(0, 10 - (request.rainfall / 200))
-        fertilizer_score = max(0, 10 - (request.N / 100))
-        ph_score = 10 if 6.0 <= request.ph <= 7.5 else max(0, 10 - abs(request.ph - 6.75) * 2)
-        
-        sustainability_score = (water_score + fertilizer_score + ph_score) / 3
-        sustainability_score = max(1, min(10, sustainability_score))
+            ]])
         
-        # Generate recommendations in English with Hindi translations
-        recommendations = []
-        crop_data = JHARKHAND_CROPS_DATA.get(crop_prediction, {})
+        # Get prediction
+        with time_stage('inference'):
+            loop = asyncio.get_running_loop()
+            crop_prediction, confidence, trees_evaluated, confidence_lower_bound = await loop.run_in_executor(
+                inference_executor, predict_crop, input_data
+            )
+        if trees_evaluated is not None:
+            TREES_EVALUATED.observe(trees_evaluated)
+            annotate_trace(trees_evaluated=trees_evaluated)
         
-        if crop_data:
-            recommendations.append(f"Best season for {crop_prediction}: {crop_data.get('season', 'N/A')}")
-            recommendations.append(f"Water requirement: {crop_data.get('water_requirement', 'Medium')}")
-            recommendations.append(f"Expected investment: ₹{crop_data.get('investment_per_ha', 0):,} per hectare")
-            
-            suitable_districts = crop_data.get('suitable_districts', [])
-            if suitable_districts:
-                recommendations.append(f"Suitable districts: {', '.join(suitable_districts)}")
+        with time_stage('yield_sustainability'):
+            predicted_yield, sustainability_score = compute_yield_and_sustainability(
+                request, crop_prediction
+            )
         
-        # Add soil-specific recommendations
-        if request.ph < 6.0:
-            recommendations.append("Add lime to increase soil pH (मिट्टी का pH बढ़ाने के लिए चूना मिलाएं)")
-        elif request.ph > 7.5:
-            recommendations.append("Add organic matter to reduce soil pH (मिट्टी का pH कम करने के लिए जैविक खाद मिलाएं)")
-            
-        if request.N < 40:
-            recommendations.append("Use nitrogen-rich fertilizers or compost (नाइट्रोजन युक्त उर्वरक या कंपोस्ट का उपयोग करें)")
+        with time_stage('recommendations'):
+            recommendations = build_recommendations(request, crop_prediction)
         
+        mark_serialization_start(http_request)
         return CropRecommendationResponse(
             crop=crop_prediction,
             predicted_yield_kg_per_ha=round(predicted_yield, 2),
             sustainability_score=round(sustainability_score, 2),
             confidence=round(confidence, 3),
-            recommendations=recommendations
+            recommendations=recommendations,
+            trees_evaluated=trees_evaluated,
+            confidence_lower_bound=(round(confidence_lower_bound, 3)
+                                    if confidence_lower_bound is not None else None)
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.get("/climate-data")
+async def get_climate_table(request: Request):
+    """
+    Get climate data for every district in Jharkhand
+    """
+    return STATIC_PAYLOADS['climate_table'].response(request)
+
 @app.get("/climate-data/{district}")
-async def get_climate_data(district: str):
+async def get_climate_data(district: str, request: Request):
     """
     Get climate data for a specific district in Jharkhand
     """
+    payload = STATIC_PAYLOADS['climate'].get(district.capitalize())
     
-    # Sample climate data for Jharkhand districts with bilingual names
-    climate_data = {
-        "Ranchi": {
-            "district": "Ranchi",
-            "district_hindi": "रांची", 
-            "district_bilingual": "Ranchi / रांची",
-            "average_temperature": 24,      # Change temperature here (°C)
-            "average_rainfall": 1200,       # Change rainfall here (mm/year)
-            "average_humidity": 75,         # Change humidity here (%)
-            "suitable_crops": ["rice", "maize", "wheat", "sugarcane"]  # Add/remove crops
-        },
-        "Dhanbad": {
-            "district": "Dhanbad",
-            "district_hindi": "धनबाद",
-            "district_bilingual": "Dhanbad / धनबाद",
-            "average_temperature": 26,
-            "average_rainfall": 1100,
-            "average_humidity": 70,
-            "suitable_crops": ["rice", "maize", "cotton"]
-        },
-        "Jamshedpur": {
-            "district": "Jamshedpur",
-            "district_hindi": "जमशेदपुर",
-            "district_bilingual": "Jamshedpur / जमशेदपुर",
-            "average_temperature": 27,
-            "average_rainfall": 1300,
-            "average_humidity": 75,
-            "suitable_crops": ["rice", "maize", "wheat"]
-        },
-        "Bokaro": {
-            "district": "Bokaro",
-            "district_hindi": "बोकारो",
-            "district_bilingual": "Bokaro / बोकारो",
-            "average_temperature": 25,
-            "average_rainfall": 1150,
-            "average_humidity": 70,
-            "suitable_crops": ["rice", "maize", "cotton"]
-        },
-        "Hazaribagh": {
-            "district": "Hazaribagh",
-            "district_hindi": "हजारीबाग",
-            "district_bilingual": "Hazaribagh / हजारीबाग",
-            "average_temperature": 23,
-            "average_rainfall": 1000,
-            "average_humidity": 75,
-            "suitable_crops": ["rice", "wheat", "maize"]
-        },
-        "Palamu": {
-            "district": "Palamu",
-            "district_hindi": "पलामू",
-            "district_bilingual": "Palamu / पलामू",
-            "average_temperature": 25,
-            "average_rainfall": 900,
-            "average_humidity": 65,
-            "suitable_crops": ["wheat", "maize", "cotton"]
-        },
-        "Garhwa": {
-            "district": "Garhwa",
-            "district_hindi": "गढ़वा",
-            "district_bilingual": "Garhwa / गढ़वा",
-            "average_temperature": 24,
-            "average_rainfall": 950,
-            "average_humidity": 68,
-            "suitable_crops": ["wheat", "maize", "cotton"]
-        },
-        "Koderma": {
-            "district": "Koderma",
-            "district_hindi": "कोडरमा",
-            "district_bilingual": "Koderma / कोडरमा",
-            "average_temperature": 24,
-            "average_rainfall": 1050,
-            "average_humidity": 72,
-            "suitable_crops": ["rice", "maize", "wheat"]
-        },
-        "Deoghar": {
-            "district": "Deoghar",
-            "district_hindi": "देवघर",
-            "district_bilingual": "Deoghar / देवघर",
-            "average_temperature": 25,
-            "average_rainfall": 1100,
-            "average_humidity": 73,
-            "suitable_crops": ["rice", "maize", "wheat", "chickpea"]
-        },
-        "Dumka": {
-            "district": "Dumka",
-            "district_hindi": "दुमका",
-            "district_bilingual": "Dumka / दुमका",
-            "average_temperature": 26,
-            "average_rainfall": 1250,
-            "average_humidity": 78,
-            "suitable_crops": ["rice", "maize", "banana", "sugarcane"]
-        },
-        "Latehar": {
-            "district": "Latehar",
-            "district_hindi": "लातेहार",
-            "district_bilingual": "Latehar / लातेहार",
-            "average_rainfall": 900,
-            "average_humidity": 70,
-            "suitable_crops": ["rice", "maize", "wheat"]
-        },
-        "Hazaribagh": {
-            "district": "Hazaribagh",
-            "district_hindi": "हजारीबाग",
-            "district_bilingual": "Hazaribagh / हजारीबाग",
-            "average_temperature": 26,
-            "average_rainfall": 1000,
-            "average_humidity": 75,
-            "suitable_crops": ["rice", "maize", "wheat"]
-        },
-        "Kodarma": {
-            "district": "Kodarma",
-            "district_hindi": "कोडरमा",
-            "district_bilingual": "Kodarma / कोडरमा",
-            "average_temperature": 27,
-            "average_rainfall": 800,
-            "average_humidity": 70,
-            "suitable_crops": ["rice", "maize", "wheat"]
-        }
-    }
-    
-    district_data = climate_data.get(district.capitalize())
-    
-    if not district_data:
+    if not payload:
         raise HTTPException(status_code=404, detail="District not found")
     
-    return district_data
+    return payload.response(request)
+
+@app.get("/districts")
+async def get_districts(request: Request):
+    """
+    Get list of all districts in Jharkhand
+    """
+    return STATIC_PAYLOADS['districts'].response(request)
+
+@app.get("/crops")
+async def find_crops(district: Optional[str] = None, season: Optional[str] = None,
+                     water: Optional[str] = None):
+    """
+    Crops suitable for a district, season and/or water availability,
+    e.g. /crops?district=Ranchi&season=Rabi&water=Low
+    """
+    crops = current_catalog().index.crops_for(district=district, season=season, water=water)
+    return {
+        "district": district,
+        "season": season,
+        "water": water,
+        "crops": crops,
+        "total_crops": len(crops)
+    }
 
 @app.get("/crop-prices")
 async def get_crop_prices():
@@ -385,7 +339,7 @@ async def get_crop_prices():
     Get current crop prices in Jharkhand markets
     """
     prices = []
-    for crop, data in JHARKHAND_CROPS_DATA.items():
+    for crop, data in current_catalog().crops.items():
         # Simulate price fluctuation (±10%)
         base_price = data['avg_price']
         current_price = base_price * np.random.uniform(0.9, 1.1)
@@ -400,55 +354,28 @@ async def get_crop_prices():
             last_updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         ))
     
-    return {"prices": prices}
+    # Returned directly so the price models are serialized by orjson
+    # instead of going through jsonable_encoder first
+    return FastJSONResponse({"prices": prices})
 
 @app.get("/crop-info/{crop_name}")
-async def get_crop_info(crop_name: str):
+async def get_crop_info(crop_name: str, request: Request):
     """
     Get detailed information about a specific crop
     """
-    crop_data = JHARKHAND_CROPS_DATA.get(crop_name.lower())
+    payload = STATIC_PAYLOADS['crop_info'].get(crop_name.lower())
     
-    if not crop_data:
+    if not payload:
         raise HTTPException(status_code=404, detail="Crop not found")
     
-    # Calculate potential profit
-    investment = crop_data['investment_per_ha']
-    profit_margin = crop_data['profit_margin']
-    avg_yield = 2000  # kg/ha (example)
-    revenue = avg_yield * crop_data['avg_price']
-    profit = revenue * profit_margin
-    
-    return {
-        "crop": crop_name,
-        "season": crop_data['season'],
-        "investment_per_ha": investment,
-        "expected_revenue_per_ha": revenue,
-        "expected_profit_per_ha": profit,
-        "profit_margin": f"{profit_margin * 100}%",
-        "water_requirement": crop_data['water_requirement'],
-        "suitable_districts": crop_data['suitable_districts'],
-        "current_market_price": crop_data['avg_price']
-    }
-
-JHARKHAND_CROPS_DATA = {
-    'rice': {
-        'season': 'Kharif',
-        'water_requirement': 'High',
-        'investment_per_ha': 45000,
-        'avg_price': 25.50,
-        'profit_margin': 0.4,
-        'suitable_districts': ['Ranchi / रांची', 'Dhanbad / धनबाद', 'Hazaribagh / हजारीबाग']
-    },
-    # ... other crops data ...
-}
+    return payload.response(request)
 
 @app.get("/investment-analysis/{crop_name}")
 async def get_investment_analysis(crop_name: str, area_hectares: float = 1.0):
     """
     Get detailed investment and profit analysis for a crop
     """
-    crop_data = JHARKHAND_CROPS_DATA.get(crop_name.lower())
+    crop_data = current_catalog().crops.get(crop_name.lower())
     
     if not crop_data:
         raise HTTPException(status_code=404, detail="Crop not found")
@@ -484,6 +411,28 @@ async def get_investment_analysis(crop_name: str, area_hectares: float = 1.0):
         "risk_level": "मध्यम"
     }
 
+@app.get("/offline-bundle")
+async def get_offline_bundle(request: Request, since: Optional[str] = None):
+    """
+    Offline dataset for the web app, or only the entries changed since the
+    client's version. Unknown or expired versions get the full dataset.
+    """
+    payloads = STATIC_PAYLOADS['offline_bundle']
+    return payloads.get(since, payloads[None]).response(request)
+
+@app.get("/sync")
+async def sync_catalog(request: Request, since: Optional[str] = None):
+    """
+    Crops, prices and district climate changed since the client's version,
+    in one response. Clients without a known version get everything.
+    """
+    payloads = STATIC_PAYLOADS['sync']
+    # Keyed by sequence number, so arbitrary `since` values can't grow the cache
+    key = CHANGE_LOG.sequence_of(since)
+    if key not in payloads:
+        payloads[key] = PrecompressedPayload(CHANGE_LOG.changes_since(since))
+    return payloads[key].response(request)
+
 @app.get("/health")
 async def health_check():
     """
@@ -496,6 +445,58 @@ async def health_check():
         "message": "Crop Advisor API is running successfully!"
     }
 
+def build_static_payloads():
+    """
+    Serialize and compress the responses that only change with the data, so
+    each request just picks the encoding the client accepts
+    """
+    global STATIC_PAYLOADS
+    catalog = current_catalog()
+    changes = CHANGE_LOG.record_snapshot(catalog_entities(catalog.crops, catalog.climate))
+    offline = current_bundle(crops=catalog.crops, climate=catalog.climate)
+    # Built completely before being swapped in, so requests during a reload
+    # see either the old payloads or the new ones
+    STATIC_PAYLOADS = {
+        'climate': {district: PrecompressedPayload(data) for district, data in catalog.climate.items()},
+        'climate_table': PrecompressedPayload({"districts": catalog.climate}),
+        'districts': PrecompressedPayload({
+            "districts": list(catalog.climate.keys()),
+            "total_districts": len(catalog.climate)
+        }),
+        'crop_info': {crop: PrecompressedPayload(crop_info(crop, data))
+                      for crop, data in catalog.crops.items()},
+        'sync': {},
+        'offline_bundle': {
+            None: PrecompressedPayload(offline.full()),
+            **{version: PrecompressedPayload(delta) for version, delta in offline.deltas().items()},
+        },
+    }
+    return changes
+
+def reload_catalog():
+    """Load a new catalog snapshot from the database and rebuild everything derived from it"""
+    catalog = load_catalog()
+    changes = build_static_payloads()
+    return {
+        "version": catalog.version,
+        "crops": len(catalog.crops),
+        "districts": len(catalog.climate),
+        "changes": changes,
+        "load_ms": round(catalog.load_seconds * 1000, 2),
+    }
+
+@app.post("/admin/reload-catalog", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def reload_catalog_endpoint():
+    """
+    Reload the crop catalog after its database was updated
+    """
+    # Compressing the payloads takes a while, keep it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, reload_catalog)
+
+load_catalog()
+CHANGE_LOG = ChangeLog()
+build_static_payloads()
+
 if __name__ == "__main__":
     print("🌾 Starting Crop Advisor API Server...")
     print("📡 API will be available at: http://localhost:8000")
@@ -0,0 +1,405 @@
+"""
+Micro-benchmarks for the Crop Advisor inference and scoring hot path
+Times model prediction, yield/sustainability scoring, response construction,
+JSON serialization and the rule-based fallback, and compares the results
+against a stored baseline. The suite runs several times and each benchmark
+keeps the median of its runs. A slowdown is reported when it exceeds the
+threshold plus the run-to-run spread of the two measurements, with the
+spread allowance capped at the threshold itself; benchmarks noisier than
+that are listed as unreliable rather than given a wider tolerance.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --threshold 0.2
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+import joblib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'backend')
+ML_MODEL_DIR = os.path.join(ROOT_DIR, 'ml_model')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, ML_MODEL_DIR)
+
+from train_model_simple import CROPS_DATA, FEATURES, generate_crop_sample
+
+BATCH_SIZE = 1000
+BENCHMARKS = []
+
+def benchmark(name):
+    """Register a setup function returning the callable to time"""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+def measure(fn, repeat=5, min_time=0.2):
+    """
+    Best time per call in microseconds, timeit style: the loop count is
+    doubled until one run takes at least `min_time`, then the fastest of
+    `repeat` runs is kept
+    """
+    fn()  # warm up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    return min(timings) * 1e6
+
+def sample_inputs(n, seed=0):
+    """Feature rows drawn from the training ranges of every crop"""
+    rng = np.random.default_rng(seed)
+    crops = list(CROPS_DATA)
+    rows = []
+    for i in range(n):
+        crop = crops[i % len(crops)]
+        sample = generate_crop_sample(crop, CROPS_DATA[crop], rng=rng)
+        rows.append([sample[feature] for feature in FEATURES])
+    return np.array(rows)
+
+def load_api():
+    """Import backend/simple_app.py the way the server does (it loads the model relative to backend/)"""
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        import simple_app
+    finally:
+        os.chdir(cwd)
+    return simple_app
+
+def saved_models():
+    """Every crop model pickled in ml_model/, keyed by file name"""
+    models = {}
+    for path in sorted(glob.glob(os.path.join(ML_MODEL_DIR, 'crop_recommendation_*.pkl'))):
+        models[os.path.basename(path)] = joblib.load(path)
+    return models
+
+def model_benchmarks(models, X):
+    """
+    predict / predict_proba on one row and on a batch for each saved model,
+    and predict_proba through the QuickScorer engine for the tree models
+    """
+    from quickscorer import QuickScorer
+    row, batch = X[:1], X[:BATCH_SIZE]
+    for filename, model in models.items():
+        label = f"model[{filename[:-4]}:{type(model).__name__}]"
+        yield f"{label}.predict.single_row", lambda m=model: m.predict(row)
+        yield f"{label}.predict.batch_{BATCH_SIZE}", lambda m=model: m.predict(batch)
+        if hasattr(model, 'predict_proba'):
+            yield f"{label}.predict_proba.single_row", lambda m=model: m.predict_proba(row)
+            yield f"{label}.predict_proba.batch_{BATCH_SIZE}", lambda m=model: m.predict_proba(batch)
+
+        try:
+            scorer = QuickScorer(model)
+        except TypeError:
+            continue
+        # Parity with the model it replaces, on the training ranges and well outside them
+        wide = np.vstack([batch, batch * 3 - batch.mean(axis=0)])
+        assert np.array_equal(scorer.predict(wide), model.predict(wide)), "QuickScorer predictions differ"
+        assert np.allclose(scorer.predict_proba(wide), model.predict_proba(wide), atol=1e-6), \
+            "QuickScorer probabilities differ"
+        yield f"{label}.quickscorer.predict_proba.single_row", lambda s=scorer: s.predict_proba(row)
+        yield f"{label}.quickscorer.predict_proba.batch_{BATCH_SIZE}", lambda s=scorer: s.predict_proba(batch)
+
+        # Pre-binned batches: exact bins (uint8 or uint16) and at most 256 bins (uint8)
+        binned = scorer.bin_features(batch)
+        assert np.array_equal(scorer.predict_proba_binned(binned), scorer.predict_proba(batch))
+        yield f"{label}.quickscorer.bin_features.batch_{BATCH_SIZE}", lambda s=scorer: s.bin_features(batch)
+        yield (f"{label}.quickscorer.predict_proba_binned.batch_{BATCH_SIZE}",
+               lambda s=scorer, b=binned: s.predict_proba_binned(b))
+        scorer_256 = QuickScorer(model, max_bins=256)
+        binned_256 = scorer_256.bin_features(batch)
+        agreement = np.mean(scorer_256.predict(wide) == model.predict(wide))
+        print(f"🗜️  {label}: exact bins are {binned.dtype}, 256 bins are {binned_256.dtype} "
+              f"({batch.nbytes // binned_256.nbytes}x smaller than float64) and agree on {agreement:.1%}")
+        yield (f"{label}.quickscorer_256_bins.predict_proba_binned.batch_{BATCH_SIZE}",
+               lambda s=scorer_256, b=binned_256: s.predict_proba_binned(b))
+
+CONCURRENT_REQUESTS = 16
+
+def serving_benchmarks(api, X):
+    """
+    The served model's predict_proba as saved by training (n_jobs=-1) and
+    with the serving thread budget, one row at a time and as concurrent
+    requests through an inference executor
+    """
+    if api.model is None:
+        return
+    from concurrent.futures import ThreadPoolExecutor, wait
+    from serving_config import limit_native_threads
+
+    saved = joblib.load(os.path.join(BACKEND_DIR, api.model_path))
+    row = X[:1]
+    variants = {
+        'saved_n_jobs': (saved, ThreadPoolExecutor(api.INFERENCE_WORKERS)),
+        'serving_budget': (api.model, ThreadPoolExecutor(api.INFERENCE_WORKERS,
+                                                         initializer=limit_native_threads)),
+    }
+    for variant, (model, executor) in variants.items():
+        yield f"serving.single_row.{variant}", lambda m=model: m.predict_proba(row)
+
+    if api.early_exit_forest is not None:
+        forest = api.early_exit_forest
+        probabilities, evaluated = forest.predict_proba_early_exit(X)
+        assert np.array_equal(forest.classes_[probabilities.argmax(axis=1)], api.model.predict(X)), \
+            "early exit changed a prediction"
+        print(f"🌲 Early exit evaluates {evaluated.mean():.0f} of {forest.n_trees} trees on average")
+        yield "serving.single_row.early_exit", lambda: forest.predict_proba_early_exit(row)
+
+    def concurrent(model, executor):
+        wait([executor.submit(model.predict_proba, X[i:i + 1]) for i in range(CONCURRENT_REQUESTS)])
+
+    for variant, (model, executor) in variants.items():
+        yield (f"serving.concurrent_{CONCURRENT_REQUESTS}x{api.INFERENCE_WORKERS}.{variant}",
+               lambda m=model, e=executor: concurrent(m, e))
+
+@benchmark('api.yield_sustainability')
+def bench_yield(api, X):
+    request = api.CropRecommendationRequest(**dict(zip(FEATURES, X[0])))
+    return lambda: api.compute_yield_and_sustainability(request, 'rice')
+
+@benchmark('api.recommendations')
+def bench_recommendations(api, X):
+    request = api.CropRecommendationRequest(**dict(zip(FEATURES, X[0])))
+    return lambda: api.build_recommendations(request, 'rice')
+
+@benchmark('api.request_validation')
+def bench_request_validation(api, X):
+    body = dict(zip(FEATURES, X[0].tolist()))
+    return lambda: api.CropRecommendationRequest(**body)
+
+def _response(api):
+    return api.CropRecommendationResponse(
+        crop='rice',
+        predicted_yield_kg_per_ha=4321.5,
+        sustainability_score=7.25,
+        confidence=0.93,
+        recommendations=api.build_recommendations(
+            api.CropRecommendationRequest(N=90, P=42, K=43, temperature=21,
+                                          humidity=82, ph=5.5, rainfall=203), 'rice'),
+    )
+
+@benchmark('api.response_construction')
+def bench_response_construction(api, X):
+    response = _response(api)
+    fields = response.model_dump()
+    return lambda: api.CropRecommendationResponse(**fields)
+
+@benchmark('api.json_serialization')
+def bench_json_serialization(api, X):
+    # The path FastAPI takes for a response_model endpoint returning a model
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    response = _response(api)
+    return lambda: JSONResponse(content=jsonable_encoder(response)).body
+
+@benchmark('api.json_serialization.fast')
+def bench_fast_json_serialization(api, X):
+    from fast_json import FastJSONResponse
+    response = _response(api)
+    return lambda: FastJSONResponse(content=response).body
+
+def _prices(api, n=BATCH_SIZE):
+    crops = list(CROPS_DATA)
+    return [api.CropPriceResponse(crop=crops[i % len(crops)], current_price_per_kg=20 + i % 7,
+                                  market_trend='stable', last_updated='2025-09-01 10:00:00')
+            for i in range(n)]
+
+@benchmark(f'api.bulk_prices_{BATCH_SIZE}.stdlib')
+def bench_bulk_stdlib(api, X):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    prices = _prices(api)
+    return lambda: JSONResponse(content=jsonable_encoder({'prices': prices})).body
+
+@benchmark(f'api.bulk_prices_{BATCH_SIZE}.fast')
+def bench_bulk_fast(api, X):
+    from fast_json import FastJSONResponse
+    prices = _prices(api)
+    return lambda: FastJSONResponse(content={'prices': prices}).body
+
+@benchmark(f'api.probabilities_{BATCH_SIZE}.stdlib')
+def bench_numpy_stdlib(api, X):
+    from fastapi.responses import JSONResponse
+    probabilities = np.random.default_rng(0).dirichlet(np.ones(len(CROPS_DATA)), size=BATCH_SIZE)
+    return lambda: JSONResponse(content={'probabilities': probabilities.tolist()}).body
+
+@benchmark(f'api.probabilities_{BATCH_SIZE}.fast')
+def bench_numpy_fast(api, X):
+    from fast_json import FastJSONResponse
+    probabilities = np.random.default_rng(0).dirichlet(np.ones(len(CROPS_DATA)), size=BATCH_SIZE)
+    return lambda: FastJSONResponse(content={'probabilities': probabilities}).body
+
+SYNTHETIC_CROPS = 500
+SEASONS = ['खरीफ', 'रबी', 'वार्षिक']
+WATER_NEEDS = ['उच्च', 'मध्यम', 'कम']
+
+def _synthetic_catalog(api, n_crops=SYNTHETIC_CROPS, seed=0):
+    """A catalog the size the store is meant to hold, over the real districts"""
+    rng = np.random.default_rng(seed)
+    climate = dict(api.current_catalog().climate)
+    labels = [data['district_bilingual'] for data in climate.values()]
+    crops = {}
+    for i in range(n_crops):
+        districts = rng.choice(labels, size=int(rng.integers(1, 6)), replace=False)
+        crops[f"crop_{i}"] = {'season': SEASONS[i % len(SEASONS)],
+                              'water_requirement': WATER_NEEDS[i % len(WATER_NEEDS)],
+                              'suitable_districts': [str(d) for d in districts]}
+    return crops, climate
+
+def _scan_crops(crops, district_label, season, water):
+    # The per-request scan the index replaces
+    return [crop for crop, data in crops.items()
+            if district_label in data['suitable_districts']
+            and data['season'] == season and data['water_requirement'] == water]
+
+@benchmark(f'catalog_{SYNTHETIC_CROPS}.crops_for.scan')
+def bench_catalog_scan(api, X):
+    crops, _ = _synthetic_catalog(api)
+    return lambda: _scan_crops(crops, 'Ranchi / रांची', 'रबी', 'कम')
+
+@benchmark(f'catalog_{SYNTHETIC_CROPS}.crops_for.index')
+def bench_catalog_index(api, X):
+    from catalog_index import CatalogIndex
+    from crop_catalog import SEASON_LABELS, WATER_LABELS
+    crops, climate = _synthetic_catalog(api)
+    index = CatalogIndex(crops, climate, SEASON_LABELS, WATER_LABELS)
+    expected = _scan_crops(crops, 'Ranchi / रांची', 'रबी', 'कम')
+    assert index.crops_for(district='Ranchi', season='Rabi', water='Low') == expected, "index disagrees with scan"
+    return lambda: index.crops_for(district='Ranchi', season='Rabi', water='Low')
+
+@benchmark('api.fallback_crop_prediction')
+def bench_fallback(api, X):
+    row = X[0].tolist()
+    return lambda: api.fallback_crop_prediction(*row)
+
+def run_benchmarks(name_filter=None, repeat=5, runs=3):
+    """
+    Median time per call of every benchmark over `runs` passes of the suite,
+    and its spread: (slowest - fastest) / median
+    """
+    X = sample_inputs(BATCH_SIZE)
+    api = load_api()
+
+    cases = list(model_benchmarks(saved_models(), X))
+    cases += list(serving_benchmarks(api, X))
+    cases += [(name, setup(api, X)) for name, setup in BENCHMARKS]
+    if not any(name.startswith('model[') for name, _ in cases):
+        print("⚠️  No saved models in ml_model/, run train_model_simple.py to benchmark them")
+
+    cases = [(name, fn) for name, fn in cases if not name_filter or name_filter in name]
+    timings = {name: [] for name, _ in cases}
+    # Whole passes rather than back-to-back runs, so a slow patch on the
+    # machine doesn't land on every run of one benchmark
+    for run in range(runs):
+        print(f"Run {run + 1}/{runs}")
+        for name, fn in cases:
+            timings[name].append(measure(fn, repeat=repeat))
+            print(f"{name:<80} {timings[name][-1]:>12.2f} us")
+
+    results = {name: float(np.median(times)) for name, times in timings.items()}
+    spread = {name: float((max(times) - min(times)) / results[name]) for name, times in timings.items()}
+    return results, spread
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+def compare_results(baseline, results, threshold, baseline_spread=None, spread=None):
+    """
+    Print the change per benchmark and return the names slower than
+    `threshold` plus the larger run-to-run spread of the two measurements
+    (at most `threshold` again), and the names whose spread exceeds
+    `threshold`, too noisy to judge
+    """
+    baseline_spread, spread = baseline_spread or {}, spread or {}
+    regressions, unreliable = [], []
+    print(f"\n{'Benchmark':<80} {'Baseline us':>12} {'Current us':>12} {'Change':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<80} {'-':>12} {current:>12.2f} {'new':>8}")
+            continue
+        change = current / previous - 1
+        noise = max(baseline_spread.get(name, 0.0), spread.get(name, 0.0))
+        flag = ''
+        if change > threshold + min(noise, threshold):
+            regressions.append(name)
+            flag = '  ❌ regression'
+        elif change < -threshold:
+            flag = '  ✅ faster'
+        if noise > threshold:
+            unreliable.append(name)
+            flag += f'  ⚠️ unreliable (spread {noise:.0%})'
+        print(f"{name:<80} {previous:>12.2f} {current:>12.2f} {change:>+8.1%}{flag}")
+    return regressions, unreliable
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the crop recommendation hot path")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this text")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per measurement, the fastest is kept")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="passes of the whole suite, each benchmark keeps the median")
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--save-baseline', help="write the results as the new baseline")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown (fraction) reported as a regression, default 0.2")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"⏱️  Running benchmarks (median of {args.runs} runs of the best time per call)\n")
+    results, spread = run_benchmarks(args.filter, args.repeat, args.runs)
+    report = {'machine': machine_info(), 'runs': args.runs, 'results_us': results, 'spread': spread}
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n💾 Results saved to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['machine'] != report['machine']:
+            print("\n⚠️  Baseline was recorded on a different machine, compare with care")
+        regressions, unreliable = compare_results(baseline['results_us'], results, args.threshold,
+                                                  baseline.get('spread'), spread)
+        if unreliable:
+            print(f"\n⚠️  {len(unreliable)} benchmark(s) vary by more than {args.threshold:.0%} between "
+                  f"runs; rerun them with more --runs or on a quieter machine before trusting them")
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) slower than the baseline by more "
+                  f"than {args.threshold:.0%} plus their run-to-run spread (capped at {args.threshold:.0%})")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
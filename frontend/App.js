@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect } from 'react';
 import { NavigationContainer } from '@react-navigation/native';
 import { createBottomTabNavigator } from '@react-navigation/bottom-tabs';
 import { createStackNavigator } from '@react-navigation/stack';
@@ -17,6 +17,7 @@ import InvestmentAnalysisScreen from './src/screens/InvestmentAnalysisScreen';
 
 // Import theme
 import { theme } from './src/theme/theme';
+import { syncCatalog } from './src/services/catalogSync';
 
 const Tab = createBottomTabNavigator();
 const Stack = createStackNavigator();
@@ -125,6 +126,11 @@ function AppNavigator() {
 }
 
 export default function App() {
+  // One catalog sync per app open; screens read crops, prices and climate from it
+  useEffect(() => {
+    syncCatalog();
+  }, []);
+
   return (
     <PaperProvider theme={theme}>
       <StatusBar style="light" backgroundColor={theme.colors.primary} />
@@ -18,6 +18,7 @@ import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { theme, gradients } from '../theme/theme';
 import axios from 'axios';
+import { API_BASE_URL, getCatalogEntity } from '../services/catalogSync';
 
 const { width } = Dimensions.get('window');
 
@@ -32,7 +33,12 @@ const CropDetailsScreen = ({ route }) => {
 
   const fetchCropDetails = async () => {
     try {
-      const response = await axios.get(`http://localhost:8000/crop-info/${crop}`);
+      const synced = await getCatalogEntity('crops', crop);
+      if (synced) {
+        setCropInfo(synced);
+        return;
+      }
+      const response = await axios.get(`${API_BASE_URL}/crop-info/${crop}`);
       setCropInfo(response.data);
     } catch (error) {
       console.error('Error fetching crop details:', error);
@@ -19,6 +19,7 @@ import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { theme, gradients } from '../theme/theme';
 import axios from 'axios';
+import { API_BASE_URL, getCatalogEntities, syncCatalog } from '../services/catalogSync';
 
 const { width } = Dimensions.get('window');
 
@@ -37,9 +38,17 @@ const CropPricesScreen = () => {
     filterPrices();
   }, [searchQuery, prices]);
 
-  const fetchPrices = async () => {
+  const fetchPrices = async (refresh = false) => {
     try {
-      const response = await axios.get('http://localhost:8000/crop-prices');
+      if (refresh) {
+        await syncCatalog();
+      }
+      const synced = await getCatalogEntities('prices');
+      if (synced.length) {
+        setPrices(synced);
+        return;
+      }
+      const response = await axios.get(`${API_BASE_URL}/crop-prices`);
       setPrices(response.data.prices);
     } catch (error) {
       console.error('Error fetching prices:', error);
@@ -114,7 +123,7 @@ const CropPricesScreen = () => {
 
   const onRefresh = () => {
     setRefreshing(true);
-    fetchPrices();
+    fetchPrices(true);
   };
 
   const getCropNameInHindi = (crop) => {
@@ -18,6 +18,7 @@ import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { theme, gradients } from '../theme/theme';
 import * as Location from 'expo-location';
+import { getCatalogEntity } from '../services/catalogSync';
 
 const { width } = Dimensions.get('window');
 
@@ -61,9 +62,18 @@ const WeatherScreen = () => {
       let location = await Location.getCurrentPositionAsync({});
       setLocation(location);
       
-      // Simulate weather data based on location
-      // In a real app, you would call a weather API here
-      await new Promise(resolve => setTimeout(resolve, 1000));
+      // District averages from the synced catalog until a weather API is wired in
+      const climate = await getCatalogEntity('climate', district);
+      if (climate) {
+        setWeatherData(current => ({
+          ...current,
+          current: {
+            ...current.current,
+            temperature: climate.average_temperature ?? current.current.temperature,
+            humidity: climate.average_humidity ?? current.current.humidity,
+          },
+        }));
+      }
       setLoading(false);
     } catch (error) {
       console.error('Error getting location:', error);
@@ -0,0 +1,69 @@
+import axios from 'axios';
+
+// Crops, prices and district climate kept in sync with the backend's /sync
+// endpoint: the app asks once per launch for what changed since the version
+// it already has, and the screens read from here instead of refetching.
+
+export const API_BASE_URL = 'http://localhost:8000';
+
+const catalog = {
+  version: null,
+  crops: {},
+  prices: {},
+  climate: {},
+};
+
+let pendingSync = null;
+
+const applySync = (payload) => {
+  Object.keys(payload.changed || {}).forEach((entityType) => {
+    if (payload.full) {
+      catalog[entityType] = {};
+    }
+    Object.assign(catalog[entityType], payload.changed[entityType]);
+  });
+  Object.keys(payload.deleted || {}).forEach((entityType) => {
+    payload.deleted[entityType].forEach((key) => {
+      delete catalog[entityType][key];
+    });
+  });
+  catalog.version = payload.version;
+};
+
+// One request per call; concurrent callers share it
+export const syncCatalog = () => {
+  if (!pendingSync) {
+    pendingSync = axios
+      .get(`${API_BASE_URL}/sync`, { params: catalog.version ? { since: catalog.version } : {} })
+      .then((response) => {
+        applySync(response.data);
+        return true;
+      })
+      .catch((error) => {
+        console.error('Error syncing catalog:', error);
+        return false;
+      })
+      .finally(() => {
+        pendingSync = null;
+      });
+  }
+  return pendingSync;
+};
+
+// Sync only if nothing has been synced yet in this session
+export const ensureCatalog = async () => {
+  if (!catalog.version) {
+    await syncCatalog();
+  }
+  return catalog;
+};
+
+export const getCatalogEntity = async (entityType, key) => {
+  const current = await ensureCatalog();
+  return current[entityType][key] || null;
+};
+
+export const getCatalogEntities = async (entityType) => {
+  const current = await ensureCatalog();
+  return Object.values(current[entityType]);
+};
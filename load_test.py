@@ -0,0 +1,250 @@
+"""
+Load test for the Crop Advisor API
+Replays a weighted mix of API traffic at a target request rate and reports
+throughput, latency percentiles and error rate
+
+Usage:
+    python load_test.py --rps 50 --duration 30 --output run.json
+    python load_test.py --start-server --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+import numpy as np
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Request inputs come from the same crop ranges the model is trained on,
+# and districts from the catalog the API serves
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'ml_model'))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+from train_model_simple import CROPS_DATA, FEATURES, generate_crop_sample
+from catalog_store import current_catalog
+
+DISTRICTS = list(current_catalog().climate)
+
+DEFAULT_MIX = 'recommend=60,prices=10,info=10,climate=10,investment=10'
+
+def recommend_request(rng):
+    crop = rng.choice(list(CROPS_DATA))
+    sample = generate_crop_sample(crop, CROPS_DATA[crop], rng=rng)
+    # Farmers enter rounded values, so repeated inputs are realistic
+    body = {feature: round(float(sample[feature]), 1) for feature in FEATURES}
+    return 'POST', '/recommend-crop', body
+
+def prices_request(rng):
+    return 'GET', '/crop-prices', None
+
+def info_request(rng):
+    return 'GET', f"/crop-info/{rng.choice(list(CROPS_DATA))}", None
+
+def climate_request(rng):
+    return 'GET', f"/climate-data/{rng.choice(DISTRICTS)}", None
+
+def investment_request(rng):
+    area = float(rng.choice([0.5, 1.0, 2.0, 5.0]))
+    return 'GET', f"/investment-analysis/{rng.choice(list(CROPS_DATA))}?area_hectares={area}", None
+
+REQUEST_BUILDERS = {
+    'recommend': recommend_request,
+    'prices': prices_request,
+    'info': info_request,
+    'climate': climate_request,
+    'investment': investment_request,
+}
+
+def parse_mix(mix):
+    """'recommend=60,prices=10' -> {'recommend': 60.0, 'prices': 10.0}"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in REQUEST_BUILDERS:
+            raise ValueError(f"Unknown request type '{name}', choose from {list(REQUEST_BUILDERS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+async def send_request(client, kind, method, path, body, scheduled, results):
+    status = None
+    try:
+        response = await client.request(method, path, json=body)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    # Latency counts from the scheduled send time, so a stalled server is
+    # not hidden by requests queuing up behind it
+    results.append((kind, time.perf_counter() - scheduled, status))
+
+async def run_load(base_url, rps, duration, weights, connections, seed=42):
+    """Send requests open-loop at `rps` for `duration` seconds"""
+    rng = np.random.default_rng(seed)
+    kinds = list(weights)
+    probabilities = np.array(list(weights.values())) / sum(weights.values())
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    results = []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        tasks = []
+        start = time.perf_counter()
+        total = int(rps * duration)
+        for i in range(total):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = kinds[rng.choice(len(kinds), p=probabilities)]
+            method, path, body = REQUEST_BUILDERS[kind](rng)
+            tasks.append(asyncio.create_task(
+                send_request(client, kind, method, path, body, scheduled, results)
+            ))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+def _latency_stats(latencies):
+    ms = np.array(latencies) * 1e3
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+        'mean_ms': float(ms.mean()),
+    }
+
+def summarize(results, elapsed, config):
+    """Overall and per-request-type throughput, latency percentiles and errors"""
+    by_kind = defaultdict(list)
+    for result in results:
+        by_kind[result[0]].append(result)
+
+    def stats(rows):
+        statuses = Counter(str(status) for _, _, status in rows)
+        errors = sum(count for status, count in statuses.items()
+                     if not (status.isdigit() and int(status) < 400))
+        return {
+            'requests': len(rows),
+            'error_rate': errors / len(rows),
+            'statuses': dict(statuses),
+            **_latency_stats([latency for _, latency, _ in rows]),
+        }
+
+    return {
+        'config': config,
+        'elapsed_s': elapsed,
+        'throughput_rps': len(results) / elapsed,
+        'overall': stats(results),
+        'endpoints': {kind: stats(rows) for kind, rows in sorted(by_kind.items())},
+    }
+
+def print_summary(summary):
+    overall = summary['overall']
+    print(f"\n📊 {overall['requests']} requests in {summary['elapsed_s']:.1f}s "
+          f"({summary['throughput_rps']:.1f} req/s), error rate {overall['error_rate']:.2%}")
+    print(f"{'Endpoint':<12} {'Requests':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'Max ms':>8} {'Errors':>7}")
+    for name, stats in [('ALL', overall)] + list(summary['endpoints'].items()):
+        print(f"{name:<12} {stats['requests']:>9} {stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} "
+              f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f} {stats['error_rate']:>7.1%}")
+    for name, stats in summary['endpoints'].items():
+        failed = {s: c for s, c in stats['statuses'].items() if not (s.isdigit() and int(s) < 400)}
+        if failed:
+            print(f"⚠️  {name}: {failed}")
+
+def compare_summaries(previous, current):
+    """Print the change in throughput and latency against an earlier run"""
+    print(f"\n{'Metric':<22} {'Previous':>10} {'Current':>10} {'Change':>9}")
+    rows = [('Throughput (req/s)', previous['throughput_rps'], current['throughput_rps'])]
+    for key in ('p50_ms', 'p90_ms', 'p99_ms', 'error_rate'):
+        rows.append((key, previous['overall'][key], current['overall'][key]))
+    for name, before, after in rows:
+        change = f"{(after - before) / before:+.1%}" if before else '-'
+        print(f"{name:<22} {before:>10.3f} {after:>10.3f} {change:>9}")
+
+def wait_for_server(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    return False
+
+def start_server(port):
+    """Start the API with uvicorn from the backend directory"""
+    backend_dir = os.path.join(ROOT, 'backend')
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'simple_app:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=backend_dir,
+    )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Crop Advisor API")
+    parser.add_argument('--base-url', default=None, help="defaults to http://localhost:PORT")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rps', type=float, default=50, help="target requests per second")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of traffic")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"weighted request mix, default '{DEFAULT_MIX}'")
+    parser.add_argument('--connections', type=int, default=50, help="connection pool size")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-server', action='store_true',
+                        help="start backend/simple_app.py locally for the run")
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if httpx is None:
+        print("❌ httpx is required for load testing: pip install httpx")
+        return 1
+
+    base_url = args.base_url or f"http://localhost:{args.port}"
+    weights = parse_mix(args.mix)
+    server = None
+    if args.start_server:
+        print(f"🚀 Starting API server on port {args.port}...")
+        server = start_server(args.port)
+    try:
+        if not wait_for_server(base_url, timeout=60 if server else 5):
+            print(f"❌ API not reachable at {base_url}")
+            return 1
+
+        print(f"🌾 Load testing {base_url}: {args.rps:g} req/s for {args.duration:g}s, mix {weights}")
+        results, elapsed = asyncio.run(
+            run_load(base_url, args.rps, args.duration, weights, args.connections, args.seed)
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    config = {'base_url': base_url, 'rps': args.rps, 'duration': args.duration,
+              'mix': weights, 'connections': args.connections, 'seed': args.seed}
+    summary = summarize(results, elapsed, config)
+    print_summary(summary)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_summaries(json.load(f), summary)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
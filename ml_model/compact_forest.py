@@ -0,0 +1,218 @@
+"""
+Forest Compaction for the Crop Recommendation System
+Prunes the exported RandomForest for serving: merges sibling leaves with
+identical class distributions, and optionally caps tree depth and drops
+the trees that no longer improve accuracy on a selection split. The report
+is measured on a separate split, so the tree count isn't chosen on the rows
+it is judged by.
+
+Merging leaves is lossless but removes few nodes from a fully grown forest,
+so with the defaults the model barely shrinks. The real savings come from
+the two lossy steps, which only run when asked for: --max-depth caps the
+depth and a --tolerance above 0 cuts trees. Either can change predictions
+that accuracy doesn't reflect, so the report records how many predictions
+changed (agreement_loss) as well as the accuracy.
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+import joblib
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.tree._tree import Tree
+from serving_selection import benchmark_model, serialized_size
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+def _make_leaf(nodes, node):
+    nodes['left_child'][node] = TREE_LEAF
+    nodes['right_child'][node] = TREE_LEAF
+    nodes['feature'][node] = TREE_UNDEFINED
+    nodes['threshold'][node] = TREE_UNDEFINED
+
+def _distribution(value):
+    # Older sklearn stores class counts, newer ones fractions
+    return value / value.sum()
+
+def _collapse(nodes, values, node, depth, max_depth):
+    """
+    Post-order pass turning a split into a leaf when it is deeper than
+    `max_depth` or both children are leaves with the same class distribution.
+    The parent already holds the combined distribution of its children, which
+    then equals theirs, so the tree's probabilities are unchanged.
+    """
+    left, right = nodes['left_child'], nodes['right_child']
+    if left[node] == TREE_LEAF:
+        return
+    if max_depth is not None and depth >= max_depth:
+        _make_leaf(nodes, node)
+        return
+
+    _collapse(nodes, values, left[node], depth + 1, max_depth)
+    _collapse(nodes, values, right[node], depth + 1, max_depth)
+
+    l, r = left[node], right[node]
+    if (left[l] == TREE_LEAF and left[r] == TREE_LEAF
+            and np.allclose(_distribution(values[l]), _distribution(values[r]), rtol=0, atol=1e-12)):
+        _make_leaf(nodes, node)
+
+def compact_tree(estimator, max_depth=None):
+    """Prune one fitted DecisionTreeClassifier in place and drop unreachable nodes"""
+    state = estimator.tree_.__getstate__()
+    nodes = state['nodes'].copy()
+    values = state['values']
+
+    _collapse(nodes, values, 0, 0, max_depth)
+
+    # Renumber the reachable nodes in depth-first order
+    order, depths, stack = [], [], [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        order.append(node)
+        depths.append(depth)
+        if nodes['left_child'][node] != TREE_LEAF:
+            stack.append((nodes['right_child'][node], depth + 1))
+            stack.append((nodes['left_child'][node], depth + 1))
+    order = np.array(order)
+
+    new_ids = np.full(len(nodes), TREE_LEAF, dtype=np.intp)
+    new_ids[order] = np.arange(len(order))
+    new_nodes = nodes[order]
+    for field in ('left_child', 'right_child'):
+        children = new_nodes[field]
+        new_nodes[field] = np.where(children == TREE_LEAF, TREE_LEAF, new_ids[children])
+
+    tree = Tree(estimator.n_features_in_, np.array([estimator.n_classes_], dtype=np.intp),
+                estimator.n_outputs_)
+    tree.__setstate__({
+        'max_depth': int(max(depths)),
+        'node_count': len(order),
+        'nodes': np.ascontiguousarray(new_nodes),
+        'values': np.ascontiguousarray(values[order]),
+    })
+    estimator.tree_ = tree
+    return estimator
+
+def node_count(forest):
+    return int(sum(estimator.tree_.node_count for estimator in forest.estimators_))
+
+def plateau_tree_count(forest, X_select, y_select, step=10, tolerance=0.0):
+    """
+    Smallest number of leading trees whose averaged vote is within `tolerance`
+    of the full forest's accuracy on the selection split. Returns that count
+    and the accuracy curve as (trees, accuracy) pairs.
+    """
+    probabilities = np.cumsum([tree.predict_proba(X_select) for tree in forest.estimators_], axis=0)
+    total = len(forest.estimators_)
+    full_accuracy = accuracy_score(y_select, forest.classes_[probabilities[-1].argmax(axis=1)])
+
+    counts = sorted(set(list(range(step, total, step)) + [total]))
+    curve = [
+        (k, float(accuracy_score(y_select, forest.classes_[probabilities[k - 1].argmax(axis=1)])))
+        for k in counts
+    ]
+    best = next(k for k, accuracy in curve if accuracy >= full_accuracy - tolerance)
+    return best, curve
+
+def _summary(forest, X_val, y_val):
+    return {
+        'trees': len(forest.estimators_),
+        'nodes': node_count(forest),
+        'max_depth': int(max(estimator.tree_.max_depth for estimator in forest.estimators_)),
+        'size_kb': serialized_size(forest) / 1024,
+        'accuracy': float(accuracy_score(y_val, forest.predict(X_val))),
+        **benchmark_model(forest, X_val),
+    }
+
+def split_validation(X, y, selection_fraction=0.5, random_state=42):
+    """Split held-out rows into (X_select, y_select) for choosing the tree count and (X_val, y_val) for the report"""
+    X_select, X_val, y_select, y_val = train_test_split(
+        X, y, train_size=selection_fraction, random_state=random_state, stratify=y)
+    return X_select, y_select, X_val, y_val
+
+def compact_forest(forest, X_select, y_select, X_val, y_val, max_depth=None, tolerance=0.0):
+    """
+    Compact a fitted RandomForestClassifier in place and return it with a
+    before/after report. Trees are only cut when `tolerance` is above 0; the
+    count is then chosen on the selection split. The report is measured on
+    the validation split.
+    """
+    before = _summary(forest, X_val, y_val)
+    original_predictions = forest.predict(X_val)
+
+    for estimator in forest.estimators_:
+        compact_tree(estimator, max_depth)
+    merged_nodes = before['nodes'] - node_count(forest)
+
+    curve = None
+    if tolerance > 0:
+        trees, curve = plateau_tree_count(forest, X_select, y_select, tolerance=tolerance)
+        forest.estimators_ = forest.estimators_[:trees]
+        forest.set_params(n_estimators=trees)
+
+    after = _summary(forest, X_val, y_val)
+    agreement = float(np.mean(forest.predict(X_val) == original_predictions))
+    return forest, {
+        'before': before,
+        'after': after,
+        'nodes_removed_by_pruning': int(merged_nodes),
+        'agreement_with_original': agreement,
+        'agreement_loss': 1.0 - agreement,
+        'selection_accuracy_curve': curve,
+        'max_depth': max_depth,
+        'tolerance': tolerance,
+    }
+
+def print_report(report):
+    before, after = report['before'], report['after']
+    print(f"\n{'':<18} {'Before':>10} {'After':>10}")
+    rows = [
+        ('Trees', 'trees', '{:>10d}'),
+        ('Nodes', 'nodes', '{:>10d}'),
+        ('Max depth', 'max_depth', '{:>10d}'),
+        ('Size (KB)', 'size_kb', '{:>10.1f}'),
+        ('1-row ms', 'single_row_ms', '{:>10.3f}'),
+        ('Batch us/row', 'batch_us_per_row', '{:>10.2f}'),
+        ('Accuracy', 'accuracy', '{:>10.4f}'),
+    ]
+    for label, key, fmt in rows:
+        print(f"{label:<18} {fmt.format(before[key])} {fmt.format(after[key])}")
+    print(f"Nodes removed by leaf merging and depth cap: {report['nodes_removed_by_pruning']}")
+    print(f"Agreement with the original forest: {report['agreement_with_original']:.4f} "
+          f"({report['agreement_loss']:.2%} of predictions changed)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the exported RandomForest for serving")
+    parser.add_argument('--model', default='crop_recommendation_model.pkl')
+    parser.add_argument('--validation', default='retrain_cache.npz',
+                        help="NPZ file with X_test/y_test, written by train_model_simple.py")
+    parser.add_argument('--selection-fraction', type=float, default=0.5,
+                        help="share of the held-out rows used to choose the tree count")
+    parser.add_argument('--output', default='crop_recommendation_model_compact.pkl')
+    parser.add_argument('--report', default='compaction_report.json')
+    parser.add_argument('--max-depth', type=int, default=None,
+                        help="turn every split deeper than this into a leaf")
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help="accuracy loss accepted when cutting the tree count; "
+                             "0 (the default) keeps every tree")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.validation):
+        parser.error(f"{args.validation} not found, run train_model_simple.py first")
+    with np.load(args.validation, allow_pickle=False) as data:
+        X_select, y_select, X_val, y_val = split_validation(
+            data['X_test'], data['y_test'], args.selection_fraction)
+
+    forest = joblib.load(args.model)
+    forest, report = compact_forest(forest, X_select, y_select, X_val, y_val,
+                                    args.max_depth, args.tolerance)
+    print_report(report)
+
+    joblib.dump(forest, args.output)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nCompacted model saved as {args.output}")
+    print(f"Report saved as {args.report}")
@@ -5,21 +5,141 @@ Machine Learning Model Implementation
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.naive_bayes import GaussianNB
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import xgboost as xgb
 import joblib
+from training_report import save_training_metrics, render_in_background, model_slug
+from dataset_cache import cached_split, cached_split_from_csv, cached_cv_folds, split_dataframe
+from serving_selection import select_model
+from distillation import distill_model, compare_latency, STUDENT_FILENAME
+from pipeline_timing import PipelineTimer, TIMING_REPORT_FILENAME
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 import warnings
 warnings.filterwarnings('ignore')
 
 # Set random seed for reproducibility
 np.random.seed(42)
 
+CANDIDATE_MODELS = ['Random Forest', 'XGBoost', 'SVM', 'Gaussian Naive Bayes']
+
+# XGBoost only accepts integer class labels, so crops are encoded for it
+# and its predictions decoded back to crop names.
+ENCODED_LABEL_MODELS = ['XGBoost']
+
+def decode_predictions(model, predictions):
+    """
+    Map the integer predictions of an encoded-label model back to crop names;
+    such models carry the crop names as `crop_labels_` so the API can decode too
+    """
+    labels = getattr(model, 'crop_labels_', None)
+    return labels[np.asarray(predictions, dtype=int)] if labels is not None else predictions
+
+# Candidates that can use more than one core; SVM and Naive Bayes are
+# single-threaded and get one core each when training in parallel.
+MULTI_CORE_MODELS = ['Random Forest', 'XGBoost']
+
+def build_candidate_model(name, n_jobs=-1):
+    """Create an untrained candidate model using `n_jobs` cores where supported"""
+    if name == 'Random Forest':
+        return RandomForestClassifier(
+            n_estimators=100,
+            max_depth=15,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    elif name == 'XGBoost':
+        return xgb.XGBClassifier(
+            n_estimators=100,
+            max_depth=6,
+            learning_rate=0.1,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            eval_metric='mlogloss',
+            n_jobs=n_jobs
+        )
+    elif name == 'SVM':
+        return SVC(
+            C=10,
+            kernel='rbf',
+            gamma='scale',
+            random_state=42,
+            probability=True  # Enable probability estimates
+        )
+    elif name == 'Gaussian Naive Bayes':
+        return GaussianNB()
+    raise ValueError(f"Unknown model: {name}")
+
+def allot_cpus(model_names, total_cpus=None):
+    """
+    Split the available cores between candidates trained at the same time,
+    so that the n_jobs=-1 models don't each try to use the whole machine
+    """
+    total_cpus = total_cpus or os.cpu_count() or 1
+    allotment = {name: 1 for name in model_names}
+    multi_core = [name for name in model_names if name in MULTI_CORE_MODELS]
+    if multi_core:
+        spare = max(0, total_cpus - len(model_names))
+        share, extra = divmod(spare, len(multi_core))
+        for i, name in enumerate(multi_core):
+            allotment[name] += share + (1 if i < extra else 0)
+    return allotment
+
+def _share_array(array):
+    """Copy an array into a new shared memory block"""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _attach_array(spec):
+    """Attach to an array created by _share_array without copying it"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _fit_candidate(name, n_jobs, X_train_spec, y_train_spec, X_test_spec, classes):
+    """Process pool worker: train one candidate on the shared training data"""
+    blocks = []
+    try:
+        shm, X_train = _attach_array(X_train_spec)
+        blocks.append(shm)
+        shm, y_codes = _attach_array(y_train_spec)
+        blocks.append(shm)
+        shm, X_test = _attach_array(X_test_spec)
+        blocks.append(shm)
+
+        model = build_candidate_model(name, n_jobs=n_jobs)
+        start = time.perf_counter()
+        model.fit(X_train, y_codes if name in ENCODED_LABEL_MODELS else classes[y_codes])
+        fit_seconds = time.perf_counter() - start
+        if name in ENCODED_LABEL_MODELS:
+            model.crop_labels_ = classes
+
+        start = time.perf_counter()
+        y_pred = decode_predictions(model, model.predict(X_test))
+        predict_seconds = time.perf_counter() - start
+
+        del X_train, y_codes, X_test
+        return name, model, y_pred, fit_seconds, predict_seconds
+    finally:
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                # Still referenced from a traceback; released when the worker exits
+                pass
+
 class CropRecommendationSystem:
     def __init__(self):
         self.models = {}
@@ -29,25 +149,43 @@ class CropRecommendationSystem:
         self.X_test = None
         self.y_train = None
         self.y_test = None
-        
-    def load_and_analyze_data(self, dataset_path='Crop_recommendation.csv'):
+        self.split = None
+        self.results = {}
+        self.selection = 'accuracy'
+        self.objective = None
+        self.report_metrics = {}
+        self.timer = PipelineTimer()
+        
+    def load_and_analyze_data(self, dataset_path='Crop_recommendation.csv', sample_rows=None):
         """
         STEP 1: DATA UNDERSTANDING AND PREPROCESSING
+        
+        With `sample_rows` a synthetic dataset of about that many rows is
+        generated instead of loading the CSV.
         """
         print("="*60)
         print("STEP 1: DATA UNDERSTANDING AND PREPROCESSING")
         print("="*60)
         
-        try:
-            # Load the dataset
-            self.df = pd.read_csv(dataset_path)
-            print(f"Dataset loaded successfully! Shape: {self.df.shape}")
-            
-        except FileNotFoundError:
-            print(f"Dataset not found at {dataset_path}")
-            print("Creating a sample dataset for demonstration...")
-            # Create a sample dataset if the original is not available
-            self.df = self.create_sample_dataset()
+        numerical_features = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+        self.split = None
+        
+        with self.timer.stage('data_load'):
+            if sample_rows:
+                print(f"Creating a sample dataset of {sample_rows} rows...")
+                self.df = self.create_sample_dataset(samples_per_crop=max(1, sample_rows // 10))
+            elif os.path.exists(dataset_path):
+                # Keyed by the file itself: an unchanged CSV is not parsed again,
+                # the rows come back from the cached split
+                self.split = cached_split_from_csv(dataset_path, numerical_features, 'label',
+                                                   test_size=0.2, random_state=42)
+                self.df = split_dataframe(self.split, numerical_features, 'label')
+                print(f"Dataset loaded successfully! Shape: {self.df.shape}")
+            else:
+                print(f"Dataset not found at {dataset_path}")
+                print("Creating a sample dataset for demonstration...")
+                # Create a sample dataset if the original is not available
+                self.df = self.create_sample_dataset()
         
         # Display first 5 rows
         print("\n1. First 5 rows of the dataset:")
@@ -67,33 +205,33 @@ class CropRecommendationSystem:
         
         # Summary statistics
         print("\n4. Summary statistics for numerical features:")
-        numerical_features = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
         print(self.df[numerical_features].describe())
         
         # Data preprocessing
         print("\n5. Data Preprocessing:")
         
-        # Separate features and target
-        X = self.df[numerical_features]
-        y = self.df['label']
+        print(f"Features shape: {self.df[numerical_features].shape}")
+        print(f"Target shape: {self.df['label'].shape}")
         
-        print(f"Features shape: {X.shape}")
-        print(f"Target shape: {y.shape}")
-        
-        # Split the data
-        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        # Split the data (float32 matrices, reused from the cache when the
+        # same data was split before)
+        with self.timer.stage('split'):
+            if self.split is None:
+                self.split = cached_split(self.df, numerical_features, 'label',
+                                          test_size=0.2, random_state=42)
+        self.X_train, self.X_test = self.split['X_train'], self.split['X_test']
+        self.y_train, self.y_test = self.split['y_train'], self.split['y_test']
         
         print(f"Training set shape: {self.X_train.shape}")
         print(f"Testing set shape: {self.X_test.shape}")
         
-        # Visualize data distribution
-        self.visualize_data_distribution()
+        # Record the data distribution for the training report
+        with self.timer.stage('data_distribution'):
+            self.collect_data_distribution()
         
         return self.X_train, self.X_test, self.y_train, self.y_test
     
-    def create_sample_dataset(self):
+    def create_sample_dataset(self, samples_per_crop=220):
         """Create a sample dataset if the original is not available"""
         np.random.seed(42)
         
@@ -113,7 +251,7 @@ class CropRecommendationSystem:
         
         data = []
         for crop, params in crops_data.items():
-            for _ in range(220):  # Generate 220 samples per crop
+            for _ in range(samples_per_crop):
                 sample = {
                     'N': np.random.uniform(params['N'][0], params['N'][1]),
                     'P': np.random.uniform(params['P'][0], params['P'][1]),
@@ -128,137 +266,163 @@ class CropRecommendationSystem:
         
         return pd.DataFrame(data)
     
-    def visualize_data_distribution(self):
-        """Visualize the data distribution"""
-        try:
-            # Use non-interactive backend for headless environments
-            plt.switch_backend('Agg')
-            
-            plt.figure(figsize=(15, 10))
-            
-            # Plot 1: Crop distribution
-            plt.subplot(2, 3, 1)
-            self.df['label'].value_counts().plot(kind='bar', rot=45)
-            plt.title('Distribution of Crops')
-            plt.xlabel('Crops')
-            plt.ylabel('Count')
-            
-            # Plot 2-6: Feature distributions (limit to 5 features to fit in 2x3 grid)
-            numerical_features = ['N', 'P', 'K', 'temperature', 'humidity']
-            for i, feature in enumerate(numerical_features, 2):
-                plt.subplot(2, 3, i)
-                plt.hist(self.df[feature], bins=30, alpha=0.7)
-                plt.title(f'Distribution of {feature}')
-                plt.xlabel(feature)
-                plt.ylabel('Frequency')
-            
-            plt.tight_layout()
-            plt.savefig('data_distribution.png', dpi=300, bbox_inches='tight')
-            print("Data distribution plot saved as 'data_distribution.png'")
-            
-            # Correlation heatmap
-            plt.figure(figsize=(10, 8))
-            numerical_features_all = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
-            correlation_matrix = self.df[numerical_features_all].corr()
-            sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-            plt.title('Feature Correlation Heatmap')
-            plt.tight_layout()
-            plt.savefig('correlation_heatmap.png', dpi=300, bbox_inches='tight')
-            print("Correlation heatmap saved as 'correlation_heatmap.png'")
-            
-        except Exception as e:
-            print(f"Visualization skipped due to display issues: {e}")
-            print("Continuing with model training...")
+    def collect_data_distribution(self):
+        """Record crop counts, feature histograms and correlations as raw arrays"""
+        numerical_features = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+        crop_counts = self.df['label'].value_counts()
+        
+        histograms = [np.histogram(self.df[feature], bins=30) for feature in numerical_features]
+        
+        self.report_metrics.update({
+            'feature_names': np.array(numerical_features),
+            'crop_labels': crop_counts.index.to_numpy(dtype=str),
+            'crop_counts': crop_counts.to_numpy(),
+            'histogram_counts': np.stack([counts for counts, _ in histograms]),
+            'histogram_edges': np.stack([edges for _, edges in histograms]),
+            'correlation_matrix': self.df[numerical_features].corr().to_numpy(),
+        })
     
-    def train_and_evaluate_models(self):
+    def train_and_evaluate_models(self, parallel=False, selection='accuracy', objective=None):
         """
         STEP 2: MODEL BUILDING AND EVALUATION
+        
+        selection='accuracy' picks the most accurate model; selection='serving'
+        also weighs prediction latency and model size (see serving_selection).
         """
         print("\n" + "="*60)
         print("STEP 2: MODEL BUILDING AND EVALUATION")
         print("="*60)
         
-        # Initialize models with better parameters for crop recommendation
-        models = {
-            'Random Forest': RandomForestClassifier(
-                n_estimators=100,
-                max_depth=15,
-                min_samples_split=5,
-                min_samples_leaf=2,
-                random_state=42,
-                n_jobs=-1
-            ),
-            'XGBoost': xgb.XGBClassifier(
-                n_estimators=100,
-                max_depth=6,
-                learning_rate=0.1,
-                subsample=0.8,
-                colsample_bytree=0.8,
-                random_state=42,
-                eval_metric='mlogloss',
-                n_jobs=-1
-            ),
-            'SVM': SVC(
-                C=10,
-                kernel='rbf',
-                gamma='scale',
-                random_state=42,
-                probability=True  # Enable probability estimates
-            ),
-            'Gaussian Naive Bayes': GaussianNB()
-        }
-        
-        results = {}
-        
-        for name, model in models.items():
-            print(f"\n--- Training {name} ---")
-            
-            # Train the model
-            model.fit(self.X_train, self.y_train)
-            
-            # Make predictions
-            y_pred = model.predict(self.X_test)
+        with self.timer.stage('model_training'):
+            if parallel:
+                trained, cpus = self.train_models_in_parallel(CANDIDATE_MODELS)
+            else:
+                trained, cpus = self.train_models_sequentially(CANDIDATE_MODELS)
+        
+        with self.timer.stage('evaluation'):
+            results = {}
+            classes = np.unique(np.asarray(self.y_train))
+            self.report_metrics['class_labels'] = classes.astype(str)
+            self.report_metrics['model_names'] = np.array(CANDIDATE_MODELS)
+        
+            for name in CANDIDATE_MODELS:
+                model, y_pred, _, _ = trained[name]
+                print(f"\n--- Results for {name} ---")
             
-            # Calculate accuracy
-            accuracy = accuracy_score(self.y_test, y_pred)
-            results[name] = accuracy
+                # Calculate accuracy
+                accuracy = accuracy_score(self.y_test, y_pred)
+                results[name] = accuracy
             
-            print(f"Accuracy: {accuracy:.4f}")
+                print(f"Accuracy: {accuracy:.4f}")
             
-            # Classification report
-            print(f"\nClassification Report for {name}:")
-            print(classification_report(self.y_test, y_pred))
+                # Classification report
+                print(f"\nClassification Report for {name}:")
+                print(classification_report(self.y_test, y_pred))
             
-            # Confusion matrix
-            try:
-                cm = confusion_matrix(self.y_test, y_pred)
-                plt.figure(figsize=(10, 8))
-                sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
-                plt.title(f'Confusion Matrix - {name}')
-                plt.xlabel('Predicted')
-                plt.ylabel('Actual')
-                plt.tight_layout()
-                plt.savefig(f'confusion_matrix_{name.replace(" ", "_").lower()}.png', dpi=300, bbox_inches='tight')
-                print(f"Confusion matrix saved for {name}")
-                plt.close()  # Close the figure to free memory
-            except Exception as e:
-                print(f"Confusion matrix visualization skipped for {name}: {e}")
+                # Confusion matrix (rendered later from the training report)
+                self.report_metrics[f'confusion_{model_slug(name)}'] = confusion_matrix(
+                    self.y_test, y_pred, labels=classes
+                )
             
-            # Store the model
-            self.models[name] = model
+                # Store the model
+                self.models[name] = model
+        
+        print(f"\n--- TRAINING TIME PER MODEL ---")
+        print(f"{'Model':<22} {'CPUs':>5} {'Fit (s)':>9} {'Predict (s)':>12}")
+        for name in CANDIDATE_MODELS:
+            _, _, fit_seconds, predict_seconds = trained[name]
+            print(f"{name:<22} {cpus[name]:>5} {fit_seconds:>9.2f} {predict_seconds:>12.3f}")
+            # Measured where the model was fitted, possibly in a worker process
+            self.timer.record(f'fit:{name}', fit_seconds, cpus=cpus[name])
+            self.timer.record(f'predict:{name}', predict_seconds, cpus=cpus[name])
         
         # Find the best model
-        self.best_model_name = max(results, key=results.get)
+        self.results, self.selection, self.objective = results, selection, objective
+        if selection == 'serving':
+            with self.timer.stage('serving_selection'):
+                self.best_model_name, _ = select_model(self.models, results, self.X_test, objective)
+        else:
+            self.best_model_name = max(results, key=results.get)
         self.best_model = self.models[self.best_model_name]
         
         print(f"\n--- MODEL COMPARISON ---")
         for name, accuracy in sorted(results.items(), key=lambda x: x[1], reverse=True):
             print(f"{name}: {accuracy:.4f}")
         
-        print(f"\nBest performing model: {self.best_model_name} with accuracy: {results[self.best_model_name]:.4f}")
+        print(f"\nSelected model: {self.best_model_name} with accuracy: {results[self.best_model_name]:.4f}")
         
         return results
     
+    def write_training_report(self, path='training_metrics.npz', render_plots=False):
+        """
+        Save the collected metrics; the figures are only drawn when requested,
+        and then in a background process while training continues
+        """
+        save_training_metrics(self.report_metrics, path)
+        if render_plots:
+            return render_in_background(path)
+        print(f"Render the figures later with: python training_report.py {path}")
+        return None
+    
+    def train_models_sequentially(self, model_names):
+        """Train candidates one after another, each free to use every core"""
+        classes, y_codes = np.unique(np.asarray(self.y_train), return_inverse=True)
+        trained = {}
+        for name in model_names:
+            print(f"\n--- Training {name} ---")
+            model = build_candidate_model(name)
+            
+            start = time.perf_counter()
+            model.fit(self.X_train, y_codes if name in ENCODED_LABEL_MODELS else self.y_train)
+            fit_seconds = time.perf_counter() - start
+            if name in ENCODED_LABEL_MODELS:
+                model.crop_labels_ = classes
+            
+            start = time.perf_counter()
+            y_pred = decode_predictions(model, model.predict(self.X_test))
+            predict_seconds = time.perf_counter() - start
+            
+            trained[name] = (model, y_pred, fit_seconds, predict_seconds)
+        
+        cpus = {name: os.cpu_count() if name in MULTI_CORE_MODELS else 1 for name in model_names}
+        return trained, cpus
+    
+    def train_models_in_parallel(self, model_names, total_cpus=None):
+        """
+        Train candidates concurrently in a process pool. The training and test
+        matrices are placed in shared memory once instead of being pickled to
+        every worker, and each model gets its own share of the cores.
+        """
+        cpus = allot_cpus(model_names, total_cpus)
+        print(f"\nTraining {len(model_names)} models in parallel "
+              f"({', '.join(f'{name}: {cpus[name]} CPU' for name in model_names)})")
+        
+        classes, y_codes = np.unique(np.asarray(self.y_train), return_inverse=True)
+        shared = [
+            _share_array(np.asarray(self.X_train, dtype=np.float64)),
+            _share_array(y_codes.astype(np.int32)),
+            _share_array(np.asarray(self.X_test, dtype=np.float64)),
+        ]
+        specs = [spec for _, spec in shared]
+        
+        trained = {}
+        try:
+            with ProcessPoolExecutor(max_workers=len(model_names)) as executor:
+                futures = [
+                    executor.submit(_fit_candidate, name, cpus[name], *specs, classes)
+                    for name in model_names
+                ]
+                for future in as_completed(futures):
+                    name, model, y_pred, fit_seconds, predict_seconds = future.result()
+                    print(f"--- {name} trained in {fit_seconds:.2f}s ---")
+                    trained[name] = (model, y_pred, fit_seconds, predict_seconds)
+        finally:
+            for shm, _ in shared:
+                shm.close()
+                shm.unlink()
+        
+        return trained, cpus
+    
     def optimize_best_model(self):
         """
         STEP 3: MODEL OPTIMIZATION AND EXPORT
@@ -310,41 +474,99 @@ class CropRecommendationSystem:
         grid_search = GridSearchCV(
             base_model, 
             param_grid, 
-            cv=5, 
+            cv=cached_cv_folds(self.split, n_splits=5), 
             scoring='accuracy', 
             n_jobs=-1,
             verbose=1
         )
         
-        grid_search.fit(self.X_train, self.y_train)
+        classes, y_codes = np.unique(self.y_train, return_inverse=True)
+        with self.timer.stage('grid_search'):
+            grid_search.fit(self.X_train, y_codes if self.best_model_name in ENCODED_LABEL_MODELS else self.y_train)
         
         # Get the best model
         self.best_model = grid_search.best_estimator_
+        if self.best_model_name in ENCODED_LABEL_MODELS:
+            self.best_model.crop_labels_ = classes
         
         print(f"Best parameters: {grid_search.best_params_}")
         print(f"Best cross-validation score: {grid_search.best_score_:.4f}")
         
         # Final evaluation
-        final_predictions = self.best_model.predict(self.X_test)
+        final_predictions = self.predict_labels(self.best_model, self.X_test)
         final_accuracy = accuracy_score(self.y_test, final_predictions)
         
         print(f"Final optimized model accuracy: {final_accuracy:.4f}")
         
+        # The grid only looks at accuracy and can grow a much larger model;
+        # with serving-cost selection the tuned model has to win on the same
+        # objective as the candidate it came from
+        if self.selection == 'serving':
+            with self.timer.stage('serving_selection'):
+                chosen, _ = select_model(
+                    {'tuned': self.best_model, 'untuned': self.models[self.best_model_name]},
+                    {'tuned': final_accuracy, 'untuned': self.results[self.best_model_name]},
+                    self.X_test, self.objective,
+                )
+            if chosen == 'untuned':
+                print("Tuned model costs more to serve than its accuracy gain allows, keeping the untuned one")
+                self.best_model = self.models[self.best_model_name]
+                final_accuracy = self.results[self.best_model_name]
+        
         # Save the model
-        model_filename = 'crop_recommendation_model.pkl'
-        joblib.dump(self.best_model, model_filename)
+        with self.timer.stage('serialization'):
+            self.export_model(self.best_model, 'crop_recommendation_model.pkl')
+        
+        return self.best_model, final_accuracy
+    
+    def predict_labels(self, model, X):
+        """Predict crop names, decoding the integer labels XGBoost is trained on"""
+        return decode_predictions(model, model.predict(X))
+    
+    def export_model(self, model, model_filename):
+        """Save a model and copy it to the backend directory for API use"""
+        joblib.dump(model, model_filename)
         print(f"Model saved as {model_filename}")
         
-        # Also save to backend directory for API use
         try:
             import shutil
-            backend_model_path = '../backend/crop_recommendation_model.pkl'
+            backend_model_path = f'../backend/{model_filename}'
             shutil.copy(model_filename, backend_model_path)
             print(f"Model also copied to backend directory: {backend_model_path}")
         except Exception as e:
             print(f"Could not copy to backend directory: {e}")
+    
+    def distill_best_model(self, student='tree', n_samples=200000, agreement_threshold=0.98):
+        """
+        STEP 3b: DISTILL THE OPTIMIZED MODEL INTO A SMALL SERVING MODEL
+        """
+        print("\n" + "="*60)
+        print("STEP 3b: DISTILLATION INTO A SERVING MODEL")
+        print("="*60)
         
-        return self.best_model, final_accuracy
+        print(f"Teacher: optimized {self.best_model_name}")
+        student_model, report = distill_model(
+            lambda X: self.predict_labels(self.best_model, X),
+            self.X_train, self.X_test,
+            student=student,
+            n_samples=n_samples,
+            agreement_threshold=agreement_threshold,
+        )
+        
+        if student_model is None:
+            print(f"No {student} student reached {agreement_threshold:.2%} agreement; "
+                  f"the API keeps serving the teacher")
+            return None, report
+        
+        student_accuracy = accuracy_score(self.y_test, student_model.predict(self.X_test))
+        report['accuracy'] = float(student_accuracy)
+        print(f"\nStudent ({student}, capacity {report['capacity']}) accuracy: {student_accuracy:.4f}")
+        
+        print("\nLatency comparison:")
+        report['latency'] = compare_latency(self.best_model, student_model, self.X_test)
+        
+        self.export_model(student_model, STUDENT_FILENAME)
+        return student_model, report
     
     def create_prediction_function(self):
         """
@@ -377,7 +599,7 @@ class CropRecommendationSystem:
                 input_data = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
                 
                 # Make prediction
-                prediction = model.predict(input_data)
+                prediction = decode_predictions(model, model.predict(input_data))
                 
                 return prediction[0]
             
@@ -423,7 +645,7 @@ class CropRecommendationSystem:
                 input_data = np.array([[N, P, K, temperature, humidity, ph, rainfall]])
                 
                 # Make prediction
-                crop_prediction = model.predict(input_data)[0]
+                crop_prediction = decode_predictions(model, model.predict(input_data))[0]
                 
                 # Calculate simulated yield (kg/ha)
                 base_yield = (N + P + K) / 10 * (humidity / 100)
@@ -476,37 +698,99 @@ class CropRecommendationSystem:
         
         return recommend_crop_enhanced
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options for the training pipeline"""
+    parser = argparse.ArgumentParser(description="Train the crop recommendation models")
+    parser.add_argument('--parallel', action='store_true',
+                        help="train the candidate models concurrently in a process pool")
+    parser.add_argument('--plots', action='store_true',
+                        help="render the training figures in a background process")
+    parser.add_argument('--selection', choices=['accuracy', 'serving'], default='accuracy',
+                        help="pick the best model by accuracy alone or by accuracy, "
+                             "latency and size")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.005,
+                        help="accuracy gap treated as a tie by --selection serving")
+    parser.add_argument('--latency-weight', type=float, default=1.0)
+    parser.add_argument('--size-weight', type=float, default=0.5)
+    parser.add_argument('--distill', action='store_true',
+                        help="distill the optimized model into a compact student for serving")
+    parser.add_argument('--student', choices=['tree', 'gbm'], default='tree')
+    parser.add_argument('--agreement', type=float, default=0.98,
+                        help="minimum fraction of synthetic samples where the student "
+                             "must agree with the teacher")
+    parser.add_argument('--distill-samples', type=int, default=200000)
+    parser.add_argument('--sample-rows', type=int, default=None,
+                        help="train on a generated dataset of about this many rows "
+                             "instead of Crop_recommendation.csv")
+    parser.add_argument('--timing-report', default=TIMING_REPORT_FILENAME,
+                        help="where to write the stage timing report")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="measure the peak allocation of each stage with tracemalloc")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main execution function"""
+    args = parse_args(argv)
     print("AI-Based Crop Recommendation System for SIH 2025")
     print("=" * 60)
     
     # Initialize the system
     crop_system = CropRecommendationSystem()
+    crop_system.timer = PipelineTimer(trace_memory=args.trace_memory)
     
     # Step 1: Load and analyze data
-    crop_system.load_and_analyze_data()
+    crop_system.load_and_analyze_data(sample_rows=args.sample_rows)
     
     # Step 2: Train and evaluate models
-    crop_system.train_and_evaluate_models()
+    crop_system.train_and_evaluate_models(
+        parallel=args.parallel,
+        selection=args.selection,
+        objective={
+            'accuracy_tolerance': args.accuracy_tolerance,
+            'latency_weight': args.latency_weight,
+            'size_weight': args.size_weight,
+        },
+    )
+    
+    # Save raw metrics; figures are drawn in the background while optimizing
+    with crop_system.timer.stage('training_report'):
+        crop_system.write_training_report(render_plots=args.plots)
     
     # Step 3: Optimize the best model
     crop_system.optimize_best_model()
     
+    # Step 3b: Distill into a compact serving model
+    if args.distill:
+        with crop_system.timer.stage('distillation'):
+            crop_system.distill_best_model(
+                student=args.student,
+                n_samples=args.distill_samples,
+                agreement_threshold=args.agreement,
+            )
+    
     # Step 4: Create prediction function
     recommend_crop = crop_system.create_prediction_function()
     
     # Step 5: Create enhanced prediction function
     recommend_crop_enhanced = crop_system.create_enhanced_prediction_function()
     
+    crop_system.timer.print_summary()
+    crop_system.timer.save(args.timing_report, pipeline='crop_recommendation_model',
+                           rows=len(crop_system.df), parallel=args.parallel)
+    
     print("\n" + "="*60)
     print("MODEL TRAINING COMPLETED SUCCESSFULLY!")
     print("="*60)
     print("Files generated:")
     print("- best_crop_recommendation_model.pkl (Trained model)")
-    print("- data_distribution.png (Data visualization)")
-    print("- correlation_heatmap.png (Feature correlations)")
-    print("- confusion_matrix_*.png (Model evaluation plots)")
+    if args.distill:
+        print(f"- {STUDENT_FILENAME} (Distilled serving model, if it reached the agreement threshold)")
+    print("- training_metrics.npz (Raw metrics for the training report)")
+    print(f"- {args.timing_report} (Stage timing report)")
+    if args.plots:
+        print("- data_distribution.png (Data visualization)")
+        print("- correlation_heatmap.png (Feature correlations)")
+        print("- confusion_matrix_*.png (Model evaluation plots)")
     
     return crop_system, recommend_crop, recommend_crop_enhanced
 
@@ -0,0 +1,166 @@
+"""
+Dataset Cache for the Crop Recommendation System
+Stores train/test splits, CV folds and float32 feature matrices keyed by a
+content hash of the source data and the split parameters
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split, StratifiedKFold
+
+CACHE_DIR = '.dataset_cache'
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_fingerprint(path, cache_dir=CACHE_DIR):
+    """
+    SHA-256 of a file, remembered by path, size and modification time so an
+    unchanged file isn't even re-read
+    """
+    stat = os.stat(path)
+    index_path = os.path.join(cache_dir, 'file-hashes.json')
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        index = {}
+
+    entry = index.get(os.path.abspath(path))
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hash_file(path)
+    index[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    return digest
+
+def hash_dataframe(df):
+    """SHA-256 of a DataFrame's values, columns and dtypes"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _cache_key(data_hash, **params):
+    """Combine the data hash and the split parameters into a cache key"""
+    payload = json.dumps({'data': data_hash, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+def _load(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+def _save(path, arrays):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary file first so an interrupted run can't leave a
+    # truncated cache entry behind
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def _build_split(df, features, target, test_size, random_state, stratify):
+    """Split row indices and build the float32 feature matrices"""
+    X = df[features].to_numpy(dtype=np.float32)
+    y = df[target].to_numpy(dtype=str)
+    train_idx, test_idx = train_test_split(
+        np.arange(len(df)), test_size=test_size, random_state=random_state,
+        stratify=y if stratify else None
+    )
+    return {
+        'train_idx': train_idx,
+        'test_idx': test_idx,
+        'X_train': X[train_idx],
+        'X_test': X[test_idx],
+        'y_train': y[train_idx],
+        'y_test': y[test_idx],
+    }
+
+def _split_for_key(key, cache_dir, build_split):
+    """Load the split stored under `key`, building and caching it on a miss"""
+    path = os.path.join(cache_dir, f'split-{key}.npz')
+
+    if os.path.exists(path):
+        split = _load(path)
+        print(f"Loaded cached split {key}")
+    else:
+        split = build_split()
+        _save(path, split)
+        print(f"Cached split {key}")
+
+    split['key'] = key
+    return split
+
+def cached_split(df, features, target='label', test_size=0.2, random_state=42,
+                 stratify=True, cache_dir=CACHE_DIR):
+    """
+    Train/test split of `df` as float32 feature matrices, loaded from the cache
+    when the same data was already split with the same parameters
+
+    Returns a dict with X_train, X_test, y_train, y_test, the train/test row
+    indices and the cache `key`.
+    """
+    key = _cache_key(hash_dataframe(df[features + [target]]), features=features,
+                     target=target, test_size=test_size, random_state=random_state,
+                     stratify=stratify)
+    return _split_for_key(key, cache_dir, lambda: _build_split(
+        df, features, target, test_size, random_state, stratify
+    ))
+
+def cached_split_from_csv(csv_path, features, target='label', test_size=0.2,
+                          random_state=42, stratify=True, cache_dir=CACHE_DIR):
+    """
+    Like cached_split, but keyed by the CSV file's bytes so a cache hit
+    doesn't need to parse the file at all (or hash it, if its size and
+    modification time are unchanged)
+    """
+    key = _cache_key(file_fingerprint(csv_path, cache_dir), features=features, target=target,
+                     test_size=test_size, random_state=random_state, stratify=stratify)
+    return _split_for_key(key, cache_dir, lambda: _build_split(
+        pd.read_csv(csv_path), features, target, test_size, random_state, stratify
+    ))
+
+def split_dataframe(split, features, target='label'):
+    """The split's rows back in their original order as a DataFrame (float32 feature values)"""
+    n_rows = len(split['train_idx']) + len(split['test_idx'])
+    X = np.empty((n_rows, len(features)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=split['y_train'].dtype)
+    for part in ('train', 'test'):
+        X[split[f'{part}_idx']] = split[f'X_{part}']
+        y[split[f'{part}_idx']] = split[f'y_{part}']
+    df = pd.DataFrame(X, columns=features)
+    df[target] = y
+    return df
+
+def cached_cv_folds(split, n_splits=5, cache_dir=CACHE_DIR):
+    """
+    Stratified K-fold (train, validation) index pairs over the training part
+    of a cached split, in the form GridSearchCV accepts for `cv`
+
+    The folds match GridSearchCV's default cv=n_splits for classifiers.
+    """
+    path = os.path.join(cache_dir, f"folds-{split['key']}-{n_splits}.npz")
+
+    if os.path.exists(path):
+        arrays = _load(path)
+    else:
+        folds = StratifiedKFold(n_splits=n_splits).split(split['X_train'], split['y_train'])
+        arrays = {}
+        for i, (train, validation) in enumerate(folds):
+            arrays[f'train_{i}'] = train
+            arrays[f'validation_{i}'] = validation
+        _save(path, arrays)
+
+    return [(arrays[f'train_{i}'], arrays[f'validation_{i}']) for i in range(n_splits)]
@@ -0,0 +1,109 @@
+"""
+Model Distillation for the Crop Recommendation System
+Trains a compact student model to reproduce the tuned teacher's predictions
+on a large synthetic sample, for fast inference on low-end edge devices
+"""
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
+from serving_selection import benchmark_model
+
+STUDENT_FILENAME = 'crop_recommendation_student.pkl'
+
+# Student sizes tried in order, smallest first; the first one that reaches
+# the agreement threshold is kept
+STUDENT_CAPACITIES = {
+    'tree': [4, 6, 8, 10, 12, 14, 16],       # max_depth
+    'gbm': [10, 20, 40, 80],                 # boosting iterations of depth-3 trees
+}
+
+def build_student(kind, capacity, random_state=42):
+    """Create an untrained student of the given kind and capacity"""
+    if kind == 'tree':
+        return DecisionTreeClassifier(max_depth=capacity, random_state=random_state)
+    elif kind == 'gbm':
+        return HistGradientBoostingClassifier(
+            max_iter=capacity, max_depth=3, learning_rate=0.3,
+            early_stopping=False, random_state=random_state
+        )
+    raise ValueError(f"Unknown student model: {kind}")
+
+def synthetic_sample(X, n_samples, random_state=42, jitter=0.1):
+    """
+    Draw a synthetic feature sample around the training data
+
+    Half the rows are uniform over the training range (plus a 5% margin) so the
+    student learns the teacher's decision boundaries everywhere; the other half
+    are training rows with Gaussian noise of `jitter` standard deviations, so
+    the dense regions farmers actually send are well covered.
+
+    Returns the sample and a mask of the rows drawn around training data.
+    """
+    rng = np.random.default_rng(random_state)
+    X = np.asarray(X, dtype=np.float32)
+    low, high = X.min(axis=0), X.max(axis=0)
+    margin = 0.05 * (high - low)
+
+    n_uniform = n_samples // 2
+    uniform = rng.uniform(low - margin, high + margin, size=(n_uniform, X.shape[1]))
+    rows = X[rng.integers(0, len(X), size=n_samples - n_uniform)]
+    jittered = rows + rng.normal(0, jitter * X.std(axis=0), size=rows.shape)
+
+    sample = np.vstack([uniform, jittered]).astype(np.float32)
+    near_data = np.arange(n_samples) >= n_uniform
+    order = rng.permutation(n_samples)
+    return sample[order], near_data[order]
+
+def distill_model(teacher_predict, X_train, X_test, student='tree', n_samples=200000,
+                  agreement_threshold=0.98, random_state=42):
+    """
+    Train the smallest student that agrees with the teacher on at least
+    `agreement_threshold` of the held-out synthetic rows drawn around the
+    training data (agreement over the whole synthetic range is reported too)
+
+    `teacher_predict` maps a feature matrix to crop names. Returns the student
+    (or None when no capacity reached the threshold) and a report dict.
+    """
+    print(f"Labeling {n_samples} synthetic samples with the teacher...")
+    X_synthetic, near_data = synthetic_sample(X_train, n_samples, random_state)
+    y_synthetic = teacher_predict(X_synthetic)
+
+    n_fit = int(n_samples * 0.8)
+    X_fit, y_fit = X_synthetic[:n_fit], y_synthetic[:n_fit]
+    X_val, y_val, val_near_data = X_synthetic[n_fit:], y_synthetic[n_fit:], near_data[n_fit:]
+    y_test_teacher = teacher_predict(X_test)
+
+    report = {'student': student, 'agreement_threshold': agreement_threshold, 'attempts': []}
+    for capacity in STUDENT_CAPACITIES[student]:
+        model = build_student(student, capacity, random_state)
+        model.fit(X_fit, y_fit)
+        matches = model.predict(X_val) == y_val
+        attempt = {
+            'capacity': capacity,
+            'agreement': float(np.mean(matches[val_near_data])),
+            'full_range_agreement': float(np.mean(matches)),
+            'test_agreement': float(np.mean(model.predict(X_test) == y_test_teacher)),
+        }
+        report['attempts'].append(attempt)
+        print(f"  {student} capacity {capacity}: agreement {attempt['agreement']:.4f} "
+              f"(full range {attempt['full_range_agreement']:.4f}, "
+              f"test set {attempt['test_agreement']:.4f})")
+        if attempt['agreement'] >= agreement_threshold:
+            report.update(attempt)
+            return model, report
+
+    return None, report
+
+def compare_latency(teacher, student, X):
+    """Benchmark teacher and student and print a side-by-side comparison"""
+    teacher_stats = benchmark_model(teacher, X)
+    student_stats = benchmark_model(student, X)
+
+    print(f"\n{'':<10} {'1-row ms':>9} {'Batch us/row':>13} {'Size KB':>9}")
+    for name, stats in [('Teacher', teacher_stats), ('Student', student_stats)]:
+        print(f"{name:<10} {stats['single_row_ms']:>9.3f} {stats['batch_us_per_row']:>13.2f} "
+              f"{stats['size_kb']:>9.1f}")
+    print(f"Single-row speed-up: {teacher_stats['single_row_ms'] / student_stats['single_row_ms']:.1f}x")
+
+    return {'teacher': teacher_stats, 'student': student_stats}
@@ -0,0 +1,233 @@
+"""
+Pipeline Timing for the Crop Recommendation System
+Stage-level wall time, CPU time and peak memory for the training scripts,
+and a benchmark mode that reruns a pipeline at growing dataset sizes to show
+which stage scales worst
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TIMING_REPORT_FILENAME = 'pipeline_timing.json'
+
+def _rss_high_water_mb():
+    """Highest resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class PipelineTimer:
+    """
+    Records how long each named stage takes
+
+    Stages can be nested; a nested stage is reported as `outer/inner`. With
+    `trace_memory=True` the peak Python/NumPy allocation inside each stage is
+    measured with tracemalloc, which slows pure-Python stages down noticeably.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._open = []
+        self._start = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _update_peaks(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._open:
+            frame['peak'] = max(frame['peak'], peak)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the `with` block as a pipeline stage"""
+        frame = {'name': '/'.join([f['name'] for f in self._open[-1:]] + [name]), 'peak': 0}
+        if self.trace_memory:
+            self._update_peaks()
+            tracemalloc.reset_peak()
+            frame['base'] = tracemalloc.get_traced_memory()[0]
+        self._open.append(frame)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+            details = {}
+            if self.trace_memory:
+                self._update_peaks()
+                details['peak_traced_mb'] = (frame['peak'] - frame['base']) / 1e6
+            self._open.pop()
+            self.record(frame['name'], seconds, cpu_seconds=cpu_seconds, **details)
+
+    def record(self, name, seconds, **details):
+        """Add a stage timed elsewhere, e.g. a model fitted in a worker process"""
+        self.stages.append({
+            'stage': name,
+            'seconds': seconds,
+            'rss_high_water_mb': _rss_high_water_mb(),
+            **details,
+        })
+
+    def report(self, **meta):
+        return {
+            **meta,
+            'total_seconds': time.perf_counter() - self._start,
+            'trace_memory': self.trace_memory,
+            'stages': self.stages,
+        }
+
+    def save(self, path=TIMING_REPORT_FILENAME, **meta):
+        with open(path, 'w') as f:
+            json.dump(self.report(**meta), f, indent=2)
+        print(f"Stage timing report saved as: {path}")
+
+    def print_summary(self):
+        print(f"\n--- PIPELINE STAGE TIMING ---")
+        header = f"{'Stage':<36} {'Wall (s)':>9} {'CPU (s)':>9} {'RSS max MB':>11}"
+        if self.trace_memory:
+            header += f" {'Peak alloc MB':>14}"
+        print(header)
+        for stage in self.stages:
+            cpu = stage.get('cpu_seconds')
+            rss = stage['rss_high_water_mb']
+            cpu = f"{cpu:>9.3f}" if cpu is not None else f"{'-':>9}"
+            rss = f"{rss:>11.1f}" if rss is not None else f"{'-':>11}"
+            line = f"{stage['stage']:<36} {stage['seconds']:>9.3f} {cpu} {rss}"
+            if self.trace_memory and 'peak_traced_mb' in stage:
+                line += f" {stage['peak_traced_mb']:>14.1f}"
+            print(line)
+
+# Benchmark mode: each size runs the real training script in a scratch
+# working directory, so models, caches and the backend copy stay out of the repo
+
+PIPELINE_SCRIPTS = {
+    'simple': ('train_model_simple.py', '--rows'),
+    'full': ('crop_recommendation_model.py', '--sample-rows'),
+}
+
+def run_pipeline_at_size(pipeline, rows, trace_memory=False):
+    """Run one training pipeline on `rows` synthetic rows and return its timing report"""
+    script, rows_flag = PIPELINE_SCRIPTS[pipeline]
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+
+    workdir = tempfile.mkdtemp(prefix='crop_pipeline_')
+    try:
+        run_dir = os.path.join(workdir, 'ml_model')
+        os.makedirs(run_dir)
+        os.makedirs(os.path.join(workdir, 'backend'))
+        report_path = os.path.join(run_dir, TIMING_REPORT_FILENAME)
+        command = [sys.executable, script_path, rows_flag, str(rows), '--timing-report', report_path]
+        if trace_memory:
+            command.append('--trace-memory')
+
+        with open(os.path.join(workdir, 'output.log'), 'w') as log:
+            result = subprocess.run(command, cwd=run_dir, stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            with open(os.path.join(workdir, 'output.log')) as log:
+                tail = log.read()[-2000:]
+            raise RuntimeError(f"{script} failed at {rows} rows:\n{tail}")
+
+        with open(report_path) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def scaling_table(reports):
+    """
+    Per-stage seconds at each size and the growth exponent between the two
+    largest sizes (1 means linear, 2 quadratic)
+    """
+    sizes = sorted(reports)
+    stages = []
+    for rows in sizes:
+        for stage in reports[rows]['stages']:
+            if stage['stage'] not in stages:
+                stages.append(stage['stage'])
+
+    table = {}
+    for name in stages:
+        seconds = {}
+        for rows in sizes:
+            matching = [s['seconds'] for s in reports[rows]['stages'] if s['stage'] == name]
+            if matching:
+                seconds[rows] = sum(matching)
+        exponent = None
+        measured = sorted(seconds)
+        if len(measured) >= 2:
+            small, large = measured[-2], measured[-1]
+            if seconds[small] > 0 and seconds[large] > 0:
+                exponent = math.log(seconds[large] / seconds[small]) / math.log(large / small)
+        table[name] = {'seconds': seconds, 'growth_exponent': exponent}
+    return table
+
+def print_scaling_table(table, sizes):
+    print(f"\n--- STAGE SCALING (seconds) ---")
+    print(f"{'Stage':<36}" + ''.join(f" {rows:>10,}" for rows in sizes) + f" {'Growth':>7}")
+    for name, row in table.items():
+        cells = ''.join(
+            f" {row['seconds'][rows]:>10.3f}" if rows in row['seconds'] else f" {'-':>10}"
+            for rows in sizes
+        )
+        growth = f"{row['growth_exponent']:>7.2f}" if row['growth_exponent'] is not None else f"{'-':>7}"
+        print(f"{name:<36}{cells} {growth}")
+
+    largest = sizes[-1]
+    timed = {name: row['seconds'][largest] for name, row in table.items() if largest in row['seconds']}
+    if timed:
+        slowest = max(timed, key=timed.get)
+        print(f"\nSlowest stage at {largest:,} rows: {slowest} ({timed[slowest]:.1f}s)")
+    growing = {name: row['growth_exponent'] for name, row in table.items()
+               if row['growth_exponent'] is not None}
+    if growing:
+        steepest = max(growing, key=growing.get)
+        print(f"Fastest-growing stage: {steepest} (time ~ rows^{growing[steepest]:.2f})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark a training pipeline at growing dataset sizes")
+    parser.add_argument('--pipeline', choices=list(PIPELINE_SCRIPTS), default='simple',
+                        help="'simple' runs train_model_simple.py, 'full' runs "
+                             "crop_recommendation_model.py (grid search makes it slow at large sizes)")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also measure the peak allocation of each stage with tracemalloc")
+    parser.add_argument('--output', default='pipeline_scaling.json')
+    args = parser.parse_args()
+
+    reports = {}
+    for rows in sorted(args.rows):
+        print(f"Running the {args.pipeline} pipeline on {rows:,} rows...")
+        start = time.perf_counter()
+        reports[rows] = run_pipeline_at_size(args.pipeline, rows, args.trace_memory)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    sizes = sorted(reports)
+    table = scaling_table(reports)
+    print_scaling_table(table, sizes)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'pipeline': args.pipeline,
+            'rows': sizes,
+            'runs': {str(rows): reports[rows] for rows in sizes},
+            'scaling': {name: {'seconds': {str(k): v for k, v in row['seconds'].items()},
+                               'growth_exponent': row['growth_exponent']}
+                        for name, row in table.items()},
+        }, f, indent=2)
+    print(f"\nScaling report saved as {args.output}")
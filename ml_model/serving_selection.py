@@ -0,0 +1,134 @@
+"""
+Serving-Cost-Aware Model Selection for the Crop Recommendation System
+Benchmarks each candidate's prediction latency and serialized size and picks
+the model by a configurable accuracy/latency/size objective. Latency is
+measured under the API's thread budget (backend/serving_config.py), so it
+is the latency the served model will have.
+"""
+
+import os
+import pickle
+import sys
+import time
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from serving_config import NATIVE_THREADS, configure_model
+
+# Candidates within `accuracy_tolerance` of the most accurate one are treated
+# as equally accurate; among those the lowest weighted serving cost wins.
+# Latency and size are scored relative to the best eligible candidate.
+DEFAULT_OBJECTIVE = {
+    'accuracy_tolerance': 0.005,
+    'latency_weight': 1.0,
+    'size_weight': 0.5,
+}
+
+def serialized_size(model):
+    """Size in bytes of the pickled model, as it would be saved for the API"""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+def _median_seconds(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def benchmark_model(model, X, single_row_repeats=100, batch_size=1000, batch_repeats=5):
+    """
+    Measure single-row and batch latency and the serialized size. Latency is
+    of `predict_proba` where the model has it, since that is what the APIs
+    call for the confidence, and of `predict` otherwise. A copy of the model
+    is timed with the serving thread budget applied, as the API loads it.
+
+    Returns single_row_ms (median latency of a one-row call), batch_us_per_row
+    (median batch latency divided by the batch size) and size_kb.
+    """
+    X = np.asarray(X)
+    row = X[:1]
+    batch = X[np.arange(batch_size) % len(X)]
+    served = configure_model(pickle.loads(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)))
+    predict = getattr(served, 'predict_proba', None) or served.predict
+
+    with threadpool_limits(limits=NATIVE_THREADS):
+        predict(row)  # warm up
+        single_row = _median_seconds(lambda: predict(row), single_row_repeats)
+        batch_seconds = _median_seconds(lambda: predict(batch), batch_repeats)
+
+    return {
+        'single_row_ms': single_row * 1e3,
+        'batch_us_per_row': batch_seconds / batch_size * 1e6,
+        'size_kb': serialized_size(model) / 1024,
+    }
+
+def pareto_front(candidates):
+    """
+    Names of the candidates not dominated on accuracy (higher is better),
+    single-row latency and size (lower is better)
+    """
+    def dominates(a, b):
+        no_worse = (a['accuracy'] >= b['accuracy']
+                    and a['single_row_ms'] <= b['single_row_ms']
+                    and a['size_kb'] <= b['size_kb'])
+        better = (a['accuracy'] > b['accuracy']
+                  or a['single_row_ms'] < b['single_row_ms']
+                  or a['size_kb'] < b['size_kb'])
+        return no_worse and better
+
+    return {
+        name for name, stats in candidates.items()
+        if not any(dominates(other, stats) for other_name, other in candidates.items()
+                   if other_name != name)
+    }
+
+def serving_cost(stats, eligible, objective):
+    """Weighted latency and size of a candidate relative to the best eligible one"""
+    best_latency = min(s['single_row_ms'] for s in eligible.values())
+    best_size = min(s['size_kb'] for s in eligible.values())
+    return (objective['latency_weight'] * stats['single_row_ms'] / best_latency
+            + objective['size_weight'] * stats['size_kb'] / best_size)
+
+def select_model(models, accuracies, X, objective=None):
+    """
+    Benchmark every trained model and pick one by the serving objective
+
+    `models` and `accuracies` are keyed by model name. Returns the chosen name
+    and the per-model statistics (accuracy, latency, size, cost, pareto).
+    """
+    objective = {**DEFAULT_OBJECTIVE, **(objective or {})}
+
+    candidates = {}
+    for name, model in models.items():
+        candidates[name] = {'accuracy': accuracies[name], **benchmark_model(model, X)}
+
+    best_accuracy = max(stats['accuracy'] for stats in candidates.values())
+    eligible = {
+        name: stats for name, stats in candidates.items()
+        if stats['accuracy'] >= best_accuracy - objective['accuracy_tolerance']
+    }
+    front = pareto_front(candidates)
+    for name, stats in candidates.items():
+        stats['pareto'] = name in front
+        stats['cost'] = serving_cost(stats, eligible, objective) if name in eligible else None
+
+    chosen = min(eligible, key=lambda name: eligible[name]['cost'])
+    print_selection_report(candidates, chosen, objective)
+    return chosen, candidates
+
+def print_selection_report(candidates, chosen, objective):
+    """Print the benchmark table with the Pareto front and the chosen model"""
+    print(f"\n--- SERVING COST REPORT ---")
+    print(f"Objective: accuracy within {objective['accuracy_tolerance']:.3f} of the best, "
+          f"latency weight {objective['latency_weight']}, size weight {objective['size_weight']}")
+    print(f"{'Model':<22} {'Accuracy':>9} {'1-row ms':>9} {'Batch us/row':>13} "
+          f"{'Size KB':>9} {'Cost':>6}  Pareto")
+    for name, stats in sorted(candidates.items(), key=lambda item: -item[1]['accuracy']):
+        cost = f"{stats['cost']:.2f}" if stats['cost'] is not None else '-'
+        marker = '*' if stats['pareto'] else ''
+        chosen_marker = '  <- selected' if name == chosen else ''
+        print(f"{name:<22} {stats['accuracy']:>9.4f} {stats['single_row_ms']:>9.3f} "
+              f"{stats['batch_us_per_row']:>13.2f} {stats['size_kb']:>9.1f} {cost:>6}  "
+              f"{marker:^6}{chosen_marker}")
@@ -5,93 +5,103 @@ Optimized for SIH 2025 - Jharkhand Agriculture App
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+from dataset_cache import cached_split
+from pipeline_timing import PipelineTimer, TIMING_REPORT_FILENAME
+import argparse
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
 # Set random seed for reproducibility
 np.random.seed(42)
 
-def create_enhanced_dataset():
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+MODEL_FILENAME = 'crop_recommendation_model.pkl'
+
+# Training rows and the held-out test set kept for incremental retraining
+RETRAIN_CACHE_FILENAME = 'retrain_cache.npz'
+
+# Optimal growing conditions of each crop, used to generate the training data
+CROPS_DATA = {
+    'rice': {
+        'N': (80, 120), 'P': (40, 60), 'K': (40, 60), 
+        'temp': (22, 30), 'humidity': (75, 90), 
+        'ph': (5.5, 7.0), 'rainfall': (150, 300)
+    },
+    'wheat': {
+        'N': (50, 80), 'P': (30, 50), 'K': (30, 50), 
+        'temp': (15, 25), 'humidity': (50, 70), 
+        'ph': (6.0, 7.5), 'rainfall': (50, 100)
+    },
+    'maize': {
+        'N': (80, 120), 'P': (40, 60), 'K': (20, 40), 
+        'temp': (20, 28), 'humidity': (55, 75), 
+        'ph': (5.8, 7.0), 'rainfall': (80, 180)
+    },
+    'cotton': {
+        'N': (120, 160), 'P': (40, 80), 'K': (40, 80), 
+        'temp': (25, 35), 'humidity': (60, 80), 
+        'ph': (5.8, 8.0), 'rainfall': (60, 120)
+    },
+    'sugarcane': {
+        'N': (100, 150), 'P': (50, 80), 'K': (50, 80), 
+        'temp': (24, 32), 'humidity': (70, 85), 
+        'ph': (6.0, 7.5), 'rainfall': (120, 200)
+    },
+    'chickpea': {
+        'N': (40, 70), 'P': (60, 85), 'K': (80, 120), 
+        'temp': (18, 28), 'humidity': (40, 65), 
+        'ph': (6.2, 7.8), 'rainfall': (30, 100)
+    },
+    'kidney_beans': {
+        'N': (20, 40), 'P': (60, 80), 'K': (20, 40), 
+        'temp': (20, 28), 'humidity': (60, 75), 
+        'ph': (6.0, 7.5), 'rainfall': (80, 150)
+    },
+    'banana': {
+        'N': (100, 120), 'P': (75, 85), 'K': (50, 60), 
+        'temp': (26, 32), 'humidity': (75, 85), 
+        'ph': (6.0, 7.5), 'rainfall': (100, 180)
+    }
+}
+
+def generate_crop_sample(crop, params, rng=np.random, noise_factor=0.15):
+    """One synthetic soil/climate row for `crop`, drawn from its growing ranges"""
+    # Add realistic variation to the data
+    sample = {
+        'N': rng.uniform(params['N'][0], params['N'][1]) * (1 + rng.uniform(-noise_factor, noise_factor)),
+        'P': rng.uniform(params['P'][0], params['P'][1]) * (1 + rng.uniform(-noise_factor, noise_factor)),
+        'K': rng.uniform(params['K'][0], params['K'][1]) * (1 + rng.uniform(-noise_factor, noise_factor)),
+        'temperature': rng.uniform(params['temp'][0], params['temp'][1]) * (1 + rng.uniform(-noise_factor/2, noise_factor/2)),
+        'humidity': rng.uniform(params['humidity'][0], params['humidity'][1]) * (1 + rng.uniform(-noise_factor/2, noise_factor/2)),
+        'ph': rng.uniform(params['ph'][0], params['ph'][1]) * (1 + rng.uniform(-noise_factor/3, noise_factor/3)),
+        'rainfall': rng.uniform(params['rainfall'][0], params['rainfall'][1]) * (1 + rng.uniform(-noise_factor, noise_factor)),
+        'label': crop
+    }
+
+    # Ensure values are within reasonable bounds
+    sample['N'] = max(10, min(200, sample['N']))
+    sample['P'] = max(5, min(150, sample['P']))
+    sample['K'] = max(5, min(300, sample['K']))
+    sample['temperature'] = max(10, min(45, sample['temperature']))
+    sample['humidity'] = max(20, min(100, sample['humidity']))
+    sample['ph'] = max(4.0, min(9.0, sample['ph']))
+    sample['rainfall'] = max(20, min(400, sample['rainfall']))
+    
+    return sample
+
+def create_enhanced_dataset(samples_per_crop=300):
     """Create a comprehensive crop dataset with realistic parameters"""
     print("Creating enhanced crop dataset...")
     
-    # Define crop types with their optimal growing conditions
-    crops_data = {
-        'rice': {
-            'N': (80, 120), 'P': (40, 60), 'K': (40, 60), 
-            'temp': (22, 30), 'humidity': (75, 90), 
-            'ph': (5.5, 7.0), 'rainfall': (150, 300)
-        },
-        'wheat': {
-            'N': (50, 80), 'P': (30, 50), 'K': (30, 50), 
-            'temp': (15, 25), 'humidity': (50, 70), 
-            'ph': (6.0, 7.5), 'rainfall': (50, 100)
-        },
-        'maize': {
-            'N': (80, 120), 'P': (40, 60), 'K': (20, 40), 
-            'temp': (20, 28), 'humidity': (55, 75), 
-            'ph': (5.8, 7.0), 'rainfall': (80, 180)
-        },
-        'cotton': {
-            'N': (120, 160), 'P': (40, 80), 'K': (40, 80), 
-            'temp': (25, 35), 'humidity': (60, 80), 
-            'ph': (5.8, 8.0), 'rainfall': (60, 120)
-        },
-        'sugarcane': {
-            'N': (100, 150), 'P': (50, 80), 'K': (50, 80), 
-            'temp': (24, 32), 'humidity': (70, 85), 
-            'ph': (6.0, 7.5), 'rainfall': (120, 200)
-        },
-        'chickpea': {
-            'N': (40, 70), 'P': (60, 85), 'K': (80, 120), 
-            'temp': (18, 28), 'humidity': (40, 65), 
-            'ph': (6.2, 7.8), 'rainfall': (30, 100)
-        },
-        'kidney_beans': {
-            'N': (20, 40), 'P': (60, 80), 'K': (20, 40), 
-            'temp': (20, 28), 'humidity': (60, 75), 
-            'ph': (6.0, 7.5), 'rainfall': (80, 150)
-        },
-        'banana': {
-            'N': (100, 120), 'P': (75, 85), 'K': (50, 60), 
-            'temp': (26, 32), 'humidity': (75, 85), 
-            'ph': (6.0, 7.5), 'rainfall': (100, 180)
-        }
-    }
-    
     data = []
-    samples_per_crop = 300  # Generate more samples for better training
     
-    for crop, params in crops_data.items():
+    for crop, params in CROPS_DATA.items():
         for _ in range(samples_per_crop):
-            # Add realistic variation to the data
-            noise_factor = 0.15
-            
-            sample = {
-                'N': np.random.uniform(params['N'][0], params['N'][1]) * (1 + np.random.uniform(-noise_factor, noise_factor)),
-                'P': np.random.uniform(params['P'][0], params['P'][1]) * (1 + np.random.uniform(-noise_factor, noise_factor)),
-                'K': np.random.uniform(params['K'][0], params['K'][1]) * (1 + np.random.uniform(-noise_factor, noise_factor)),
-                'temperature': np.random.uniform(params['temp'][0], params['temp'][1]) * (1 + np.random.uniform(-noise_factor/2, noise_factor/2)),
-                'humidity': np.random.uniform(params['humidity'][0], params['humidity'][1]) * (1 + np.random.uniform(-noise_factor/2, noise_factor/2)),
-                'ph': np.random.uniform(params['ph'][0], params['ph'][1]) * (1 + np.random.uniform(-noise_factor/3, noise_factor/3)),
-                'rainfall': np.random.uniform(params['rainfall'][0], params['rainfall'][1]) * (1 + np.random.uniform(-noise_factor, noise_factor)),
-                'label': crop
-            }
-            
-            # Ensure values are within reasonable bounds
-            sample['N'] = max(10, min(200, sample['N']))
-            sample['P'] = max(5, min(150, sample['P']))
-            sample['K'] = max(5, min(300, sample['K']))
-            sample['temperature'] = max(10, min(45, sample['temperature']))
-            sample['humidity'] = max(20, min(100, sample['humidity']))
-            sample['ph'] = max(4.0, min(9.0, sample['ph']))
-            sample['rainfall'] = max(20, min(400, sample['rainfall']))
-            
-            data.append(sample)
+            data.append(generate_crop_sample(crop, params))
     
     df = pd.DataFrame(data)
     df = df.sample(frac=1, random_state=42).reset_index(drop=True)  # Shuffle
@@ -102,27 +112,58 @@ def create_enhanced_dataset():
     
     return df
 
-def train_crop_model():
-    """Train the crop recommendation model"""
+def save_model(model, model_filename=MODEL_FILENAME):
+    """Save the model and copy it to the backend directory"""
+    joblib.dump(model, model_filename)
+    print(f"\nModel saved as: {model_filename}")
+    
+    # Copy to backend directory
+    try:
+        import shutil
+        backend_path = '../backend/crop_recommendation_model.pkl'
+        shutil.copy(model_filename, backend_path)
+        print(f"Model copied to backend: {backend_path}")
+    except Exception as e:
+        print(f"Could not copy to backend: {e}")
+
+def save_retrain_cache(X_train, y_train, X_test, y_test, cache_path=RETRAIN_CACHE_FILENAME):
+    """Store the training rows and the held-out test set for incremental retraining"""
+    np.savez_compressed(
+        cache_path,
+        X_train=np.asarray(X_train, dtype=np.float64),
+        y_train=np.asarray(y_train, dtype=str),
+        X_test=np.asarray(X_test, dtype=np.float64),
+        y_test=np.asarray(y_test, dtype=str),
+    )
+    print(f"Retraining cache saved as: {cache_path}")
+
+def load_retrain_cache(cache_path=RETRAIN_CACHE_FILENAME):
+    """Load the arrays written by save_retrain_cache"""
+    with np.load(cache_path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+def train_crop_model(samples_per_crop=300, timer=None):
+    """Train the crop recommendation model, timing each stage with `timer`"""
+    timer = timer or PipelineTimer()
     print("="*60)
     print("TRAINING CROP RECOMMENDATION MODEL")
     print("="*60)
     
     # Create dataset
-    df = create_enhanced_dataset()
+    with timer.stage('data_generation'):
+        df = create_enhanced_dataset(samples_per_crop)
     
     # Prepare features and target
-    features = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
-    X = df[features]
-    y = df['label']
+    features = FEATURES
     
     print(f"\nFeature columns: {features}")
-    print(f"Target classes: {sorted(y.unique())}")
+    print(f"Target classes: {sorted(df['label'].unique())}")
     
-    # Split the data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    # Split the data (reused from the dataset cache when unchanged)
+    with timer.stage('split'):
+        split = cached_split(df, features, 'label', test_size=0.2, random_state=42)
+    X_train, X_test = split['X_train'], split['X_test']
+    y_train, y_test = split['y_train'], split['y_test']
     
     print(f"\nTraining set: {X_train.shape}")
     print(f"Testing set: {X_test.shape}")
@@ -139,11 +180,14 @@ def train_crop_model():
         n_jobs=-1
     )
     
-    model.fit(X_train, y_train)
+    with timer.stage('fit:Random Forest'):
+        model.fit(X_train, y_train)
     
     # Evaluate the model
-    y_pred = model.predict(X_test)
-    accuracy = accuracy_score(y_test, y_pred)
+    with timer.stage('evaluation'):
+        y_pred = model.predict(X_test)
+        accuracy = accuracy_score(y_test, y_pred)
+        report = classification_report(y_test, y_pred)
     
     print(f"\nModel Performance:")
     print(f"Accuracy: {accuracy:.4f}")
@@ -157,21 +201,14 @@ def train_crop_model():
     
     # Detailed classification report
     print(f"\nDetailed Classification Report:")
-    print(classification_report(y_test, y_pred))
+    print(report)
     
     # Save the model
-    model_filename = 'crop_recommendation_model.pkl'
-    joblib.dump(model, model_filename)
-    print(f"\nModel saved as: {model_filename}")
-    
-    # Copy to backend directory
-    try:
-        import shutil
-        backend_path = '../backend/crop_recommendation_model.pkl'
-        shutil.copy(model_filename, backend_path)
-        print(f"Model copied to backend: {backend_path}")
-    except Exception as e:
-        print(f"Could not copy to backend: {e}")
+    with timer.stage('serialization'):
+        save_model(model)
+        
+        # Keep the split around so later label batches can be added incrementally
+        save_retrain_cache(X_train, y_train, X_test, y_test)
     
     # Test the model with sample predictions
     print(f"\n" + "="*60)
@@ -211,7 +248,124 @@ def train_crop_model():
     
     return model, accuracy
 
+def incremental_retrain(new_data_path, model_path=MODEL_FILENAME,
+                        cache_path=RETRAIN_CACHE_FILENAME, trees_per_batch=50,
+                        max_trees=400, replay_per_class=50, max_accuracy_drop=0.01):
+    """
+    Add trees trained on a batch of newly labeled rows to the saved forest
+
+    The previous trees are kept (warm start) and `trees_per_batch` new trees
+    are grown on the new rows plus a small stratified replay sample of the
+    earlier training rows, so every crop is present in the batch. Once the
+    forest exceeds `max_trees` the oldest trees are dropped. The update is
+    only saved if accuracy on the cached held-out set drops by no more than
+    `max_accuracy_drop`.
+    """
+    print("="*60)
+    print("INCREMENTAL RETRAINING")
+    print("="*60)
+    
+    model = joblib.load(model_path)
+    cache = load_retrain_cache(cache_path)
+    
+    new_rows = pd.read_csv(new_data_path)
+    missing = [column for column in FEATURES + ['label'] if column not in new_rows.columns]
+    if missing:
+        raise ValueError(f"New data is missing columns: {missing}")
+    
+    X_new = new_rows[FEATURES].to_numpy(dtype=np.float64)
+    y_new = new_rows['label'].to_numpy(dtype=str)
+    
+    unknown = sorted(set(y_new) - set(model.classes_))
+    if unknown:
+        raise ValueError(f"New crops {unknown} need a full retrain (python train_model_simple.py)")
+    
+    # Batches are counted on the model: once the forest is capped its size
+    # stays the same, so it can't tell batches apart for seeding
+    batch_number = getattr(model, 'retrain_batches_', 0) + 1
+    base_seed = model.random_state if isinstance(model.random_state, int) else 0
+    batch_seed = np.random.SeedSequence([base_seed, batch_number])
+    
+    # Replay a few earlier rows of every crop so the new trees see all classes
+    rng = np.random.default_rng(batch_seed)
+    replay = np.concatenate([
+        rng.permutation(np.flatnonzero(cache['y_train'] == crop))[:replay_per_class]
+        for crop in model.classes_
+    ])
+    X_batch = np.vstack([X_new, cache['X_train'][replay]])
+    y_batch = np.concatenate([y_new, cache['y_train'][replay]])
+    
+    print(f"New labeled rows: {len(X_new)}")
+    print(f"Replayed rows: {len(replay)}")
+    
+    X_holdout = cache['X_test']
+    accuracy_before = accuracy_score(cache['y_test'], model.predict(X_holdout))
+    trees_before = len(model.estimators_)
+    
+    # Warm start derives the new trees' seeds from random_state, skipping one
+    # per existing tree, so a fixed random_state would repeat them every batch
+    random_state = model.random_state
+    model.set_params(warm_start=True, n_estimators=trees_before + trees_per_batch,
+                     random_state=int(batch_seed.generate_state(1)[0]))
+    model.fit(X_batch, y_batch)
+    model.set_params(warm_start=False, random_state=random_state)
+    model.retrain_batches_ = batch_number
+    
+    # Tree replacement: keep only the newest max_trees trees
+    if max_trees and len(model.estimators_) > max_trees:
+        dropped = len(model.estimators_) - max_trees
+        model.estimators_ = model.estimators_[dropped:]
+        model.set_params(n_estimators=max_trees)
+        print(f"Dropped the {dropped} oldest trees")
+    
+    accuracy_after = accuracy_score(cache['y_test'], model.predict(X_holdout))
+    
+    print(f"\nTrees: {trees_before} -> {len(model.estimators_)}")
+    print(f"Held-out accuracy: {accuracy_before:.4f} -> {accuracy_after:.4f}")
+    
+    if accuracy_after < accuracy_before - max_accuracy_drop:
+        print("Held-out accuracy dropped too far, keeping the previous model")
+        return None, accuracy_after
+    
+    save_model(model, model_path)
+    save_retrain_cache(
+        np.vstack([cache['X_train'], X_new]),
+        np.concatenate([cache['y_train'], y_new]),
+        cache['X_test'],
+        cache['y_test'],
+        cache_path,
+    )
+    return model, accuracy_after
+
 if __name__ == "__main__":
-    model, accuracy = train_crop_model()
-    print(f"\nFinal Model Accuracy: {accuracy:.4f}")
-    print("Model is ready for use in the backend API!")
+    parser = argparse.ArgumentParser(description="Train the crop recommendation model")
+    parser.add_argument('--incremental', metavar='CSV',
+                        help="add trees for a CSV of newly labeled rows instead of retraining")
+    parser.add_argument('--trees-per-batch', type=int, default=50)
+    parser.add_argument('--max-trees', type=int, default=400)
+    parser.add_argument('--rows', type=int, default=None,
+                        help="size of the generated dataset (default 300 rows per crop)")
+    parser.add_argument('--timing-report', default=TIMING_REPORT_FILENAME,
+                        help="where to write the stage timing report")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="measure the peak allocation of each stage with tracemalloc")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        if not os.path.exists(RETRAIN_CACHE_FILENAME):
+            parser.error("no retraining cache found, run a full training first")
+        model, accuracy = incremental_retrain(
+            args.incremental,
+            trees_per_batch=args.trees_per_batch,
+            max_trees=args.max_trees,
+        )
+        print(f"\nHeld-out Accuracy: {accuracy:.4f}")
+    else:
+        samples_per_crop = max(1, args.rows // len(CROPS_DATA)) if args.rows else 300
+        timer = PipelineTimer(trace_memory=args.trace_memory)
+        model, accuracy = train_crop_model(samples_per_crop, timer)
+        timer.print_summary()
+        timer.save(args.timing_report, pipeline='train_model_simple',
+                   rows=samples_per_crop * len(CROPS_DATA), accuracy=accuracy)
+        print(f"\nFinal Model Accuracy: {accuracy:.4f}")
+        print("Model is ready for use in the backend API!")
@@ -0,0 +1,107 @@
+"""
+Training Report for the Crop Recommendation System
+Stores the raw training metrics and renders the figures from them on request
+"""
+
+import argparse
+import multiprocessing
+import os
+import numpy as np
+
+REPORT_FILENAME = 'training_metrics.npz'
+
+def model_slug(name):
+    """File-name friendly version of a model name"""
+    return name.replace(" ", "_").lower()
+
+def save_training_metrics(metrics, path=REPORT_FILENAME):
+    """
+    Write the raw metrics collected during training to a compressed NPZ file
+
+    `metrics` maps names to arrays: the crop counts, per-feature histograms,
+    the correlation matrix and one confusion matrix per trained model.
+    """
+    arrays = {key: np.asarray(value) for key, value in metrics.items()}
+    np.savez_compressed(path, **arrays)
+    print(f"Training metrics saved as '{path}'")
+    return path
+
+def load_training_metrics(path=REPORT_FILENAME):
+    """Load metrics written by save_training_metrics"""
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+def render_training_report(path=REPORT_FILENAME, output_dir='.'):
+    """Render the data distribution, correlation and confusion matrix figures"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    metrics = load_training_metrics(path)
+    features = list(metrics['feature_names'])
+
+    # Crop distribution plus the first five feature histograms
+    plt.figure(figsize=(15, 10))
+    plt.subplot(2, 3, 1)
+    plt.bar(metrics['crop_labels'], metrics['crop_counts'])
+    plt.xticks(rotation=45)
+    plt.title('Distribution of Crops')
+    plt.xlabel('Crops')
+    plt.ylabel('Count')
+
+    for i, feature in enumerate(features[:5], 2):
+        counts = metrics['histogram_counts'][i - 2]
+        edges = metrics['histogram_edges'][i - 2]
+        plt.subplot(2, 3, i)
+        plt.stairs(counts, edges, fill=True, alpha=0.7)
+        plt.title(f'Distribution of {feature}')
+        plt.xlabel(feature)
+        plt.ylabel('Frequency')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'data_distribution.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+    print("Data distribution plot saved as 'data_distribution.png'")
+
+    # Correlation heatmap
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(metrics['correlation_matrix'], annot=True, cmap='coolwarm', center=0,
+                xticklabels=features, yticklabels=features)
+    plt.title('Feature Correlation Heatmap')
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'correlation_heatmap.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+    print("Correlation heatmap saved as 'correlation_heatmap.png'")
+
+    # Confusion matrices
+    classes = metrics.get('class_labels')
+    for name in metrics.get('model_names', []):
+        filename = f'confusion_matrix_{model_slug(name)}.png'
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(metrics[f'confusion_{model_slug(name)}'], annot=True, fmt='d', cmap='Blues',
+                    xticklabels=classes, yticklabels=classes)
+        plt.title(f'Confusion Matrix - {name}')
+        plt.xlabel('Predicted')
+        plt.ylabel('Actual')
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, filename), dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"Confusion matrix saved as '{filename}'")
+
+def render_in_background(path=REPORT_FILENAME, output_dir='.'):
+    """
+    Render the figures in a separate process so training can carry on.
+    The process is not a daemon, so the interpreter waits for it on exit.
+    """
+    process = multiprocessing.Process(target=render_training_report, args=(path, output_dir))
+    process.start()
+    print(f"Rendering training figures in background process {process.pid}")
+    return process
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render figures from saved training metrics")
+    parser.add_argument('path', nargs='?', default=REPORT_FILENAME)
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+    render_training_report(args.path, args.output_dir)
@@ -6,10 +6,33 @@ Alternative to React Native when Node.js/Expo setup is complex
 import http.server
 import socketserver
 import webbrowser
+import argparse
+import gzip
+import hashlib
+import mimetypes
 import os
+import posixpath
+import re
 import sys
 import threading
 import time
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types worth compressing; images and archives already are
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Assets requested with ?v=<content hash> never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Everything else (index.html, sw.js) is revalidated with its ETag on each visit
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Local src/href references in HTML, rewritten to versioned URLs
+ASSET_REFERENCE = re.compile(r'((?:src|href)=")([^"#?:]+)(")')
 
 def start_web_server():
     """Start a simple HTTP server for the web frontend"""
@@ -61,7 +84,206 @@ def start_web_server():
     
     return True
 
+class StaticAsset:
+    """A file held in memory with its ETag and compressed variants"""
+    
+    def __init__(self, body, content_type):
+        self.content_type = content_type
+        self.set_body(body)
+    
+    def set_body(self, body):
+        self.body = body
+        self.hash = hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {}
+        if self.content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed['br'] = brotli.compress(body, quality=11)
+            self.variants = {enc: data for enc, data in compressed.items() if len(data) < len(body)}
+    
+    def etag(self, encoding=None):
+        """Strong ETag of the body as sent: each encoding is a different representation"""
+        return f'"{self.hash}-{encoding}"' if encoding else f'"{self.hash}"'
+
+def load_static_assets(web_dir):
+    """
+    Read every file under web_dir into memory, keyed by URL path. Local
+    asset references in HTML get a ?v=<content hash> suffix so those assets
+    can be cached as immutable.
+    """
+    assets = {}
+    for root, _, files in os.walk(web_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            url = '/' + os.path.relpath(path, web_dir).replace(os.sep, '/')
+            content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type == 'application/javascript':
+                content_type += '; charset=utf-8'
+            with open(path, 'rb') as f:
+                assets[url] = StaticAsset(f.read(), content_type)
+    
+    def versioned(match, page_url):
+        # Resolve the reference the way the browser will, relative to the page
+        url = posixpath.normpath(posixpath.join(posixpath.dirname(page_url), match.group(2)))
+        if url not in assets:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}?v={assets[url].hash}{match.group(3)}"
+    
+    for url, asset in assets.items():
+        if asset.content_type.startswith('text/html'):
+            html = asset.body.decode('utf-8')
+            asset.set_body(ASSET_REFERENCE.sub(lambda match: versioned(match, url), html).encode('utf-8'))
+    
+    if '/index.html' in assets:
+        assets['/'] = assets['/index.html']
+    return assets
+
+def choose_encoding(accept_encoding, available):
+    """Preferred encoding (brotli, then gzip) that the client accepts and we have"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.strip() not in ('q=0', 'q=0.0'):
+            accepted.add(name.strip().lower())
+    for encoding in ('br', 'gzip'):
+        if encoding in available and encoding in accepted:
+            return encoding
+    return None
+
+def parse_range(header, size):
+    """(start, end) of a single `bytes=` range, None if absent, False if unsatisfiable"""
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', (header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(0, size - int(last)), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+class ProductionRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the in-memory assets with compression, ETags, caching and Range support"""
+    
+    assets = {}
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass  # per-request logging is too slow for production traffic
+    
+    def end_headers(self):
+        # Add CORS headers
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        super().end_headers()
+    
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def do_HEAD(self):
+        self.do_GET(head_only=True)
+    
+    def do_GET(self, head_only=False):
+        url = urlsplit(self.path)
+        asset = self.assets.get(url.path)
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
+        
+        versioned = parse_qs(url.query).get('v') == [asset.hash]
+        cache_control = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+        
+        # Ranges are served from the uncompressed body
+        byte_range = parse_range(self.headers.get('Range'), len(asset.body))
+        encoding = None if byte_range else choose_encoding(self.headers.get('Accept-Encoding'), asset.variants)
+        etag = asset.etag(encoding)
+        
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+        
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{len(asset.body)}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        if byte_range:
+            start, end = byte_range
+            body = asset.body[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(asset.body)}')
+        else:
+            body = asset.variants[encoding] if encoding else asset.body
+            self.send_response(200)
+        
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+def start_production_server(port=3000, open_browser=False):
+    """Serve web_frontend from memory with a thread per connection"""
+    web_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web_frontend')
+    if not os.path.exists(web_dir):
+        print("❌ Web frontend directory not found")
+        return False
+    
+    ProductionRequestHandler.assets = load_static_assets(web_dir)
+    total = sum(len(asset.body) for url, asset in ProductionRequestHandler.assets.items() if url != '/')
+    print(f"📦 Cached {len(ProductionRequestHandler.assets) - 1} files ({total / 1024:.0f} KB), "
+          f"compression: {'brotli + gzip' if brotli else 'gzip'}")
+    
+    try:
+        with http.server.ThreadingHTTPServer(("", port), ProductionRequestHandler) as httpd:
+            print(f"🌐 Production web server started at: http://localhost:{port}")
+            if open_browser:
+                def open_in_browser():
+                    time.sleep(2)
+                    webbrowser.open(f'http://localhost:{port}')
+                
+                threading.Thread(target=open_in_browser, daemon=True).start()
+            print("⚡ Press Ctrl+C to stop the server")
+            print("-" * 50)
+            httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Web frontend server stopped")
+    except Exception as e:
+        print(f"❌ Error starting web server: {e}")
+        return False
+    
+    return True
+
 def main():
+    parser = argparse.ArgumentParser(description="Serve the Crop Advisor web frontend")
+    parser.add_argument('--production', action='store_true',
+                        help="multi-threaded server with in-memory precompressed files, "
+                             "ETags, cache headers and Range support")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 3000)))
+    parser.add_argument('--no-browser', action='store_true')
+    args = parser.parse_args()
+    
+    if args.production:
+        start_production_server(args.port, open_browser=not args.no_browser)
+        return
+    
     print("🌾 Crop Advisor - Web Frontend")
     print("=" * 50)
     print("📝 Note: This is a web-based alternative to the React Native app")
@@ -0,0 +1,102 @@
+"""
+Parity test for the QuickScorer engine
+Trains small forests and XGBoost models on generated crop data and checks
+that QuickScorer's predict / predict_proba match the models' own, on the
+training ranges and well outside them. Runs standalone or under pytest:
+
+    python test_quickscorer.py
+"""
+
+import os
+import sys
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'ml_model'))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+from train_model_simple import CROPS_DATA, FEATURES, generate_crop_sample
+from quickscorer import QuickScorer
+
+try:
+    import xgboost
+except ImportError:
+    xgboost = None
+
+# Summation order differs from the models', so probabilities match to rounding
+PROBABILITY_TOLERANCE = 1e-6
+
+def crop_data(rows_per_crop=20, seed=0):
+    """Feature rows from every crop's training ranges and their crop index"""
+    rng = np.random.default_rng(seed)
+    X, y = [], []
+    for label, (crop, ranges) in enumerate(CROPS_DATA.items()):
+        for _ in range(rows_per_crop):
+            sample = generate_crop_sample(crop, ranges, rng=rng)
+            X.append([sample[feature] for feature in FEATURES])
+            y.append(label)
+    return np.array(X), np.array(y)
+
+def check_parity(model, X):
+    scorer = QuickScorer(model)
+    # Values far outside the training ranges reach the outermost leaves
+    wide = np.vstack([X, X * 3 - X.mean(axis=0), -X])
+    np.testing.assert_array_equal(scorer.predict(wide), model.predict(wide))
+    np.testing.assert_allclose(scorer.predict_proba(wide), model.predict_proba(wide),
+                               rtol=0, atol=PROBABILITY_TOLERANCE)
+    np.testing.assert_array_equal(scorer.predict_proba_binned(scorer.bin_features(wide)),
+                                  scorer.predict_proba(wide))
+
+def test_random_forest_parity():
+    X, y = crop_data()
+    check_parity(RandomForestClassifier(n_estimators=30, random_state=0).fit(X, y), X)
+    # Deep enough trees need several 64-bit words per bitvector
+    check_parity(RandomForestClassifier(n_estimators=5, min_samples_leaf=1, random_state=1)
+                 .fit(X, np.arange(len(y)) % 97), X)
+
+def test_string_labels_parity():
+    X, y = crop_data()
+    crops = np.array(list(CROPS_DATA))[y]
+    check_parity(RandomForestClassifier(n_estimators=10, random_state=0).fit(X, crops), X)
+
+def test_decision_tree_parity():
+    X, y = crop_data()
+    check_parity(DecisionTreeClassifier(random_state=0).fit(X, y), X)
+
+def test_xgboost_multiclass_parity():
+    if xgboost is None:
+        print("⚠️  xgboost not installed, skipping")
+        return
+    X, y = crop_data()
+    check_parity(xgboost.XGBClassifier(n_estimators=20, max_depth=4, random_state=0).fit(X, y), X)
+    check_parity(xgboost.XGBClassifier(n_estimators=5, max_depth=3, num_parallel_tree=2,
+                                       subsample=0.8, random_state=0).fit(X, y), X)
+
+def test_xgboost_early_stopped_parity():
+    if xgboost is None:
+        print("⚠️  xgboost not installed, skipping")
+        return
+    X, y = crop_data()
+    model = xgboost.XGBClassifier(n_estimators=200, max_depth=3, early_stopping_rounds=3, random_state=0)
+    model.fit(X[::2], y[::2], eval_set=[(X[1::2], y[1::2])], verbose=False)
+    check_parity(model, X)
+
+def test_xgboost_binary_rejected():
+    if xgboost is None:
+        print("⚠️  xgboost not installed, skipping")
+        return
+    X, y = crop_data()
+    model = xgboost.XGBClassifier(n_estimators=5, max_depth=3).fit(X, y % 2)
+    try:
+        QuickScorer(model)
+    except TypeError:
+        return
+    raise AssertionError("QuickScorer accepted a binary:logistic XGBoost model")
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"\n🎉 {len(tests)} QuickScorer parity tests passed")
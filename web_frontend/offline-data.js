@@ -1,255 +1,398 @@
 // Offline Data for Crop Advisor
-// This contains all the essential data for offline functionality
+// This contains all the essential data for offline functionality.
+// The data section is generated from the backend's crop catalog by
+// backend/build_offline_data.py; the functions below are hand-written.
+
+const OFFLINE_BUNDLE_STORAGE_KEY = 'crop-advisor-offline-bundle';
 
 const OFFLINE_CROP_DATA = {
+    // BEGIN GENERATED DATA - edit the catalog and run backend/build_offline_data.py
+    version: 'b11e2301e18e3203',
     crops: {
-        'rice': {
-            name_en: 'Rice',
-            name_hi: 'धान',
-            emoji: '🌾',
-            season: 'Kharif / खरीफ',
-            water_requirement: 'High / उच्च',
-            investment_per_ha: 45000,
-            expected_revenue_per_ha: 75000,
-            expected_profit_per_ha: 30000,
-            profit_margin: '40%',
-            current_market_price: 25.50,
-            suitable_districts: ['Ranchi / रांची', 'Dhanbad / धनबाद', 'Jamshedpur / जमशेदपुर', 'Bokaro / बोकारो']
+        "rice": {
+            "name_en": "Rice",
+            "name_hi": "धान",
+            "emoji": "🌾",
+            "season": "Kharif / खरीफ",
+            "water_requirement": "High / उच्च",
+            "investment_per_ha": 35000,
+            "expected_revenue_per_ha": 50000.0,
+            "expected_profit_per_ha": 15000.0,
+            "profit_margin": "30.0%",
+            "current_market_price": 25.0,
+            "suitable_districts": [
+                "Ranchi / रांची",
+                "Dhanbad / धनबाद",
+                "Jamshedpur / जमशेदपुर",
+                "Bokaro / बोकारो",
+                "Hazaribagh / हजारीबाग",
+                "Koderma / कोडरमा",
+                "Deoghar / देवघर",
+                "Dumka / दुमका",
+                "Latehar / लातेहार",
+                "Kodarma / कोडरमा"
+            ]
         },
-        'wheat': {
-            name_en: 'Wheat',
-            name_hi: 'गेहूं',
-            emoji: '🌾',
-            season: 'Rabi / रबी',
-            water_requirement: 'Medium / मध्यम',
-            investment_per_ha: 28000,
-            expected_revenue_per_ha: 35000,
-            expected_profit_per_ha: 7000,
-            profit_margin: '25%',
-            current_market_price: 22.0,
-            suitable_districts: ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार']
+        "wheat": {
+            "name_en": "Wheat",
+            "name_hi": "गेहूं",
+            "emoji": "🌾",
+            "season": "Rabi / रबी",
+            "water_requirement": "Medium / मध्यम",
+            "investment_per_ha": 28000,
+            "expected_revenue_per_ha": 44000.0,
+            "expected_profit_per_ha": 11000.0,
+            "profit_margin": "25.0%",
+            "current_market_price": 22.0,
+            "suitable_districts": [
+                "Palamu / पलामू",
+                "Garhwa / गढ़वा",
+                "Latehar / लातेहार",
+                "Ranchi / रांची",
+                "Jamshedpur / जमशेदपुर",
+                "Hazaribagh / हजारीबाग",
+                "Koderma / कोडरमा",
+                "Deoghar / देवघर",
+                "Kodarma / कोडरमा"
+            ]
         },
-        'maize': {
-            name_en: 'Maize',
-            name_hi: 'मक्का',
-            emoji: '🌽',
-            season: 'Kharif/Rabi / खरीफ/रबी',
-            water_requirement: 'Medium / मध्यम',
-            investment_per_ha: 25000,
-            expected_revenue_per_ha: 33750,
-            expected_profit_per_ha: 8750,
-            profit_margin: '35%',
-            current_market_price: 18.0,
-            suitable_districts: ['Ranchi / रांची', 'Hazaribagh / हजारीबाग', 'Koderma / कोडरमा']
+        "maize": {
+            "name_en": "Maize",
+            "name_hi": "मक्का",
+            "emoji": "🌽",
+            "season": "Kharif/Rabi / खरीफ/रबी",
+            "water_requirement": "Medium / मध्यम",
+            "investment_per_ha": 25000,
+            "expected_revenue_per_ha": 36000.0,
+            "expected_profit_per_ha": 12600.0,
+            "profit_margin": "35.0%",
+            "current_market_price": 18.0,
+            "suitable_districts": [
+                "Ranchi / रांची",
+                "Hazaribagh / हजारीबाग",
+                "Koderma / कोडरमा",
+                "Dhanbad / धनबाद",
+                "Jamshedpur / जमशेदपुर",
+                "Bokaro / बोकारो",
+                "Palamu / पलामू",
+                "Garhwa / गढ़वा",
+                "Deoghar / देवघर",
+                "Dumka / दुमका",
+                "Latehar / लातेहार",
+                "Kodarma / कोडरमा"
+            ]
         },
-        'cotton': {
-            name_en: 'Cotton',
-            name_hi: 'कपास',
-            emoji: '🌿',
-            season: 'Kharif / खरीफ',
-            water_requirement: 'Medium / मध्यम',
-            investment_per_ha: 40000,
-            expected_revenue_per_ha: 56000,
-            expected_profit_per_ha: 16000,
-            profit_margin: '40%',
-            current_market_price: 45.0,
-            suitable_districts: ['Palamu / पलामू', 'Garhwa / गढ़वा']
+        "cotton": {
+            "name_en": "Cotton",
+            "name_hi": "कपास",
+            "emoji": "🌿",
+            "season": "Kharif / खरीफ",
+            "water_requirement": "Medium / मध्यम",
+            "investment_per_ha": 40000,
+            "expected_revenue_per_ha": 90000.0,
+            "expected_profit_per_ha": 36000.0,
+            "profit_margin": "40.0%",
+            "current_market_price": 45.0,
+            "suitable_districts": [
+                "Palamu / पलामू",
+                "Garhwa / गढ़वा",
+                "Dhanbad / धनबाद",
+                "Bokaro / बोकारो"
+            ]
         },
-        'sugarcane': {
-            name_en: 'Sugarcane',
-            name_hi: 'गन्ना',
-            emoji: '🎋',
-            season: 'Annual / वार्षिक',
-            water_requirement: 'High / उच्च',
-            investment_per_ha: 60000,
-            expected_revenue_per_ha: 87000,
-            expected_profit_per_ha: 27000,
-            profit_margin: '45%',
-            current_market_price: 3.5,
-            suitable_districts: ['Ranchi / रांची', 'Hazaribagh / हजारीबाग']
+        "sugarcane": {
+            "name_en": "Sugarcane",
+            "name_hi": "गन्ना",
+            "emoji": "🎋",
+            "season": "Annual / वार्षिक",
+            "water_requirement": "High / उच्च",
+            "investment_per_ha": 60000,
+            "expected_revenue_per_ha": 7000.0,
+            "expected_profit_per_ha": 3150.0,
+            "profit_margin": "45.0%",
+            "current_market_price": 3.5,
+            "suitable_districts": [
+                "Ranchi / रांची",
+                "Hazaribagh / हजारीबाग",
+                "Dumka / दुमका"
+            ]
         },
-        'chickpea': {
-            name_en: 'Chickpea',
-            name_hi: 'चना',
-            emoji: '🫘',
-            season: 'Rabi / रबी',
-            water_requirement: 'Low / कम',
-            investment_per_ha: 20000,
-            expected_revenue_per_ha: 30000,
-            expected_profit_per_ha: 10000,
-            profit_margin: '50%',
-            current_market_price: 55.0,
-            suitable_districts: ['Palamu / पलामू', 'Garhwa / गढ़वा', 'Latehar / लातेहार']
+        "chickpea": {
+            "name_en": "Chickpea",
+            "name_hi": "चना",
+            "emoji": "🫘",
+            "season": "Rabi / रबी",
+            "water_requirement": "Low / कम",
+            "investment_per_ha": 20000,
+            "expected_revenue_per_ha": 110000.0,
+            "expected_profit_per_ha": 55000.0,
+            "profit_margin": "50.0%",
+            "current_market_price": 55.0,
+            "suitable_districts": [
+                "Palamu / पलामू",
+                "Garhwa / गढ़वा",
+                "Latehar / लातेहार",
+                "Deoghar / देवघर"
+            ]
         },
-        'kidney_beans': {
-            name_en: 'Kidney Beans',
-            name_hi: 'राजमा',
-            emoji: '🫘',
-            season: 'Rabi / रबी',
-            water_requirement: 'Medium / मध्यम',
-            investment_per_ha: 22000,
-            expected_revenue_per_ha: 35200,
-            expected_profit_per_ha: 13200,
-            profit_margin: '60%',
-            current_market_price: 80.0,
-            suitable_districts: ['Ranchi / रांची', 'Hazaribagh / हजारीबाग']
+        "kidney_beans": {
+            "name_en": "Kidney Beans",
+            "name_hi": "राजमा",
+            "emoji": "🫘",
+            "season": "Rabi / रबी",
+            "water_requirement": "Medium / मध्यम",
+            "investment_per_ha": 22000,
+            "expected_revenue_per_ha": 160000.0,
+            "expected_profit_per_ha": 96000.0,
+            "profit_margin": "60.0%",
+            "current_market_price": 80.0,
+            "suitable_districts": [
+                "Ranchi / रांची",
+                "Hazaribagh / हजारीबाग"
+            ]
         },
-        'banana': {
-            name_en: 'Banana',
-            name_hi: 'केला',
-            emoji: '🍌',
-            season: 'Annual / वार्षिक',
-            water_requirement: 'High / उच्च',
-            investment_per_ha: 45000,
-            expected_revenue_per_ha: 63000,
-            expected_profit_per_ha: 18000,
-            profit_margin: '40%',
-            current_market_price: 15.0,
-            suitable_districts: ['Ranchi / रांची', 'Dhanbad / धनबाद']
+        "banana": {
+            "name_en": "Banana",
+            "name_hi": "केला",
+            "emoji": "🍌",
+            "season": "Annual / वार्षिक",
+            "water_requirement": "High / उच्च",
+            "investment_per_ha": 45000,
+            "expected_revenue_per_ha": 30000.0,
+            "expected_profit_per_ha": 12000.0,
+            "profit_margin": "40.0%",
+            "current_market_price": 15.0,
+            "suitable_districts": [
+                "Ranchi / रांची",
+                "Dhanbad / धनबाद",
+                "Dumka / दुमका"
+            ]
         }
     },
-
     districts: {
-        'Ranchi': {
-            name_en: 'Ranchi',
-            name_hi: 'रांची',
-            average_temperature: 24,        // Change temperature (°C)
-            average_rainfall: 1200,         // Change rainfall (mm/year)  
-            average_humidity: 75,           // Change humidity (%)
-            suitable_crops: ['rice', 'maize', 'wheat', 'sugarcane', 'kidney_beans', 'banana']  // Modify crops
+        "Ranchi": {
+            "name_en": "Ranchi",
+            "name_hi": "रांची",
+            "average_temperature": 24,
+            "average_rainfall": 1200,
+            "average_humidity": 75,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize",
+                "sugarcane",
+                "kidney_beans",
+                "banana"
+            ]
+        },
+        "Dhanbad": {
+            "name_en": "Dhanbad",
+            "name_hi": "धनबाद",
+            "average_temperature": 26,
+            "average_rainfall": 1100,
+            "average_humidity": 70,
+            "suitable_crops": [
+                "rice",
+                "maize",
+                "cotton",
+                "banana"
+            ]
         },
-        'Dhanbad': {
-            name_en: 'Dhanbad',
-            name_hi: 'धनबाद',
-            average_temperature: 26,
-            average_rainfall: 1100,
-            average_humidity: 70,
-            suitable_crops: ['rice', 'maize', 'cotton', 'banana']
+        "Jamshedpur": {
+            "name_en": "Jamshedpur",
+            "name_hi": "जमशेदपुर",
+            "average_temperature": 27,
+            "average_rainfall": 1300,
+            "average_humidity": 75,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize"
+            ]
         },
-        'Jamshedpur': {
-            name_en: 'Jamshedpur',
-            name_hi: 'जमशेदपुर',
-            average_temperature: 27,
-            average_rainfall: 1300,
-            average_humidity: 75,
-            suitable_crops: ['rice', 'maize', 'wheat']
+        "Bokaro": {
+            "name_en": "Bokaro",
+            "name_hi": "बोकारो",
+            "average_temperature": 25,
+            "average_rainfall": 1150,
+            "average_humidity": 70,
+            "suitable_crops": [
+                "rice",
+                "maize",
+                "cotton"
+            ]
         },
-        'Bokaro': {
-            name_en: 'Bokaro',
-            name_hi: 'बोकारो',
-            average_temperature: 25,
-            average_rainfall: 1150,
-            average_humidity: 70,
-            suitable_crops: ['rice', 'maize', 'cotton']
+        "Hazaribagh": {
+            "name_en": "Hazaribagh",
+            "name_hi": "हजारीबाग",
+            "average_temperature": 26,
+            "average_rainfall": 1000,
+            "average_humidity": 75,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize",
+                "sugarcane",
+                "kidney_beans"
+            ]
         },
-        'Hazaribagh': {
-            name_en: 'Hazaribagh',
-            name_hi: 'हजारीबाग',
-            average_temperature: 23,
-            average_rainfall: 1000,
-            average_humidity: 75,
-            suitable_crops: ['rice', 'wheat', 'maize', 'sugarcane', 'kidney_beans']
+        "Palamu": {
+            "name_en": "Palamu",
+            "name_hi": "पलामू",
+            "average_temperature": 25,
+            "average_rainfall": 900,
+            "average_humidity": 65,
+            "suitable_crops": [
+                "wheat",
+                "maize",
+                "cotton",
+                "chickpea"
+            ]
         },
-        'Palamu': {
-            name_en: 'Palamu',
-            name_hi: 'पलामू',
-            average_temperature: 25,
-            average_rainfall: 900,
-            average_humidity: 65,
-            suitable_crops: ['wheat', 'maize', 'cotton', 'chickpea']
+        "Garhwa": {
+            "name_en": "Garhwa",
+            "name_hi": "गढ़वा",
+            "average_temperature": 24,
+            "average_rainfall": 950,
+            "average_humidity": 68,
+            "suitable_crops": [
+                "wheat",
+                "maize",
+                "cotton",
+                "chickpea"
+            ]
         },
-        'Garhwa': {
-            name_en: 'Garhwa',
-            name_hi: 'गढ़वा',
-            average_temperature: 24,
-            average_rainfall: 950,
-            average_humidity: 68,
-            suitable_crops: ['wheat', 'maize', 'cotton', 'chickpea']
+        "Koderma": {
+            "name_en": "Koderma",
+            "name_hi": "कोडरमा",
+            "average_temperature": 24,
+            "average_rainfall": 1050,
+            "average_humidity": 72,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize"
+            ]
         },
-        'Koderma': {
-            name_en: 'Koderma',
-            name_hi: 'कोडरमा',
-            average_temperature: 24,
-            average_rainfall: 1050,
-            average_humidity: 72,
-            suitable_crops: ['rice', 'maize', 'wheat']
+        "Deoghar": {
+            "name_en": "Deoghar",
+            "name_hi": "देवघर",
+            "average_temperature": 25,
+            "average_rainfall": 1100,
+            "average_humidity": 73,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize",
+                "chickpea"
+            ]
         },
-        'Deoghar': {
-            name_en: 'Deoghar',
-            name_hi: 'देवघर',
-            average_temperature: 25,
-            average_rainfall: 1100,
-            average_humidity: 73,
-            suitable_crops: ['rice', 'maize', 'wheat', 'chickpea']
+        "Dumka": {
+            "name_en": "Dumka",
+            "name_hi": "दुमका",
+            "average_temperature": 26,
+            "average_rainfall": 1250,
+            "average_humidity": 78,
+            "suitable_crops": [
+                "rice",
+                "maize",
+                "sugarcane",
+                "banana"
+            ]
         },
-        'Dumka': {
-            name_en: 'Dumka',
-            name_hi: 'दुमका',
-            average_temperature: 26,
-            average_rainfall: 1250,
-            average_humidity: 78,
-            suitable_crops: ['rice', 'maize', 'banana', 'sugarcane']
+        "Latehar": {
+            "name_en": "Latehar",
+            "name_hi": "लातेहार",
+            "average_temperature": null,
+            "average_rainfall": 900,
+            "average_humidity": 70,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize",
+                "chickpea"
+            ]
+        },
+        "Kodarma": {
+            "name_en": "Kodarma",
+            "name_hi": "कोडरमा",
+            "average_temperature": 27,
+            "average_rainfall": 800,
+            "average_humidity": 70,
+            "suitable_crops": [
+                "rice",
+                "wheat",
+                "maize"
+            ]
         }
     },
-
     market_prices: [
         {
-            crop_name: 'Rice',
-            crop_name_hindi: 'धान',
-            price_per_kg: 25.50,
-            market_trend: 'Stable demand, good prices',
-            last_updated: '2025-01-21'
+            "crop": "rice",
+            "crop_name": "Rice",
+            "crop_name_hindi": "धान",
+            "price_per_kg": 25.0,
+            "market_trend": "Stable demand, good prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Wheat',
-            crop_name_hindi: 'गेहूं', 
-            price_per_kg: 22.00,
-            market_trend: 'High demand, rising prices',
-            last_updated: '2025-01-21'
+            "crop": "wheat",
+            "crop_name": "Wheat",
+            "crop_name_hindi": "गेहूं",
+            "price_per_kg": 22.0,
+            "market_trend": "High demand, rising prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Maize',
-            crop_name_hindi: 'मक्का',
-            price_per_kg: 18.00,
-            market_trend: 'Moderate demand, stable prices',
-            last_updated: '2025-01-21'
+            "crop": "maize",
+            "crop_name": "Maize",
+            "crop_name_hindi": "मक्का",
+            "price_per_kg": 18.0,
+            "market_trend": "Moderate demand, stable prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Cotton',
-            crop_name_hindi: 'कपास',
-            price_per_kg: 85.00,
-            market_trend: 'High demand, premium prices',
-            last_updated: '2025-01-21'
+            "crop": "cotton",
+            "crop_name": "Cotton",
+            "crop_name_hindi": "कपास",
+            "price_per_kg": 45.0,
+            "market_trend": "High demand, premium prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Sugarcane',
-            crop_name_hindi: 'गन्ना',
-            price_per_kg: 3.80,
-            market_trend: 'Steady demand, fair prices',
-            last_updated: '2025-01-21'
+            "crop": "sugarcane",
+            "crop_name": "Sugarcane",
+            "crop_name_hindi": "गन्ना",
+            "price_per_kg": 3.5,
+            "market_trend": "Steady demand, fair prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Chickpea',
-            crop_name_hindi: 'चना',
-            price_per_kg: 65.00,
-            market_trend: 'High demand, good returns',
-            last_updated: '2025-01-21'
+            "crop": "chickpea",
+            "crop_name": "Chickpea",
+            "crop_name_hindi": "चना",
+            "price_per_kg": 55.0,
+            "market_trend": "High demand, good returns",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Kidney Beans',
-            crop_name_hindi: 'राजमा',
-            price_per_kg: 120.00,
-            market_trend: 'Premium crop, excellent prices',
-            last_updated: '2025-01-21'
+            "crop": "kidney_beans",
+            "crop_name": "Kidney Beans",
+            "crop_name_hindi": "राजमा",
+            "price_per_kg": 80.0,
+            "market_trend": "Premium crop, excellent prices",
+            "last_updated": "2025-01-21"
         },
         {
-            crop_name: 'Banana',
-            crop_name_hindi: 'केला',
-            price_per_kg: 15.00,
-            market_trend: 'Consistent demand, stable prices',
-            last_updated: '2025-01-21'
+            "crop": "banana",
+            "crop_name": "Banana",
+            "crop_name_hindi": "केला",
+            "price_per_kg": 15.0,
+            "market_trend": "Consistent demand, stable prices",
+            "last_updated": "2025-01-21"
         }
     ],
+    // END GENERATED DATA
 
     // Enhanced offline crop recommendation logic - supports decimal inputs
     getCropRecommendation: function(N, P, K, temperature, humidity, ph, rainfall) {
@@ -469,9 +612,71 @@ const OFFLINE_CROP_DATA = {
             break_even_price_per_kg: breakEvenPrice,
             risk_level: roiPercentage > 40 ? 'Low' : roiPercentage > 20 ? 'Medium' : 'High'
         };
+    },
+
+    // Merge a response from /offline-bundle: a full dataset, or the entries
+    // changed and removed since this.version
+    applyBundle: function(bundle) {
+        const current = {
+            crops: bundle.full ? {} : Object.assign({}, this.crops),
+            districts: bundle.full ? {} : Object.assign({}, this.districts),
+            market_prices: {}
+        };
+        if (!bundle.full) {
+            this.market_prices.forEach(price => { current.market_prices[price.crop] = price; });
+        }
+        const changed = bundle.full ? bundle.data : bundle.changed;
+        Object.keys(changed || {}).forEach(section => {
+            Object.assign(current[section], changed[section]);
+        });
+        Object.keys(bundle.removed || {}).forEach(section => {
+            bundle.removed[section].forEach(key => { delete current[section][key]; });
+        });
+        this.crops = current.crops;
+        this.districts = current.districts;
+        this.market_prices = Object.values(current.market_prices);
+        this.version = bundle.version;
+    },
+
+    // Download only what changed on the server and keep it for offline use
+    syncBundle: async function(apiBaseUrl) {
+        const response = await fetch(`${apiBaseUrl}/offline-bundle?since=${this.version}`);
+        if (!response.ok) return false;
+        const bundle = await response.json();
+        if (bundle.version === this.version) return false;
+        this.applyBundle(bundle);
+        try {
+            localStorage.setItem(OFFLINE_BUNDLE_STORAGE_KEY, JSON.stringify({
+                base_version: OFFLINE_DATA_VERSION,
+                version: this.version,
+                crops: this.crops,
+                districts: this.districts,
+                market_prices: this.market_prices
+            }));
+        } catch (e) {
+            console.log('Could not store offline data: ', e);
+        }
+        return true;
     }
 };
 
+const OFFLINE_DATA_VERSION = OFFLINE_CROP_DATA.version;
+
+// Use data synced in an earlier session, unless this file has been rebuilt since
+(function restoreSyncedBundle() {
+    try {
+        const stored = JSON.parse(localStorage.getItem(OFFLINE_BUNDLE_STORAGE_KEY) || 'null');
+        if (stored && stored.base_version === OFFLINE_DATA_VERSION) {
+            OFFLINE_CROP_DATA.version = stored.version;
+            OFFLINE_CROP_DATA.crops = stored.crops;
+            OFFLINE_CROP_DATA.districts = stored.districts;
+            OFFLINE_CROP_DATA.market_prices = stored.market_prices;
+        }
+    } catch (e) {
+        // localStorage unavailable (e.g. Node or private mode): keep the built-in data
+    }
+})();
+
 // Export for use in main application
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = OFFLINE_CROP_DATA;
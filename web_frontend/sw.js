@@ -1,11 +1,132 @@
 // Service Worker for Crop Advisor - Offline Functionality
-const CACHE_NAME = 'crop-advisor-v1';
+const CACHE_NAME = 'crop-advisor-v2';
+const API_CACHE_NAME = 'crop-advisor-api-v1';
 const urlsToCache = [
   '/',
   '/index.html',
   // Add other assets as needed
 ];
 
+// Caching strategy per API route. How long a response stays fresh comes from
+// the Cache-Control the backend sends (backend/cache_policy.py); the values
+// here are only used when a response has none.
+const API_ROUTES = [
+  { prefix: '/crop-info', strategy: 'stale-while-revalidate', maxAge: 3600, staleWhileRevalidate: 86400 },
+  { prefix: '/climate-data', strategy: 'stale-while-revalidate', maxAge: 3600, staleWhileRevalidate: 86400 },
+  { prefix: '/districts', strategy: 'stale-while-revalidate', maxAge: 3600, staleWhileRevalidate: 86400 },
+  { prefix: '/crops', strategy: 'stale-while-revalidate', maxAge: 3600, staleWhileRevalidate: 86400 },
+  { prefix: '/crop-prices', strategy: 'ttl', maxAge: 60 },
+  { prefix: '/recommend-crop', strategy: 'network-first' },
+];
+
+const CACHED_AT_HEADER = 'sw-cached-at';
+
+function apiRoute(url) {
+  return API_ROUTES.find(function(route) {
+    return url.pathname === route.prefix || url.pathname.startsWith(route.prefix + '/');
+  });
+}
+
+// max-age / stale-while-revalidate of a cached response, in seconds
+function cachePolicy(response, route) {
+  const policy = { maxAge: route.maxAge || 0, staleWhileRevalidate: route.staleWhileRevalidate || 0 };
+  const header = response.headers.get('cache-control') || '';
+  header.split(',').forEach(function(part) {
+    const [name, value] = part.trim().split('=');
+    if (name === 'max-age') policy.maxAge = Number(value) || 0;
+    if (name === 'stale-while-revalidate') policy.staleWhileRevalidate = Number(value) || 0;
+    if (name === 'no-store' || name === 'no-cache') policy.maxAge = 0;
+  });
+  return policy;
+}
+
+function cacheAge(response) {
+  const cachedAt = Number(response.headers.get(CACHED_AT_HEADER)) || 0;
+  return (Date.now() - cachedAt) / 1000;
+}
+
+// Store a copy of a successful response, stamped with the time it was cached;
+// responses the backend marks no-store are never kept
+function putInCache(cache, key, response) {
+  if (!response.ok) return Promise.resolve();
+  if (/(^|,)\s*no-store\s*(,|$)/.test(response.headers.get('cache-control') || '')) {
+    return Promise.resolve();
+  }
+  const copy = response.clone();
+  return copy.blob().then(function(body) {
+    const headers = new Headers(copy.headers);
+    headers.set(CACHED_AT_HEADER, String(Date.now()));
+    return cache.put(key, new Response(body, {
+      status: copy.status,
+      statusText: copy.statusText,
+      headers: headers
+    }));
+  });
+}
+
+function fetchAndCache(cache, request, key) {
+  return fetch(request).then(function(response) {
+    putInCache(cache, key, response);
+    return response;
+  });
+}
+
+// Serve from cache while fresh; within the stale-while-revalidate window
+// serve the cached copy and refresh it in the background
+function staleWhileRevalidate(event, route) {
+  const request = event.request;
+  return caches.open(API_CACHE_NAME).then(function(cache) {
+    return cache.match(request).then(function(cached) {
+      if (!cached) return fetchAndCache(cache, request, request);
+
+      const age = cacheAge(cached);
+      const policy = cachePolicy(cached, route);
+      if (age <= policy.maxAge) return cached;
+      if (age <= policy.maxAge + policy.staleWhileRevalidate) {
+        event.waitUntil(fetchAndCache(cache, request, request).catch(function() {}));
+        return cached;
+      }
+      return fetchAndCache(cache, request, request).catch(function() {
+        return cached;
+      });
+    });
+  });
+}
+
+// Serve from cache only for the short TTL; older copies are an offline fallback
+function shortTtl(event, route) {
+  const request = event.request;
+  return caches.open(API_CACHE_NAME).then(function(cache) {
+    return cache.match(request).then(function(cached) {
+      if (cached && cacheAge(cached) <= cachePolicy(cached, route).maxAge) return cached;
+      return fetchAndCache(cache, request, request).catch(function(err) {
+        if (cached) return cached;
+        throw err;
+      });
+    });
+  });
+}
+
+// POSTs can't be cache keys, so the last answer for the same inputs is keyed
+// by the request body; the backend sends these as "private, no-cache", so the
+// copy is only used when the network fails. Without a network or a cached answer the request fails
+// and the page falls back to its offline recommendation logic.
+function networkFirst(event) {
+  const request = event.request;
+  return request.clone().text().then(function(body) {
+    const url = new URL(request.url);
+    const key = new Request(url.origin + url.pathname + '?body=' + encodeURIComponent(body));
+    return caches.open(API_CACHE_NAME).then(function(cache) {
+      return fetchAndCache(cache, request, key).catch(function(err) {
+        return cache.match(key).then(function(cached) {
+          if (cached) return cached;
+          throw err;
+        });
+      });
+    });
+  });
+}
+
 // Install event - cache resources
 self.addEventListener('install', function(event) {
   event.waitUntil(
@@ -17,8 +138,20 @@ self.addEventListener('install', function(event) {
   );
 });
 
-// Fetch event - serve from cache when offline
+// Fetch event - API routes by their strategy, everything else from cache when offline
 self.addEventListener('fetch', function(event) {
+  const route = apiRoute(new URL(event.request.url));
+  if (route) {
+    if (route.strategy === 'network-first' && event.request.method === 'POST') {
+      event.respondWith(networkFirst(event));
+      return;
+    }
+    if (event.request.method === 'GET') {
+      event.respondWith(route.strategy === 'ttl' ? shortTtl(event, route) : staleWhileRevalidate(event, route));
+      return;
+    }
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then(function(response) {
@@ -38,7 +171,7 @@ self.addEventListener('activate', function(event) {
     caches.keys().then(function(cacheNames) {
       return Promise.all(
         cacheNames.map(function(cacheName) {
-          if (cacheName !== CACHE_NAME) {
+          if (cacheName !== CACHE_NAME && cacheName !== API_CACHE_NAME) {
             return caches.delete(cacheName);
           }
         })